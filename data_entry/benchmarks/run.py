@@ -0,0 +1,232 @@
+"""
+Runs the stage benchmarks at several scales, appends the results to a JSON
+history file and fails when a stage got slower than its baseline run allows.
+A run that regresses is not appended unless --accept makes it the new baseline.
+
+    python -m benchmarks.run --scales 1 100 1000
+    python -m benchmarks.run --stages web_parse ansi_parse --threshold 0.1
+    python -m benchmarks.run --stages ssh_scrape --accept
+
+Every (stage, scale) runs in its own process so its peak RSS is its own.
+"""
+
+import argparse
+import datetime
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.stages import STAGES, SkipBenchmark, department_names
+from src.scrapers.metrics import get_run_metrics, percentile
+
+DEFAULT_HISTORY = "output_files/benchmark_history.json"
+
+
+def measure(stage: str, scale: int) -> dict:
+    items, latencies, elapsed = STAGES[stage](department_names(scale))
+    ordered = sorted(latencies)
+    result = {
+        "departments": scale,
+        "items": items,
+        "seconds": round(elapsed, 6),
+        "throughput": round(items / elapsed, 3) if elapsed else 0.0,
+        "p50": round(percentile(ordered, 0.50), 6),
+        "p95": round(percentile(ordered, 0.95), 6),
+        "p99": round(percentile(ordered, 0.99), 6),
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        ),
+    }
+    # only stages running the pipeline watch the event loop
+    stalls = get_run_metrics().stages.get("event_loop_stall")
+    if stalls is not None:
+        summary = stalls.summary()
+        result["loop_stall_total"] = summary["sum"]
+        result["loop_stall_max"] = summary["max"]
+    return result
+
+
+def run_child(stage: str, scale: int) -> dict:
+    with tempfile.NamedTemporaryFile(suffix=".json") as output:
+        completed = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.run",
+                "--child",
+                stage,
+                str(scale),
+                output.name,
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        if completed.returncode != 0:
+            return {"error": completed.stderr.strip().splitlines()[-1:]}
+        return json.loads(Path(output.name).read_text())
+
+
+def child_main(stage: str, scale: str, output: str) -> None:
+    try:
+        result = measure(stage, int(scale))
+    except SkipBenchmark as e:
+        result = {"skipped": str(e)}
+    Path(output).write_text(json.dumps(result))
+
+
+def git_commit() -> str | None:
+    completed = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True
+    )
+    return completed.stdout.strip() or None
+
+
+def load_history(path: Path) -> list[dict]:
+    if not path.exists():
+        return []
+    with path.open() as file:
+        return json.load(file)
+
+
+def find_regressions(
+    results: dict, history: list[dict], threshold: float
+) -> list[str]:
+    """
+    Compares against the baseline of the same stage and scale: the latest run
+    accepted as one, or else the first run that measured them. Runs in between
+    are never the baseline, so slowdowns under threshold cannot add up unseen. A
+    stage regresses when its throughput drops, or its p95 latency grows, by more
+    than threshold (a fraction).
+    """
+    regressions = []
+    for stage, scales in results.items():
+        for scale, result in scales.items():
+            if "throughput" not in result:
+                continue
+            measured = [
+                run
+                for run in history
+                if "throughput" in run["results"].get(stage, {}).get(scale, {})
+            ]
+            pinned = [run for run in measured if run.get("baseline")]
+            baseline = (
+                (pinned[-1] if pinned else measured[0])["results"][stage][scale]
+                if measured
+                else None
+            )
+            if baseline is None:
+                continue
+            if result["throughput"] < baseline["throughput"] * (1 - threshold):
+                regressions.append(
+                    f"{stage} @ {scale} departments: throughput "
+                    f"{result['throughput']}/s vs {baseline['throughput']}/s"
+                )
+            if baseline["p95"] and result["p95"] > baseline["p95"] * (1 + threshold):
+                regressions.append(
+                    f"{stage} @ {scale} departments: p95 {result['p95']:.6f}s "
+                    f"vs {baseline['p95']:.6f}s"
+                )
+    return regressions
+
+
+def main():
+    if len(sys.argv) == 5 and sys.argv[1] == "--child":
+        child_main(*sys.argv[2:])
+        return
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark the scraper stages against stand-in inputs",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--stages",
+        nargs="+",
+        choices=list(STAGES),
+        default=list(STAGES),
+        help="Stages to benchmark",
+    )
+    parser.add_argument(
+        "--scales",
+        type=int,
+        nargs="+",
+        default=[1, 100, 1000],
+        help="Department counts to benchmark each stage at",
+    )
+    parser.add_argument(
+        "--history", default=DEFAULT_HISTORY, help="JSON file runs are appended to"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown against the baseline run, as a fraction",
+    )
+    parser.add_argument(
+        "--no-save", action="store_true", help="Compare without appending to history"
+    )
+    parser.add_argument(
+        "--accept",
+        action="store_true",
+        help="Append the run even if it regressed and make it the new baseline",
+    )
+    args = parser.parse_args()
+
+    results: dict[str, dict[str, dict]] = {}
+    for stage in args.stages:
+        for scale in args.scales:
+            result = run_child(stage, scale)
+            results.setdefault(stage, {})[str(scale)] = result
+            if "throughput" in result:
+                print(
+                    f"{stage:<20} {scale:>5} depts  {result['items']:>7} items  "
+                    f"{result['throughput']:>10.1f}/s  "
+                    f"p50 {result['p50'] * 1000:8.3f}ms  "
+                    f"p95 {result['p95'] * 1000:8.3f}ms  "
+                    f"p99 {result['p99'] * 1000:8.3f}ms  "
+                    f"rss {result['peak_rss_mb']:.1f}MB"
+                    + (
+                        f"  loop stalled {result['loop_stall_total']:.2f}s "
+                        f"(longest {result['loop_stall_max'] * 1000:.1f}ms)"
+                        if "loop_stall_total" in result
+                        else ""
+                    )
+                )
+            else:
+                print(f"{stage:<20} {scale:>5} depts  {result}")
+
+    history_path = Path(args.history)
+    history = load_history(history_path)
+    regressions = find_regressions(results, history, args.threshold)
+
+    # a regressed run would otherwise sit in the history as if it were fine
+    if not args.no_save and (args.accept or not regressions):
+        history.append(
+            {
+                "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+                "commit": git_commit(),
+                "baseline": args.accept,
+                "results": results,
+            }
+        )
+        history_path.parent.mkdir(parents=True, exist_ok=True)
+        with history_path.open("w") as file:
+            json.dump(history, file, indent=2)
+
+    if regressions:
+        print(f"\nRegressions beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        if args.accept:
+            print("Accepted, this run is the new baseline")
+            return
+        print("Not saved, run again with --accept to make it the new baseline")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+"""
+Stage benchmarks. Each one takes a list of department names, runs one stage of
+the scraper over stand-in inputs for them and returns how many items it
+processed, the latency of every item and the wall time of the measured part,
+all in seconds. Building the inputs is left out of the measurement.
+"""
+
+import asyncio
+import functools
+import itertools
+import logging
+import os
+import string
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+from src.constants import PARSE_WORKERS
+from src.parsers.ansi_parser import parse_department_page
+from src.parsers.requisite_parser import parse_prerequisites
+from src.parsers.section_table_parser import available_backends
+from src.parsers.schedule_parser import parse_schedule
+from src.scrapers.standins.registrar import (
+    render_sections_page,
+    synthetic_department,
+)
+from src.scrapers.standins.rumad import render_rumad_pages
+from src.scrapers.web_scraper import parse_department_html
+
+TERM = ("Fall", 2024)
+RUMAD_TERM = "1erSem"
+
+# requisites seen on the registrar, the synthetic ones are all single courses
+SAMPLE_REQUISITES = [
+    "CIIC3011",
+    "(CIIC4010 Y MATE3031) O INSO4101",
+    "MENOS DE 30 CRS PARA GRADUACION",
+    "NIVEL_AVAN_INGL >= #4",
+    "3RO",
+    "DIRECTOR",
+]
+
+StageBenchmark = Callable[[list[str]], tuple[int, list[float], float]]
+
+
+def department_names(count: int) -> list[str]:
+    """The real department codes first, then made up four letter ones."""
+    with open("input_files/departments.txt") as file:
+        real = [department.strip() for department in file if department.strip()]
+    names = real[:count]
+    for letters in itertools.product(string.ascii_uppercase, repeat=4):
+        if len(names) >= count:
+            break
+        name = "".join(letters)
+        if name not in real:
+            names.append(name)
+    return names
+
+
+def timed(items, work: Callable) -> tuple[int, list[float], float]:
+    latencies = []
+    wall_started = time.perf_counter()
+    for item in items:
+        started = time.perf_counter()
+        work(item)
+        latencies.append(time.perf_counter() - started)
+    return len(latencies), latencies, time.perf_counter() - wall_started
+
+
+def department_payloads(departments: list[str]) -> list[dict]:
+    payloads = []
+    for department in departments:
+        data = parse_department_html(
+            render_sections_page(synthetic_department(department)),
+            department,
+            *TERM,
+            {},
+        )
+        if data is not None:
+            payloads.append(data)
+    return payloads
+
+
+def bench_web_parse(
+    departments: list[str], html_parser: str = "html.parser"
+) -> tuple[int, list[float], float]:
+    if html_parser not in available_backends():
+        raise SkipBenchmark(f"{html_parser} is not installed")
+    pages = [
+        (department, render_sections_page(synthetic_department(department)))
+        for department in departments
+    ]
+    return timed(
+        pages,
+        lambda page: parse_department_html(page[1], page[0], *TERM, {}, html_parser),
+    )
+
+
+def bench_ansi_parse(departments: list[str]) -> tuple[int, list[float], float]:
+    pages = [
+        page
+        for department in departments
+        for page in render_rumad_pages(department, RUMAD_TERM, TERM[1])
+    ]
+    return timed(pages, parse_department_page)
+
+
+def bench_parse_schedule(departments: list[str]) -> tuple[int, list[float], float]:
+    meetings = [
+        meeting
+        for department in departments
+        for course in synthetic_department(department)
+        for section in course["sections"]
+        for meeting in section["meetings"]
+    ]
+    return timed(meetings, parse_schedule)
+
+
+def bench_parse_prerequisites(departments: list[str]) -> tuple[int, list[float], float]:
+    requisites = [
+        course["prerequisites"] or SAMPLE_REQUISITES[i % len(SAMPLE_REQUISITES)]
+        for department in departments
+        for i, course in enumerate(synthetic_department(department))
+    ]
+    return timed(requisites, parse_prerequisites)
+
+
+async def write_to_sink(sink, payloads: list[dict]) -> list[float]:
+    await sink.open([TERM])
+    latencies = []
+    for payload in payloads:
+        started = time.perf_counter()
+        await sink.write(payload)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def bench_sql_write(departments: list[str]) -> tuple[int, list[float], float]:
+    from src.scrapers.sinks.sql_sink import SQLSink
+
+    payloads = department_payloads(departments)
+    with tempfile.TemporaryDirectory() as directory:
+        sink = SQLSink(f"sqlite+aiosqlite:///{directory}/bench.db")
+
+        async def run():
+            try:
+                return await write_to_sink(sink, payloads)
+            finally:
+                if sink.engine is not None:
+                    await sink.engine.dispose()
+
+        latencies = asyncio.run(run())
+    return len(latencies), latencies, sum(latencies)
+
+
+def bench_firestore_write(departments: list[str]) -> tuple[int, list[float], float]:
+    # only against the Firestore emulator, never the production project
+    if not os.environ.get("FIRESTORE_EMULATOR_HOST"):
+        raise SkipBenchmark(
+            "set FIRESTORE_EMULATOR_HOST to benchmark Firestore writes"
+        )
+    from src.scrapers.sinks.firestore_sink import FirestoreSink
+
+    payloads = department_payloads(departments)
+    sink = FirestoreSink()
+
+    async def run():
+        try:
+            return await write_to_sink(sink, payloads)
+        finally:
+            if sink.client is not None:
+                sink.client.close()
+
+    latencies = asyncio.run(run())
+    return len(latencies), latencies, sum(latencies)
+
+
+def bench_ssh_scrape(
+    departments: list[str],
+    backend: str = "paramiko",
+    channels: int = 24,
+    shells_per_connection: int = 1,
+) -> tuple[int, list[float], float]:
+    """
+    Opens channels shells on backend to the stand-in RUMAD, shells_per_connection
+    of them on each SSH connection, and reads every department's availability
+    through them, watching the event loop like the pipeline does. Items are
+    RUMAD pages, each timed from its key press, and the wall time includes
+    connecting and setup. RUMAD's fixed pauses between keystrokes in setup are
+    cut to 0.1 seconds, the stand-in answers at once.
+    """
+    import src.scrapers.ssh_scraper as ssh_scraper
+    from src.scrapers.metrics import get_run_metrics, watch_event_loop
+    from src.scrapers.standins.rumad import StandInRumad
+
+    payloads = department_payloads(departments)
+    send_input = ssh_scraper.send_input
+
+    async def short_send_input(chan, inputs, department=None):
+        inputs = [(text, min(delay, 0.1)) for text, delay in inputs]
+        return await send_input(chan, inputs, department)
+
+    async def run(port: int) -> None:
+        loop_watcher = asyncio.create_task(watch_event_loop(get_run_metrics()))
+        pool = ssh_scraper.SSHChannelPool(
+            min(channels, len(payloads)),
+            "127.0.0.1",
+            port,
+            backend,
+            shells_per_connection=shells_per_connection,
+        )
+        queue: asyncio.Queue[dict] = asyncio.Queue()
+        for payload in payloads:
+            queue.put_nowait(payload)
+
+        async def worker():
+            while not queue.empty():
+                payload = queue.get_nowait()
+                shell = await pool.acquire(RUMAD_TERM)
+                try:
+                    channel = await shell.select_term(RUMAD_TERM)
+                    await ssh_scraper.scrape_department_availability(channel, payload)
+                finally:
+                    await pool.release(shell)
+
+        try:
+            await pool.open(RUMAD_TERM)
+            await asyncio.gather(*(worker() for _ in range(pool.size)))
+        finally:
+            pool.close()
+            loop_watcher.cancel()
+
+    rumad = StandInRumad(year=TERM[1])
+    port = rumad.start_in_thread()
+    ssh_scraper.send_input = short_send_input
+    started = time.perf_counter()
+    try:
+        asyncio.run(run(port))
+        elapsed = time.perf_counter() - started
+    finally:
+        ssh_scraper.send_input = send_input
+        rumad.stop_thread()
+    pages = get_run_metrics().stages["ssh_page"].samples
+    return len(pages), pages, elapsed
+
+
+def bench_pipeline(
+    departments: list[str], parse_workers: int = PARSE_WORKERS
+) -> tuple[int, list[float], float]:
+    """
+    The whole scrape_to_sql pipeline against the stand-in registrar (and the
+    stand-in RUMAD when BENCH_WITH_SSH is set), in a scratch directory. The run
+    also reports how long the event loop stalled, see measure().
+    """
+    from src.scrapers.metrics import get_run_metrics
+    from src.scrapers.pipeline import run_pipeline
+    from src.scrapers.sinks.sql_sink import SQLSink
+    from src.scrapers.standins.registrar import StandInRegistrar
+    from src.scrapers.standins.rumad import StandInRumad
+
+    with_ssh = bool(os.environ.get("BENCH_WITH_SSH"))
+    professor_ids = Path("input_files/professor_ids.txt").read_text()
+    previous_directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        Path("input_files").mkdir()
+        Path("input_files/professor_ids.txt").write_text(professor_ids)
+        Path("input_files/departments.txt").write_text("\n".join(departments) + "\n")
+
+        rumad = StandInRumad(year=TERM[1])
+        rumad_port = rumad.start_in_thread() if with_ssh else 0
+        # rendering pages on the scraper's loop would count as its stalls
+        registrar = StandInRegistrar()
+        registrar_loop = asyncio.new_event_loop()
+        threading.Thread(target=registrar_loop.run_forever, daemon=True).start()
+        url = asyncio.run_coroutine_threadsafe(
+            registrar.start(), registrar_loop
+        ).result()
+
+        started = time.perf_counter()
+        try:
+            asyncio.run(
+                run_pipeline(
+                    terms=[TERM],
+                    sinks=[SQLSink(f"sqlite+aiosqlite:///{directory}/courses.db")],
+                    ssh_tasks=min(24, len(departments)),
+                    disable_ssh=not with_ssh,
+                    registrar_url=url,
+                    requests_per_second=1000,
+                    rumad_host="127.0.0.1",
+                    rumad_port=rumad_port,
+                    parse_workers=parse_workers,
+                )
+            )
+            elapsed = time.perf_counter() - started
+        finally:
+            asyncio.run_coroutine_threadsafe(registrar.stop(), registrar_loop).result()
+            registrar_loop.call_soon_threadsafe(registrar_loop.stop)
+            if with_ssh:
+                rumad.stop_thread()
+            logging.shutdown()
+            os.chdir(previous_directory)
+
+    # time each department spent inside the stages, queue waits included
+    latencies = [
+        sum(seconds for stage, seconds in stages.items() if stage in STAGE_TIMES)
+        for stages in get_run_metrics().departments.values()
+    ]
+    return len(departments), latencies, elapsed
+
+
+STAGE_TIMES = {
+    "web_queue_wait",
+    "rate_limit_wait",
+    "http_fetch",
+    "parse_pool_wait",
+    "html_parse",
+    "ssh_queue_wait",
+    "ssh_scrape",
+    "db_queue_wait",
+    "sink_sqlite_queue_wait",
+    "sink_sqlite_write",
+}
+
+
+class SkipBenchmark(Exception):
+    """Raised by a stage that cannot run in this environment."""
+
+
+STAGES: dict[str, StageBenchmark] = {
+    "web_parse": bench_web_parse,
+    "web_parse_lxml": functools.partial(bench_web_parse, html_parser="lxml"),
+    "ansi_parse": bench_ansi_parse,
+    "parse_schedule": bench_parse_schedule,
+    "parse_prerequisites": bench_parse_prerequisites,
+    "sql_write": bench_sql_write,
+    "firestore_write": bench_firestore_write,
+    # 24 channels on each SSH client, the stand-in RUMAD in its own thread
+    "ssh_scrape": bench_ssh_scrape,
+    "ssh_scrape_asyncssh": functools.partial(bench_ssh_scrape, backend="asyncssh"),
+    # the same 24 channels over fewer connections
+    **{
+        f"ssh_scrape_asyncssh_x{ratio}": functools.partial(
+            bench_ssh_scrape, backend="asyncssh", shells_per_connection=ratio
+        )
+        for ratio in (4, 12, 24)
+    },
+    "ssh_scrape_x4": functools.partial(bench_ssh_scrape, shells_per_connection=4),
+    "pipeline": bench_pipeline,
+    # the same run parsing on the event loop, to compare its stalls against
+    "pipeline_inline_parse": functools.partial(bench_pipeline, parse_workers=0),
+}
@@ -1,11 +1,3 @@
-poetry run python src/scrapers/scrape_to_firebase.py -t Fall -y 2025
-poetry run python src/scrapers/scrape_to_firebase.py -t Spring -y 2025
-poetry run python src/scrapers/scrape_to_firebase.py -t FirstSummer -y 2025
-poetry run python src/scrapers/scrape_to_firebase.py -t SecondSummer -y 2025
-poetry run python src/scrapers/scrape_to_firebase.py -t ExtendedSummer -y 2025
+poetry run python src/scrapers/scrape_to_firebase.py -t Fall Spring FirstSummer SecondSummer ExtendedSummer -y 2025
 
-poetry run python src/scrapers/scrape_to_firebase.py -t Fall -y 2024
-poetry run python src/scrapers/scrape_to_firebase.py -t Spring -y 2024
-poetry run python src/scrapers/scrape_to_firebase.py -t FirstSummer -y 2024
-poetry run python src/scrapers/scrape_to_firebase.py -t SecondSummer -y 2024
-poetry run python src/scrapers/scrape_to_firebase.py -t ExtendedSummer -y 2024
\ No newline at end of file
+poetry run python src/scrapers/scrape_to_firebase.py -t Fall Spring FirstSummer SecondSummer ExtendedSummer -y 2024
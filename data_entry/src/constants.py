@@ -1,3 +1,6 @@
+import importlib.util
+import os
+
 from src.models.enums import Term
 
 
@@ -42,3 +45,52 @@ ideal_ssh_tasks = {
     "SecondSummer": 5,
     "ExtendedSummer": 5,
 }
+
+# Course offering search page, point it at a stand-in registrar for load testing
+REGISTRAR_URL = os.environ.get(
+    "REGISTRAR_URL", "https://www.uprm.edu/registrar/sections/index.php"
+)
+
+# Enrollment server, point it at a stand-in RUMAD for load testing
+RUMAD_HOST = os.environ.get("RUMAD_HOST", "rumad.uprm.edu")
+RUMAD_PORT = int(os.environ.get("RUMAD_PORT", "22"))
+# SSH client for RUMAD: paramiko, or asyncssh which never blocks the event loop
+SSH_BACKEND = os.environ.get("SSH_BACKEND", "paramiko")
+# RUMAD handshakes the channel pool runs at once when it opens
+SSH_CONNECT_CONCURRENCY = int(os.environ.get("SSH_CONNECT_CONCURRENCY", "8"))
+# RUMAD shells opened on each authenticated SSH connection, OpenSSH allows 10
+# sessions per connection and a term switch briefly holds two per shell
+SSH_SHELLS_PER_CONNECTION = int(os.environ.get("SSH_SHELLS_PER_CONNECTION", "4"))
+# Channels a department is tried on before it is stored without availability data
+SSH_DEPARTMENT_ATTEMPTS = int(os.environ.get("SSH_DEPARTMENT_ATTEMPTS", "3"))
+
+# Processes parsing registrar pages off the event loop, 0 parses on the loop itself
+PARSE_WORKERS = int(os.environ.get("PARSE_WORKERS", min(4, os.cpu_count() or 1)))
+
+# Registrar page parser, lxml when it is installed, see section_table_parser
+HTML_PARSER = os.environ.get(
+    "HTML_PARSER", "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+)
+
+# Seconds a department the registrar had no sections for is not asked for again
+NEGATIVE_CACHE_TTL = float(os.environ.get("NEGATIVE_CACHE_TTL", 6 * 60 * 60))
+
+# Registrar HTTP client: connections kept open per host and timeouts in seconds
+HTTP_CONNECTIONS_PER_HOST = int(os.environ.get("HTTP_CONNECTIONS_PER_HOST", "8"))
+HTTP_TOTAL_TIMEOUT = float(os.environ.get("HTTP_TOTAL_TIMEOUT", "60"))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "10"))
+HTTP_READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", "30"))
+
+# Bounds of the adaptive registrar request rate, in requests per second
+MIN_REQUESTS_PER_SECOND = float(os.environ.get("MIN_REQUESTS_PER_SECOND", "0.5"))
+MAX_REQUESTS_PER_SECOND = float(os.environ.get("MAX_REQUESTS_PER_SECOND", "16"))
+# Retries of a failed registrar request per department, and for the whole run
+HTTP_RETRIES = int(os.environ.get("HTTP_RETRIES", "3"))
+HTTP_RETRY_BUDGET = int(os.environ.get("HTTP_RETRY_BUDGET", "100"))
+
+# Departments with more sections than this are fetched as several course number
+# shards at once, 0 fetches every department in one request
+SHARD_SECTIONS = int(os.environ.get("SHARD_SECTIONS", "0"))
+
+# Seconds a department may spend in the web stage, fetches, retries and parsing
+DEPARTMENT_DEADLINE = float(os.environ.get("DEPARTMENT_DEADLINE", "180"))
@@ -0,0 +1,189 @@
+import argparse
+import json
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+except ImportError:  # lxml is optional, html.parser always works
+    lxml = None
+
+HTML_PARSER_BACKENDS = ("html.parser", "lxml")
+
+# libxml2 turns \r\n into \n and NUL into U+FFFD, html.parser keeps both, so they
+# travel through lxml as private use characters and are put back afterwards
+LXML_PLACEHOLDERS = {"\r": "\ue000", "\x00": "\ue001"}
+# pages where libxml2 would build a different tree than html.parser: CDATA,
+# characters clashing with the placeholders, and cells or rows left open, which
+# libxml2 closes but html.parser nests into the cell before them
+LXML_UNSAFE_PATTERN = re.compile(r"<!\[CDATA\[|[\ue000\ue001]")
+OPEN_CELL_PATTERN = re.compile(r"<(td|tr)[\s/>]", re.IGNORECASE)
+CLOSE_CELL_PATTERN = re.compile(r"</(td|tr)\s*>", re.IGNORECASE)
+SECTION_TABLE_XPATH = (
+    "//table[contains(concat(' ', normalize-space(@class), ' '),"
+    " ' section_results ')]"
+)
+
+
+@dataclass(slots=True)
+class SectionTable:
+    """What the web scraper reads from a registrar page, as plain strings."""
+
+    # text of the <pre> under a "WebService Error" heading, if the page is one
+    webservice_error: str | None = None
+    found_table: bool = False
+    # every <tr> of the section_results table, as the text nodes of its <td>s
+    rows: list[list[list[str]]] = field(default_factory=list)
+    title: str = "No title"
+    heading: str = "No heading"
+
+
+def available_backends() -> list[str]:
+    return [
+        backend
+        for backend in HTML_PARSER_BACKENDS
+        if backend != "lxml" or lxml is not None
+    ]
+
+
+def extract_section_table(content: str, backend: str = "html.parser") -> SectionTable:
+    if backend == "lxml" and lxml is not None and is_safe_for_lxml(content):
+        return extract_with_lxml(content)
+    return extract_with_html_parser(content)
+
+
+def is_safe_for_lxml(content: str) -> bool:
+    if LXML_UNSAFE_PATTERN.search(content):
+        return False
+    opened, closed = {"td": 0, "tr": 0}, {"td": 0, "tr": 0}
+    for match in OPEN_CELL_PATTERN.finditer(content):
+        opened[match.group(1).lower()] += 1
+    for match in CLOSE_CELL_PATTERN.finditer(content):
+        closed[match.group(1).lower()] += 1
+    return opened == closed
+
+
+def extract_with_html_parser(content: str) -> SectionTable:
+    soup = BeautifulSoup(content, "html.parser")
+
+    error_h2 = soup.find("h2", string="WebService Error")
+    if error_h2 is not None:
+        error_message = error_h2.find_next("pre")
+        return SectionTable(
+            webservice_error=(
+                error_message.text if error_message else "Unknown WebService Error"
+            )
+        )
+
+    table = soup.find("table", class_="section_results")
+    if table is None:
+        first_heading = soup.find("h1")
+        return SectionTable(
+            title=soup.title.text if soup.title else "No title",
+            heading=first_heading.text if first_heading else "No heading",
+        )
+
+    return SectionTable(
+        found_table=True,
+        rows=[
+            [list(cell.strings) for cell in row.find_all("td")]
+            for row in table.find_all("tr")
+        ],
+    )
+
+
+def extract_with_lxml(content: str) -> SectionTable:
+    for character, placeholder in LXML_PLACEHOLDERS.items():
+        content = content.replace(character, placeholder)
+    # bytes with an explicit encoding, lxml refuses str with an XML declaration
+    document = lxml.html.document_fromstring(
+        content.encode("utf-8"), parser=lxml.html.HTMLParser(encoding="utf-8")
+    )
+
+    for heading in document.iter("h2"):
+        if element_string(heading) == "WebService Error":
+            error_message = heading.xpath("(descendant::pre | following::pre)[1]")
+            return SectionTable(
+                webservice_error=(
+                    element_text(error_message[0])
+                    if error_message
+                    else "Unknown WebService Error"
+                )
+            )
+
+    tables = document.xpath(SECTION_TABLE_XPATH)
+    if not tables:
+        title = document.find(".//title")
+        first_heading = document.find(".//h1")
+        return SectionTable(
+            title=element_text(title) if title is not None else "No title",
+            heading=(
+                element_text(first_heading)
+                if first_heading is not None
+                else "No heading"
+            ),
+        )
+
+    return SectionTable(
+        found_table=True,
+        rows=[
+            [[restore(text) for text in cell.itertext()] for cell in row.iter("td")]
+            for row in tables[0].iter("tr")
+        ],
+    )
+
+
+def restore(text: str) -> str:
+    for character, placeholder in LXML_PLACEHOLDERS.items():
+        text = text.replace(placeholder, character)
+    return text
+
+
+def element_text(element) -> str:
+    return restore("".join(element.itertext()))
+
+
+def element_string(element) -> str | None:
+    """BeautifulSoup's .string: the only text inside, looking through lone children."""
+    children = list(element)
+    if not children:
+        return restore(element.text) if element.text else None
+    if len(children) == 1 and not element.text and not children[0].tail:
+        return element_string(children[0])
+    return None
+
+
+def main():
+    """Checks that every backend reads the pages of --record archives the same."""
+    parser = argparse.ArgumentParser(
+        description="Compare the registrar page parser backends over recorded pages"
+    )
+    parser.add_argument("archives", nargs="+", metavar="ARCHIVE")
+    args = parser.parse_args()
+
+    backends = [
+        backend for backend in available_backends() if backend != "html.parser"
+    ]
+    pages = mismatches = 0
+    for archive in args.archives:
+        with Path(archive).open(encoding="utf-8") as file:
+            for line in file:
+                entry = json.loads(line)
+                if entry.get("kind") != "web" or entry.get("status") != 200:
+                    continue
+                pages += 1
+                expected = extract_section_table(entry["body"], "html.parser")
+                for backend in backends:
+                    if extract_section_table(entry["body"], backend) != expected:
+                        mismatches += 1
+                        print(f"{entry['department']}: {backend} differs")
+    print(f"{pages} pages, {mismatches} mismatches over {', '.join(backends)}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
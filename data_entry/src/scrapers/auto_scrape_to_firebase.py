@@ -1,6 +1,8 @@
+import asyncio
 import datetime
 import sys
-import subprocess
+
+from src.scrapers.scrape_to_firebase import scrape_to_firebase
 
 
 def get_terms():
@@ -18,12 +20,12 @@ def get_terms():
 
 
 def main():
-    for term, year in get_terms():
-        print(f"Starting scraper with term={term}, year={year}")
-        subprocess.run(
-            f"poetry run python src/scrapers/scrape_to_firebase.py -t {term} -y {year} --no-ssh",
-            shell=True,
-        )
+    terms = get_terms()
+    print(
+        f"Starting scraper with terms={', '.join(f'{term} {year}' for term, year in terms)}"
+    )
+    # All terms are scraped concurrently in this process, sharing one session and one Firebase client
+    asyncio.run(scrape_to_firebase(terms=terms, ssh_tasks=0, disable_ssh=True))
 
 
 if __name__ == "__main__":
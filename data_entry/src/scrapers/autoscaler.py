@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Callable, Coroutine
+
+
+class StagePool:
+    """
+    A resizable group of worker tasks consuming one pipeline queue.
+
+    Workers are started with a slot number (so stages bound to a fixed resource,
+    like SSH shells, know which one to use) and must call keep_running() before
+    taking their next item and record() after finishing one.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        input_queue: asyncio.Queue,
+        output_queue: asyncio.Queue | None,
+        spawn: Callable[[int, "StagePool"], Coroutine],
+        min_workers: int,
+        max_workers: int,
+        initial_workers: int,
+    ) -> None:
+        self.name = name
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.spawn = spawn
+        self.min_workers = max(1, min_workers)
+        self.max_workers = max(self.min_workers, max_workers)
+        self.target = min(max(initial_workers, self.min_workers), self.max_workers)
+        self.active = 0
+        self.tasks: dict[int, asyncio.Task] = {}
+        self.service_times: deque[float] = deque(maxlen=50)
+        self.busy_time = 0.0
+
+    def start(self) -> None:
+        for _ in range(self.target):
+            self._spawn_worker()
+
+    def _spawn_worker(self) -> bool:
+        free_slots = [i for i in range(self.max_workers) if i not in self.tasks]
+        if not free_slots:
+            return False
+        slot = free_slots[0]
+        task = asyncio.create_task(self.spawn(slot, self))
+        task.add_done_callback(lambda _, slot=slot: self.tasks.pop(slot, None))
+        self.tasks[slot] = task
+        self.active += 1
+        return True
+
+    def keep_running(self) -> bool:
+        if self.active > self.target:
+            self.active -= 1
+            return False
+        return True
+
+    def record(self, seconds: float) -> None:
+        self.service_times.append(seconds)
+        self.busy_time += seconds
+
+    @property
+    def average_service_time(self) -> float:
+        if not self.service_times:
+            return 0.0
+        return sum(self.service_times) / len(self.service_times)
+
+    def resize(self, target: int, reason: str) -> None:
+        target = min(max(target, self.min_workers), self.max_workers)
+        if target == self.target:
+            return
+        logging.info(
+            f"Autoscaler: {self.name} {self.target} -> {target} workers ({reason}, "
+            f"queue depth {self.input_queue.qsize()}, avg service {self.average_service_time:.2f}s)"
+        )
+        previous = self.target
+        self.target = target
+        for _ in range(target - previous):
+            if not self._spawn_worker():
+                self.target = self.active
+                break
+
+    def adjust(self, interval: float) -> None:
+        depth = self.input_queue.qsize()
+        utilization = self.busy_time / max(self.active * interval, 1e-9)
+        self.busy_time = 0.0
+        if self.output_queue is not None and self.output_queue.full():
+            # downstream is the bottleneck, more workers here would only wait on it
+            self.resize(self.target - 1, "downstream queue full")
+        elif depth > self.active:
+            self.resize(self.target + 1, "backlog")
+        elif depth == 0 and utilization < 0.5:
+            self.resize(self.target - 1, f"utilization {utilization:.0%}")
+
+    def cancel(self) -> None:
+        for task in list(self.tasks.values()):
+            task.cancel()
+
+
+class StageController:
+    """Periodically resizes every stage based on its queue depth and service times."""
+
+    def __init__(self, stages: list[StagePool], interval: float = 5.0) -> None:
+        self.stages = stages
+        self.interval = interval
+
+    async def run(self) -> None:
+        last_tick = time.monotonic()
+        while True:
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            for stage in self.stages:
+                stage.adjust(now - last_tick)
+            last_tick = now
@@ -0,0 +1,231 @@
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+from src.scrapers.log_utils import get_scraper_run_id
+from src.scrapers.metrics import department_key
+
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"
+
+# what a section change is made of, everything else only changes with the catalog
+TRACKED_FIELDS = ("capacity", "usage", "meetings", "professors")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sections (
+    department_key TEXT NOT NULL,
+    course TEXT NOT NULL,
+    section TEXT NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (department_key, course, section)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    recorded_at REAL NOT NULL,
+    run_id TEXT NOT NULL,
+    department TEXT NOT NULL,
+    term TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    course TEXT NOT NULL,
+    section TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    fields TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_changes_department
+    ON changes (department, term, year, seq);
+"""
+
+
+def get_change_log_path() -> Path:
+    return Path("output_files/change_log.sqlite")
+
+
+def section_states(department_data: dict) -> dict[tuple[str, str], dict]:
+    return {
+        (course["courseCode"], section["sectionCode"]): {
+            "capacity": section["capacity"],
+            "usage": section["usage"],
+            "meetings": section["meetings"],
+            "professors": [professor["name"] for professor in section["professors"]],
+        }
+        for course in department_data["courses"].values()
+        for section in course["sections"]
+    }
+
+
+def diff_sections(
+    previous: dict[tuple[str, str], dict], current: dict[tuple[str, str], dict]
+) -> list[tuple[str, str, str, dict]]:
+    """
+    (course, section, kind, fields) for every section that was added, removed or
+    changed. Added and removed sections carry their whole state, changed ones
+    only the fields that moved as [old, new].
+    """
+    changes = []
+    for (course, section), state in current.items():
+        old_state = previous.get((course, section))
+        if old_state is None:
+            changes.append((course, section, ADDED, state))
+            continue
+        fields = {
+            field: [old_state.get(field), state[field]]
+            for field in TRACKED_FIELDS
+            if old_state.get(field) != state[field]
+        }
+        if fields:
+            changes.append((course, section, CHANGED, fields))
+    for (course, section), state in previous.items():
+        if (course, section) not in current:
+            changes.append((course, section, REMOVED, state))
+    return changes
+
+
+class ChangeLog:
+    """
+    Append-only log of section changes between scrapes, next to the last known
+    state of every section it has seen. Readers keep the seq of the last change
+    they handled and ask for what came after it, so notifications, analytics and
+    client sync read a small delta stream instead of whole departments.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path or get_change_log_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # the sink records from a worker thread, one at a time
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.connection.commit()
+
+    def record(self, department_data: dict) -> int:
+        """
+        Diffs a department payload against the last one recorded for it, appends
+        the changes and remembers the payload's sections. Returns the change count.
+        """
+        department = department_data["department"]
+        term = department_data["term"]
+        year = department_data["year"]
+        key = department_key(department, term, year)
+        previous = {
+            (course, section): json.loads(state)
+            for course, section, state in self.connection.execute(
+                "SELECT course, section, state FROM sections WHERE department_key = ?",
+                (key,),
+            )
+        }
+        current = section_states(department_data)
+        changes = diff_sections(previous, current)
+        if not changes:
+            return 0
+
+        recorded_at = time.time()
+        run_id = get_scraper_run_id()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO changes (recorded_at, run_id, department, term, year, "
+                "course, section, kind, fields) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        recorded_at,
+                        run_id,
+                        department,
+                        term,
+                        year,
+                        course,
+                        section,
+                        kind,
+                        json.dumps(fields, ensure_ascii=False, separators=(",", ":")),
+                    )
+                    for course, section, kind, fields in changes
+                ],
+            )
+            self.connection.execute(
+                "DELETE FROM sections WHERE department_key = ?", (key,)
+            )
+            self.connection.executemany(
+                "INSERT INTO sections (department_key, course, section, state) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (
+                        key,
+                        course,
+                        section,
+                        json.dumps(state, ensure_ascii=False, separators=(",", ":")),
+                    )
+                    for (course, section), state in current.items()
+                ],
+            )
+        return len(changes)
+
+    def read(
+        self,
+        cursor: int = 0,
+        limit: int = 1000,
+        department: str | None = None,
+        term: str | None = None,
+        year: int | None = None,
+    ) -> list[dict]:
+        """Changes after cursor in the order they were recorded, at most limit."""
+        query = "SELECT * FROM changes WHERE seq > ?"
+        parameters: list = [cursor]
+        filters = {"department": department, "term": term, "year": year}
+        for column, value in filters.items():
+            if value is not None:
+                query += f" AND {column} = ?"
+                parameters.append(value)
+        query += " ORDER BY seq LIMIT ?"
+        parameters.append(limit)
+        cursor_result = self.connection.execute(query, parameters)
+        columns = [column[0] for column in cursor_result.description]
+        changes = []
+        for row in cursor_result:
+            change = dict(zip(columns, row))
+            change["fields"] = json.loads(change["fields"])
+            changes.append(change)
+        return changes
+
+    def latest_cursor(self) -> int:
+        row = self.connection.execute("SELECT MAX(seq) FROM changes").fetchone()
+        return row[0] or 0
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Print section changes recorded after a cursor as JSON lines",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--since", type=int, default=0, help="Last seq the reader already has"
+    )
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--department")
+    parser.add_argument("--term")
+    parser.add_argument("--year", type=int)
+    parser.add_argument("--path", default=get_change_log_path().as_posix())
+    args = parser.parse_args()
+
+    if not Path(args.path).exists():
+        parser.error(f"no change log at {args.path}")
+    change_log = ChangeLog(Path(args.path))
+    changes = change_log.read(
+        args.since, args.limit, args.department, args.term, args.year
+    )
+    for change in changes:
+        print(json.dumps(change, ensure_ascii=False))
+    # the next call picks up from here
+    print(
+        f"cursor {changes[-1]['seq'] if changes else args.since}", file=sys.stderr
+    )
+    change_log.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Callable
+
+from src.scrapers.metrics import RunMetrics
+
+# stage -> the metrics that make up the time a department occupies a worker there
+STAGE_METRICS = {
+    "web": ("http_fetch", "html_parse"),
+    "ssh": ("ssh_scrape",),
+}
+# weight of the latest run when blending it with the recorded history
+SMOOTHING = 0.5
+
+
+def get_costs_path() -> Path:
+    return Path("output_files/department_costs.json")
+
+
+class DepartmentCosts:
+    """
+    Per-department processing time of each stage, learned from previous runs.
+
+    Used to hand out departments longest-processing-time-first so the big ones
+    don't start last and set the makespan. Departments without history get the
+    average of the known ones, so with no history at all departments.txt order
+    is kept.
+    """
+
+    def __init__(self, costs: dict[str, dict[str, float]] | None = None) -> None:
+        self.costs: dict[str, dict[str, float]] = costs or {}
+
+    @classmethod
+    def from_file(cls, path: Path | None = None) -> "DepartmentCosts":
+        path = path or get_costs_path()
+        if not path.exists():
+            return cls()
+        with path.open() as file:
+            return cls(json.load(file))
+
+    def estimate(self, department: str, stage: str | None = None) -> float:
+        """Predicted seconds for one stage, or for the whole department if stage is None."""
+        stages = [stage] if stage is not None else list(STAGE_METRICS)
+        return sum(self._estimate_stage(department, stage) for stage in stages)
+
+    def _estimate_stage(self, department: str, stage: str) -> float:
+        known = self.costs.get(department, {})
+        if stage in known:
+            return known[stage]
+        history = [costs[stage] for costs in self.costs.values() if stage in costs]
+        return sum(history) / len(history) if history else 0.0
+
+    def update(self, metrics: RunMetrics) -> None:
+        """Blend the per-department stage times of a finished run into the history."""
+        observed: dict[str, dict[str, list[float]]] = {}
+        for key, stages in metrics.departments.items():
+            department = key.split(":", 1)[0]
+            for stage, names in STAGE_METRICS.items():
+                if not any(name in stages for name in names):
+                    continue
+                observed.setdefault(department, {}).setdefault(stage, []).append(
+                    sum(stages.get(name, 0.0) for name in names)
+                )
+        for department, stages in observed.items():
+            known = self.costs.setdefault(department, {})
+            for stage, samples in stages.items():
+                latest = sum(samples) / len(samples)
+                previous = known.get(stage)
+                known[stage] = round(
+                    latest
+                    if previous is None
+                    else SMOOTHING * latest + (1 - SMOOTHING) * previous,
+                    4,
+                )
+
+    def save_file(self, path: Path | None = None) -> None:
+        path = path or get_costs_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".json.tmp")
+        with tmp_path.open("w") as file:
+            json.dump(self.costs, file, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+        logging.info(
+            f"Cost Model: Saved stage times of {len(self.costs)} departments to {path.as_posix()}"
+        )
+
+
+class LongestFirstQueue(asyncio.Queue):
+    """
+    An asyncio.Queue that hands out the item with the highest cost first instead
+    of the oldest one. Items of equal cost come out in insertion order.
+    """
+
+    def __init__(self, cost: Callable[[object], float], maxsize: int = 0) -> None:
+        self.cost = cost
+        self.counter = itertools.count()
+        super().__init__(maxsize)
+
+    def _init(self, maxsize):
+        self._queue = []
+
+    def _put(self, item):
+        heapq.heappush(self._queue, (-self.cost(item), next(self.counter), item))
+
+    def _get(self):
+        return heapq.heappop(self._queue)[2]
+
+    def requeue(self, item) -> None:
+        """
+        Puts back an item a consumer took, even past maxsize. A consumer waiting
+        for room in its own input queue could wait on every other consumer doing
+        the same.
+        """
+        self._put(item)
+        self._unfinished_tasks += 1
+        self._finished.clear()
+        self._wakeup_next(self._getters)
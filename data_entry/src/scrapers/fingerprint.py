@@ -0,0 +1,114 @@
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+
+from src.scrapers.log_utils import ScraperTarget, get_scraper_run_id
+
+
+def compute_fingerprint(department_data: dict) -> str:
+    """
+    Hash the normalized form of a department payload.
+
+    Keys are sorted so that two payloads with the same content always produce
+    the same fingerprint regardless of the order the scraper built them in.
+    """
+    normalized = json.dumps(
+        department_data, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def fingerprint_key(department: str, term: str, year: int) -> str:
+    return f"{department}:{term}:{year}"
+
+
+def get_fingerprints_path(target: ScraperTarget) -> Path:
+    return Path(f"output_files/fingerprints/{target.value}.json")
+
+
+def load_fingerprints_file(target: ScraperTarget) -> dict[str, str]:
+    path = get_fingerprints_path(target)
+    if not path.exists():
+        return {}
+    with path.open() as file:
+        return json.load(file)
+
+
+class FingerprintStore:
+    """
+    Remembers the fingerprint of the last payload each target successfully stored
+    for every (department, term, year), so unchanged departments can be skipped.
+    """
+
+    def __init__(
+        self,
+        fingerprints: dict[str, str] | None = None,
+        full: bool = False,
+        name: str = "",
+    ):
+        self.fingerprints: dict[str, str] = fingerprints or {}
+        self.full = full
+        self.name = name
+        self.skipped: list[str] = []
+        self.rewritten: list[str] = []
+        logging.info(
+            f"Fingerprints: Loaded {len(self.fingerprints)} fingerprints {name}".rstrip()
+            + (" (ignored, full scrape requested)" if full else "")
+        )
+
+    @classmethod
+    def from_file(cls, target: ScraperTarget, full: bool = False) -> "FingerprintStore":
+        return cls(load_fingerprints_file(target), full=full)
+
+    def is_unchanged(self, department_data: dict) -> bool:
+        """Returns True (and records the skip) if the payload matches the stored one."""
+        key = fingerprint_key(
+            department_data["department"],
+            department_data["term"],
+            department_data["year"],
+        )
+        if self.full:
+            return False
+        if self.fingerprints.get(key) == compute_fingerprint(department_data):
+            self.skipped.append(key)
+            return True
+        return False
+
+    def mark_stored(self, department_data: dict) -> None:
+        """Call once the target has committed the payload."""
+        key = fingerprint_key(
+            department_data["department"],
+            department_data["term"],
+            department_data["year"],
+        )
+        self.fingerprints[key] = compute_fingerprint(department_data)
+        self.rewritten.append(key)
+
+    def save_file(self, target: ScraperTarget) -> None:
+        path = get_fingerprints_path(target)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".json.tmp")
+        with tmp_path.open("w") as file:
+            json.dump(self.fingerprints, file, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def write_report(self) -> None:
+        report_name = f"incremental_report_{self.name}" if self.name else "incremental_report"
+        report_path = Path(f"output_files/{get_scraper_run_id()}/{report_name}.json")
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        with report_path.open("w") as file:
+            json.dump(
+                {
+                    "full": self.full,
+                    "skipped": sorted(self.skipped),
+                    "rewritten": sorted(self.rewritten),
+                },
+                file,
+                indent=2,
+            )
+        logging.info(
+            f"Fingerprints: {self.name + ': ' if self.name else ''}{len(self.rewritten)} departments rewritten, "
+            f"{len(self.skipped)} skipped as unchanged. Report: {report_path.as_posix()}"
+        )
@@ -0,0 +1,110 @@
+import sqlite3
+import time
+from pathlib import Path
+
+from src.constants import NEGATIVE_CACHE_TTL
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    body TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS empty_departments (
+    department_key TEXT PRIMARY KEY,
+    reason TEXT NOT NULL,
+    checked_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def get_http_cache_path() -> Path:
+    return Path("output_files/http_cache.sqlite")
+
+
+class HttpCache:
+    """
+    Registrar pages kept across runs with the ETag and Last-Modified they came
+    with, so the next run can ask for them conditionally and reuse the body on a
+    304. Departments the registrar had no sections for are remembered for
+    negative_ttl seconds and are not asked for again until then.
+    """
+
+    def __init__(
+        self, path: Path | None = None, negative_ttl: float = NEGATIVE_CACHE_TTL
+    ) -> None:
+        self.path = path or get_http_cache_path()
+        self.negative_ttl = negative_ttl
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.connection.commit()
+
+    def conditional_headers(self, url: str) -> dict[str, str]:
+        """Validators of the cached response for url, as request headers."""
+        row = self.connection.execute(
+            "SELECT etag, last_modified FROM responses WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return {}
+        etag, last_modified = row
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def body(self, url: str) -> str | None:
+        row = self.connection.execute(
+            "SELECT body FROM responses WHERE url = ?", (url,)
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def store(
+        self, url: str, body: str, etag: str | None, last_modified: str | None
+    ) -> None:
+        """Keeps a 200 response, only if the server gave something to revalidate."""
+        with self.connection:
+            if not etag and not last_modified:
+                self.connection.execute("DELETE FROM responses WHERE url = ?", (url,))
+                return
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(url, etag, last_modified, body, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, body, time.time()),
+            )
+
+    def forget(self, url: str) -> None:
+        """Drops the cached response for url, so it is next asked for in full."""
+        with self.connection:
+            self.connection.execute("DELETE FROM responses WHERE url = ?", (url,))
+
+    def is_known_empty(self, key: str) -> bool:
+        row = self.connection.execute(
+            "SELECT checked_at FROM empty_departments WHERE department_key = ?",
+            (key,),
+        ).fetchone()
+        # read against the current ttl, so a ttl of 0 probes every department
+        return row is not None and row[0] + self.negative_ttl > time.time()
+
+    def mark_empty(self, key: str, reason: str) -> None:
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO empty_departments "
+                "(department_key, reason, checked_at) VALUES (?, ?, ?)",
+                (key, reason, time.time()),
+            )
+
+    def mark_found(self, key: str) -> None:
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM empty_departments WHERE department_key = ?", (key,)
+            )
+
+    def close(self) -> None:
+        self.connection.close()
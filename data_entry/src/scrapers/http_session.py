@@ -0,0 +1,74 @@
+import time
+from types import SimpleNamespace
+
+import aiohttp
+
+from src.constants import (
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_CONNECTIONS_PER_HOST,
+    HTTP_READ_TIMEOUT,
+    HTTP_TOTAL_TIMEOUT,
+)
+from src.scrapers.metrics import RunMetrics, get_run_metrics
+
+# seconds an idle registrar connection is kept for the next request
+KEEPALIVE_TIMEOUT = 30
+# seconds resolved registrar addresses are reused
+DNS_CACHE_TTL = 300
+
+
+def connection_trace(metrics: RunMetrics) -> aiohttp.TraceConfig:
+    """Counts new and reused connections and DNS lookups into the run metrics."""
+    trace = aiohttp.TraceConfig()
+
+    async def on_connection_create_start(session, context: SimpleNamespace, params):
+        context.connect_started = time.perf_counter()
+
+    async def on_connection_create_end(session, context: SimpleNamespace, params):
+        metrics.increment("http_connections_created")
+        metrics.observe("http_connect", time.perf_counter() - context.connect_started)
+
+    async def on_connection_reuseconn(session, context, params):
+        metrics.increment("http_connections_reused")
+
+    async def on_dns_cache_hit(session, context, params):
+        metrics.increment("http_dns_cache_hit")
+
+    async def on_dns_cache_miss(session, context, params):
+        metrics.increment("http_dns_cache_miss")
+
+    trace.on_connection_create_start.append(on_connection_create_start)
+    trace.on_connection_create_end.append(on_connection_create_end)
+    trace.on_connection_reuseconn.append(on_connection_reuseconn)
+    trace.on_dns_cache_hit.append(on_dns_cache_hit)
+    trace.on_dns_cache_miss.append(on_dns_cache_miss)
+    return trace
+
+
+def create_session(
+    connections_per_host: int = HTTP_CONNECTIONS_PER_HOST,
+    total_timeout: float = HTTP_TOTAL_TIMEOUT,
+    connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+    read_timeout: float = HTTP_READ_TIMEOUT,
+) -> aiohttp.ClientSession:
+    """
+    The one session every web scraper task of a run shares. Connections to the
+    registrar stay open between departments, at most connections_per_host at
+    once, and a request that hangs gives up after the timeouts instead of holding
+    its worker forever.
+    """
+    connector = aiohttp.TCPConnector(
+        limit_per_host=connections_per_host,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=DNS_CACHE_TTL,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(
+            total=total_timeout, connect=connect_timeout, sock_read=read_timeout
+        ),
+        # pages are plain HTML, compressed they are a fraction of the transfer
+        headers={"Accept-Encoding": "gzip, deflate"},
+        auto_decompress=True,
+        trace_configs=[connection_trace(get_run_metrics())],
+    )
@@ -0,0 +1,197 @@
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+from src.scrapers.fingerprint import compute_fingerprint, fingerprint_key
+from src.scrapers.log_utils import get_scraper_run_id
+
+# Stages a department goes through, in order. "empty" is terminal: the registrar
+# had nothing for the department so there is nothing to store. "failed" is not:
+# the registrar could not be asked, so a resumed run asks again.
+QUEUED = "queued"
+WEB = "web"
+EMPTY = "empty"
+FAILED = "failed"
+SSH = "ssh"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS run (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    config TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS departments (
+    key TEXT PRIMARY KEY,
+    department TEXT NOT NULL,
+    term TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    stage TEXT NOT NULL,
+    payload_hash TEXT,
+    payload TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sink_acks (
+    key TEXT NOT NULL,
+    sink TEXT NOT NULL,
+    payload_hash TEXT NOT NULL,
+    acked_at REAL NOT NULL,
+    PRIMARY KEY (key, sink)
+);
+"""
+
+
+def get_journal_path(run_id: str | None = None) -> Path:
+    return Path(f"output_files/{run_id or get_scraper_run_id()}/journal.sqlite")
+
+
+class RunJournal:
+    """
+    Durable record of how far every department of a run got, so a crashed run can
+    be resumed with --resume <run id> instead of starting over.
+
+    Each stage transition is committed before the department moves on, so after a
+    crash the journal never claims more progress than actually happened. The payload
+    reached at the last stage is kept so the resumed run can pick up from there.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        # WAL keeps every commit durable without an fsync of the whole file
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.connection.commit()
+
+    @classmethod
+    def open(cls, run_id: str | None = None) -> "RunJournal":
+        return cls(get_journal_path(run_id))
+
+    @classmethod
+    def open_existing(cls, run_id: str) -> "RunJournal":
+        path = get_journal_path(run_id)
+        if not path.exists():
+            raise FileNotFoundError(f"No journal found for run {run_id} at {path}")
+        return cls(path)
+
+    def save_config(self, config: dict) -> None:
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO run (id, config) VALUES (1, ?)",
+                (json.dumps(config),),
+            )
+
+    def load_config(self) -> dict:
+        row = self.connection.execute("SELECT config FROM run WHERE id = 1").fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def queued(self, department: str, term: str, year: int) -> None:
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR IGNORE INTO departments (key, department, term, year, stage, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    fingerprint_key(department, term, year),
+                    department,
+                    term,
+                    year,
+                    QUEUED,
+                    time.time(),
+                ),
+            )
+
+    def reached(
+        self, department: str, term: str, year: int, stage: str, payload: dict | None
+    ) -> None:
+        """Record that a department finished a stage, along with its payload."""
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO departments "
+                "(key, department, term, year, stage, payload_hash, payload, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    fingerprint_key(department, term, year),
+                    department,
+                    term,
+                    year,
+                    stage,
+                    compute_fingerprint(payload) if payload is not None else None,
+                    json.dumps(payload, ensure_ascii=False) if payload is not None else None,
+                    time.time(),
+                ),
+            )
+
+    def acked(self, department_data: dict, sink: str) -> None:
+        """Record that a sink durably stored (or deliberately skipped) a payload."""
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO sink_acks (key, sink, payload_hash, acked_at) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    fingerprint_key(
+                        department_data["department"],
+                        department_data["term"],
+                        department_data["year"],
+                    ),
+                    sink,
+                    compute_fingerprint(department_data),
+                    time.time(),
+                ),
+            )
+
+    def is_acked(self, department_data: dict, sink: str) -> bool:
+        row = self.connection.execute(
+            "SELECT payload_hash FROM sink_acks WHERE key = ? AND sink = ?",
+            (
+                fingerprint_key(
+                    department_data["department"],
+                    department_data["term"],
+                    department_data["year"],
+                ),
+                sink,
+            ),
+        ).fetchone()
+        return row is not None and row[0] == compute_fingerprint(department_data)
+
+    def progress(self, department: str, term: str, year: int) -> tuple[str, dict | None]:
+        """Returns the last stage a department reached and the payload it had there."""
+        row = self.connection.execute(
+            "SELECT stage, payload FROM departments WHERE key = ?",
+            (fingerprint_key(department, term, year),),
+        ).fetchone()
+        if row is None:
+            return QUEUED, None
+        stage, payload = row
+        return stage, json.loads(payload) if payload is not None else None
+
+    def is_finished(self, department: str, term: str, year: int, sinks: list[str]) -> bool:
+        key = fingerprint_key(department, term, year)
+        row = self.connection.execute(
+            "SELECT stage, payload_hash FROM departments WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return False
+        stage, payload_hash = row
+        if stage == EMPTY:
+            return True
+        if stage != SSH:
+            return False
+        acked = {
+            sink
+            for (sink,) in self.connection.execute(
+                "SELECT sink FROM sink_acks WHERE key = ? AND payload_hash = ?",
+                (key, payload_hash),
+            )
+        }
+        return acked.issuperset(sinks)
+
+    def acked_fingerprints(self, sink: str) -> dict[str, str]:
+        return dict(
+            self.connection.execute(
+                "SELECT key, payload_hash FROM sink_acks WHERE sink = ?", (sink,)
+            ).fetchall()
+        )
+
+    def close(self) -> None:
+        self.connection.close()
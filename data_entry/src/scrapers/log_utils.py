@@ -10,14 +10,28 @@ import functools
 class ScraperTarget(enum.StrEnum):
     Firebase = "firebase"
     SQLite = "sqlite"
+    JSONL = "jsonl"
+    ChangeLog = "changelog"
+
+
+resumed_run_id: str | None = None
 
 
 @functools.cache  # cache to avoid changing time
 def get_scraper_run_id() -> str:
+    if resumed_run_id is not None:
+        return resumed_run_id
     return f"scraper_run_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
 
-def configure_logging(scraper: ScraperTarget):
+def resume_scraper_run(run_id: str) -> None:
+    """Make this process continue an earlier run, writing to its logs and outputs."""
+    global resumed_run_id
+    resumed_run_id = run_id
+    get_scraper_run_id.cache_clear()
+
+
+def configure_logging(*scrapers: ScraperTarget):
     if not os.path.exists("logs"):
         os.makedirs("logs")
 
@@ -25,7 +39,9 @@ def configure_logging(scraper: ScraperTarget):
         level=logging.INFO,
         format="%(asctime)s - %(levelname)s - %(message)s",
         handlers=[
-            logging.FileHandler(f"logs/{scraper.value}_{get_scraper_run_id()}.log"),
+            logging.FileHandler(
+                f"logs/{'_'.join(scraper.value for scraper in scrapers)}_{get_scraper_run_id()}.log"
+            ),
             logging.StreamHandler(sys.stdout),
         ],
     )
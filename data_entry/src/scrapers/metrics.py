@@ -0,0 +1,205 @@
+import asyncio
+import bisect
+import contextlib
+import functools
+import json
+import logging
+import time
+from pathlib import Path
+
+from src.scrapers.log_utils import get_scraper_run_id
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+)
+
+
+def department_key(department: str, term: str, year: int) -> str:
+    return f"{department}:{term}:{year}"
+
+
+def percentile(sorted_samples: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(0, min(len(sorted_samples) - 1, round(fraction * len(sorted_samples)) - 1))
+    return sorted_samples[rank]
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)  # last one is +Inf
+        self.samples: list[float] = []
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.samples.append(value)
+        self.total += value
+
+    @property
+    def count(self) -> int:
+        return len(self.samples)
+
+    def summary(self) -> dict:
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "max": round(ordered[-1], 6) if ordered else 0.0,
+            "p50": round(percentile(ordered, 0.50), 6),
+            "p95": round(percentile(ordered, 0.95), 6),
+            "p99": round(percentile(ordered, 0.99), 6),
+            "buckets": {
+                str(bound): count
+                for bound, count in zip(
+                    list(self.buckets) + ["+Inf"], self.cumulative_counts()
+                )
+            },
+        }
+
+    def cumulative_counts(self) -> list[int]:
+        result, running = [], 0
+        for count in self.bucket_counts:
+            running += count
+            result.append(running)
+        return result
+
+
+class RunMetrics:
+    """
+    Latency histograms per pipeline stage, plus per-department stage totals so the
+    departments that dominate the tail can be found after a run.
+    """
+
+    def __init__(self) -> None:
+        self.stages: dict[str, Histogram] = {}
+        self.departments: dict[str, dict[str, float]] = {}
+        self.counters: dict[str, float] = {}
+        self.enqueued_at: dict[tuple[str, str], float] = {}
+        self.started_at = time.time()
+
+    def observe(self, stage: str, seconds: float, department: str | None = None):
+        self.stages.setdefault(stage, Histogram()).observe(seconds)
+        if department is not None:
+            stages = self.departments.setdefault(department, {})
+            stages[stage] = stages.get(stage, 0.0) + seconds
+
+    def increment(self, name: str, value: float = 1, department: str | None = None):
+        self.counters[name] = self.counters.get(name, 0) + value
+        if department is not None:
+            stages = self.departments.setdefault(department, {})
+            stages[name] = stages.get(name, 0) + value
+
+    @contextlib.contextmanager
+    def timer(self, stage: str, department: str | None = None):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started, department)
+
+    def enqueued(self, queue: str, department: str) -> None:
+        self.enqueued_at[(queue, department)] = time.perf_counter()
+
+    def dequeued(self, queue: str, department: str) -> None:
+        enqueued_at = self.enqueued_at.pop((queue, department), None)
+        if enqueued_at is not None:
+            self.observe(
+                f"{queue}_queue_wait", time.perf_counter() - enqueued_at, department
+            )
+
+    def to_dict(self) -> dict:
+        return {
+            "run_id": get_scraper_run_id(),
+            "wall_time": round(time.time() - self.started_at, 3),
+            "stages": {
+                stage: histogram.summary()
+                for stage, histogram in sorted(self.stages.items())
+            },
+            "counters": dict(sorted(self.counters.items())),
+            "departments": {
+                department: {name: round(value, 6) for name, value in stages.items()}
+                for department, stages in sorted(self.departments.items())
+            },
+        }
+
+    def to_prometheus(self) -> str:
+        lines = [
+            "# HELP scraper_stage_seconds Time spent per department in each scraper stage",
+            "# TYPE scraper_stage_seconds histogram",
+        ]
+        for stage, histogram in sorted(self.stages.items()):
+            for bound, count in zip(
+                list(histogram.buckets) + ["+Inf"], histogram.cumulative_counts()
+            ):
+                lines.append(
+                    f'scraper_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}'
+                )
+            lines.append(f'scraper_stage_seconds_sum{{stage="{stage}"}} {histogram.total}')
+            lines.append(
+                f'scraper_stage_seconds_count{{stage="{stage}"}} {histogram.count}'
+            )
+        lines.append("# HELP scraper_counter Scraper run counters")
+        lines.append("# TYPE scraper_counter gauge")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f'scraper_counter{{name="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def summary_table(self, slowest: int = 3) -> str:
+        rows = ["Stage                          count      p50      p95      p99   slowest"]
+        for stage, histogram in sorted(self.stages.items()):
+            summary = histogram.summary()
+            tail = sorted(
+                (
+                    (stages[stage], department)
+                    for department, stages in self.departments.items()
+                    if stage in stages
+                ),
+                reverse=True,
+            )[:slowest]
+            rows.append(
+                f"{stage:<30} {summary['count']:>5} {summary['p50']:>8.3f} {summary['p95']:>8.3f} "
+                f"{summary['p99']:>8.3f}   {', '.join(f'{d} ({s:.2f}s)' for s, d in tail)}"
+            )
+        return "\n".join(rows)
+
+    def write(self, directory: str | None = None) -> Path:
+        output_dir = Path(directory or f"output_files/{get_scraper_run_id()}")
+        output_dir.mkdir(parents=True, exist_ok=True)
+        with (output_dir / "metrics.json").open("w") as file:
+            json.dump(self.to_dict(), file, indent=2)
+        with (output_dir / "metrics.prom").open("w") as file:
+            file.write(self.to_prometheus())
+        logging.info(f"Metrics: Wrote run metrics to {output_dir.as_posix()}")
+        return output_dir
+
+
+async def watch_event_loop(metrics: RunMetrics, interval: float = 0.05) -> None:
+    """
+    Records how late every wake-up comes as event_loop_stall: time the loop spent
+    in code that never yielded, while sockets and SSH channels went unserviced.
+    """
+    while True:
+        due = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        metrics.observe("event_loop_stall", max(0.0, time.perf_counter() - due))
+
+
+@functools.cache  # one metrics surface per scraper run, like the run id
+def get_run_metrics() -> RunMetrics:
+    return RunMetrics()
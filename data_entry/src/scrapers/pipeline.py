@@ -0,0 +1,479 @@
+import asyncio
+import json
+import logging
+import time
+
+from src.constants import (
+    DEPARTMENT_DEADLINE,
+    HTML_PARSER,
+    HTTP_RETRIES,
+    MAX_REQUESTS_PER_SECOND,
+    NEGATIVE_CACHE_TTL,
+    PARSE_WORKERS,
+    REGISTRAR_URL,
+    RUMAD_HOST,
+    RUMAD_PORT,
+    SHARD_SECTIONS,
+    SSH_BACKEND,
+    SSH_SHELLS_PER_CONNECTION,
+    db_to_rumad_terms,
+)
+from src.scrapers.autoscaler import StageController, StagePool
+from src.scrapers.cost_model import DepartmentCosts, LongestFirstQueue
+from src.scrapers.fingerprint import FingerprintStore
+from src.scrapers.http_cache import HttpCache
+from src.scrapers.http_session import create_session
+from src.scrapers.journal import SSH, RunJournal
+from src.scrapers.log_utils import (
+    configure_logging,
+    get_scraper_run_id,
+    resume_scraper_run,
+)
+from src.scrapers.metrics import department_key, get_run_metrics, watch_event_loop
+from src.scrapers.professor_index import ProfessorIndex
+from src.scrapers.rate_limit import AdaptiveLimiter, HedgePolicy, RetryPolicy
+from src.scrapers.shards import ShardPlanner
+from src.scrapers.sinks.base import Sink
+from src.scrapers.recording import Recorder, Replay
+from src.scrapers.ssh_scraper import SSHChannelPool, replay_ssh_task, ssh_scraper_task
+from src.scrapers.web_scraper import start_parse_pool, web_scraper_task
+
+
+async def pass_through_queue_task(
+    source_queue: asyncio.Queue,
+    destination_queue: asyncio.Queue,
+    journal: RunJournal | None = None,
+):
+    metrics = get_run_metrics()
+    while True:
+        data = await source_queue.get()
+        key = department_key(data["department"], data["term"], data["year"])
+        metrics.dequeued("ssh", key)
+        if journal is not None:
+            journal.reached(data["department"], data["term"], data["year"], SSH, data)
+        source_queue.task_done()
+        metrics.enqueued("db", key)
+        await destination_queue.put(data)
+
+
+async def fan_out_task(
+    db_queue: asyncio.Queue, sink_queues: list[asyncio.Queue], sinks: list[Sink]
+):
+    metrics = get_run_metrics()
+    while True:
+        data = await db_queue.get()
+        key = department_key(data["department"], data["term"], data["year"])
+        metrics.dequeued("db", key)
+        # a sink only holds the others back once it is a whole queue behind them
+        for sink, sink_queue in zip(sinks, sink_queues):
+            metrics.enqueued(f"sink_{sink.name}", key)
+            await sink_queue.put(data)
+        db_queue.task_done()
+
+
+async def sink_task(
+    sink: Sink,
+    sink_queue: asyncio.Queue,
+    fingerprints: FingerprintStore,
+    stage: StagePool | None = None,
+    journal: RunJournal | None = None,
+):
+    metrics = get_run_metrics()
+    while stage is None or stage.keep_running():
+        data = await sink_queue.get()
+        department = data["department"]
+        key = department_key(department, data["term"], data["year"])
+        metrics.dequeued(f"sink_{sink.name}", key)
+        started = time.monotonic()
+        try:
+            if journal is not None and journal.is_acked(data, sink.name):
+                logging.info(
+                    f"Sink {sink.name}: {department} was stored before the run was interrupted"
+                )
+                await sink.skip(data)
+            elif sink.skip_unchanged and fingerprints.is_unchanged(data):
+                logging.info(
+                    f"Sink {sink.name}: {department} is unchanged, skipping write"
+                )
+                metrics.increment(f"sink_{sink.name}_skipped", 1, key)
+                await sink.skip(data)
+                if journal is not None:
+                    journal.acked(data, sink.name)
+            else:
+                with metrics.timer(f"sink_{sink.name}_write", key):
+                    stored = await sink.write(data)
+                if stored:
+                    fingerprints.mark_stored(data)
+                    if journal is not None:
+                        journal.acked(data, sink.name)
+        except Exception as e:
+            logging.exception(
+                f"Sink {sink.name}: Error storing {department}: {str(e)}"
+            )
+        finally:
+            sink_queue.task_done()
+            if stage is not None:
+                stage.record(time.monotonic() - started)
+
+
+async def run_pipeline(
+    terms: list[tuple[str, int]],
+    sinks: list[Sink],
+    ssh_tasks: int,
+    disable_ssh: bool = False,
+    full: bool = False,
+    queue_size: int = 16,
+    web_tasks: int = 4,
+    max_web_tasks: int = 8,
+    resume: str | None = None,
+    record: bool = False,
+    replay: Replay | None = None,
+    registrar_url: str = REGISTRAR_URL,
+    requests_per_second: float = 4,
+    max_requests_per_second: float = MAX_REQUESTS_PER_SECOND,
+    retries: int = HTTP_RETRIES,
+    shard_sections: int = SHARD_SECTIONS,
+    hedge: bool = True,
+    department_deadline: float = DEPARTMENT_DEADLINE,
+    rumad_host: str = RUMAD_HOST,
+    rumad_port: int = RUMAD_PORT,
+    ssh_backend: str = SSH_BACKEND,
+    ssh_shells_per_connection: int = SSH_SHELLS_PER_CONNECTION,
+    parse_workers: int = PARSE_WORKERS,
+    html_parser: str = HTML_PARSER,
+    http_cache: bool = True,
+    negative_cache_ttl: float = NEGATIVE_CACHE_TTL,
+):
+    # Set up logging
+    if resume is not None:
+        resume_scraper_run(resume)
+    configure_logging(*(sink.target for sink in sinks))
+    for db_term, year in terms:
+        logging.info(f"Starting scraping of {db_term} {year}-{year+1}")
+    # departments of a term RUMAD does not know pass through the SSH stage as they are
+    rumad_terms = [
+        db_to_rumad_terms[db_term]
+        for db_term, _ in terms
+        if db_term in db_to_rumad_terms
+    ]
+    if not rumad_terms and not disable_ssh:
+        logging.warning(
+            "None of the terms are in db_to_rumad_terms. SSH scraping will be skipped."
+        )
+        disable_ssh = True
+    logging.info(f"Storing to {', '.join(sink.name for sink in sinks)}")
+    metrics = get_run_metrics()
+    loop_watcher = asyncio.create_task(watch_event_loop(metrics))
+    recorder = Recorder() if record else None
+    if replay is not None:
+        logging.info(f"Replay: Loaded {replay.describe()}, nothing will be fetched")
+
+    if resume is not None:
+        journal = RunJournal.open_existing(resume)
+        logging.info(f"Resuming run {resume} from {journal.path.as_posix()}")
+    else:
+        journal = RunJournal.open()
+        journal.save_config(
+            {
+                "terms": terms,
+                "sinks": [sink.target.value for sink in sinks],
+                "disable_ssh": disable_ssh,
+                "full": full,
+                "record": record,
+                "replay": replay.path.as_posix() if replay is not None else None,
+            }
+        )
+        logging.info(
+            f"Journal: Recording progress in {journal.path.as_posix()}, "
+            f"continue an interrupted run with --resume {get_scraper_run_id()}"
+        )
+
+    fingerprint_stores = []
+    for sink in sinks:
+        await sink.open(terms)
+        fingerprints = await sink.load_fingerprints(terms)
+        # what the interrupted run already stored never made it to the fingerprint file
+        fingerprints.update(journal.acked_fingerprints(sink.name))
+        fingerprint_stores.append(
+            FingerprintStore(fingerprints, full=full, name=sink.name)
+        )
+
+    with open("input_files/professor_ids.txt") as file:
+        # indexed once here, every section's professors are looked up in it
+        professor_ids = ProfessorIndex(json.load(file))
+    with open("input_files/departments.txt") as file:
+        departments = [department.strip() for department in file]
+    # registrar pages are parsed in worker processes so the loop keeps fetching
+    parse_pool = await start_parse_pool(parse_workers, professor_ids)
+    if parse_pool is not None:
+        logging.info(
+            f"Parsing registrar pages with {html_parser} "
+            f"in {parse_workers} worker processes"
+        )
+    # stage times of earlier runs decide who goes first, departments.txt breaks ties
+    costs = DepartmentCosts.from_file()
+    # section counts of earlier runs decide which departments get split up
+    shard_planner = ShardPlanner.from_file(shard_sections)
+
+    def ssh_cost(department_data: dict) -> float:
+        # without any SSH history, section count is the best guess of RUMAD pages
+        return costs.estimate(department_data["department"], "ssh") or sum(
+            len(course["sections"]) for course in department_data["courses"].values()
+        )
+
+    # Departments will travel like so: File -> Web Queue -> SSH Queue -> DB Queue -> Sink Queues
+    # ssh queue and db queue have dictionary representations of all the courses in a department,
+    # so they are bounded to keep memory flat and make slow stages throttle the ones before them
+    web_queue: asyncio.Queue[tuple[str, str, int]] = asyncio.Queue()
+    ssh_queue: asyncio.Queue[dict] = LongestFirstQueue(ssh_cost, maxsize=queue_size)
+    db_queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=queue_size)
+    sink_queues: list[asyncio.Queue[dict]] = [
+        asyncio.Queue(maxsize=queue_size * 2) for _ in sinks
+    ]
+    # every term shares the same request budget, HTTP session and SSH channels
+    # starts at requests_per_second and follows how well the registrar keeps up
+    web_request_limiter = AdaptiveLimiter(
+        requests_per_second, max_rate=max_requests_per_second
+    )
+    retry = RetryPolicy(attempts=retries + 1)
+    # requests slower than the run's p95 so far get a duplicate
+    hedge_policy = HedgePolicy() if hedge else None
+    ssh_pool = SSHChannelPool(
+        ssh_tasks if not disable_ssh and replay is None else 0,
+        rumad_host,
+        rumad_port,
+        ssh_backend,
+        shells_per_connection=ssh_shells_per_connection,
+    )
+    session = create_session()
+    # unchanged pages come back as a 304, empty departments are not asked for
+    cache = (
+        HttpCache(negative_ttl=negative_cache_ttl)
+        if http_cache and replay is None
+        else None
+    )
+
+    # populate Web Queue longest job first across every term,
+    # leaving out what a resumed run already finished
+    finished = 0
+    for department, db_term, year in sorted(
+        (
+            (department, db_term, year)
+            for db_term, year in terms
+            for department in departments
+        ),
+        key=lambda item: costs.estimate(item[0]),
+        reverse=True,
+    ):
+        if journal.is_finished(
+            department, db_term, year, [sink.name for sink in sinks]
+        ):
+            finished += 1
+            _, data = journal.progress(department, db_term, year)
+            if data is not None:
+                # sinks summing up the run, like Firestore's department list,
+                # still count what the interrupted run stored
+                for sink in sinks:
+                    await sink.skip(data)
+            continue
+        journal.queued(department, db_term, year)
+        metrics.enqueued("web", department_key(department, db_term, year))
+        web_queue.put_nowait((department, db_term, year))
+    if resume is not None:
+        logging.info(
+            f"Resume: {finished} departments already finished, {web_queue.qsize()} left to do"
+        )
+
+    # Create and queue up tasks to scrape course data from UPRM course offering website
+    stages = [
+        StagePool(
+            name="web",
+            input_queue=web_queue,
+            output_queue=ssh_queue,
+            spawn=lambda _, stage: web_scraper_task(
+                web_queue=web_queue,
+                ssh_queue=ssh_queue,
+                session=session,
+                professor_ids=professor_ids,
+                rate_limit=web_request_limiter,
+                stage=stage,
+                journal=journal,
+                recorder=recorder,
+                replay=replay,
+                registrar_url=registrar_url,
+                parse_pool=parse_pool,
+                html_parser=html_parser,
+                http_cache=cache,
+                retry=retry,
+                shard_planner=shard_planner,
+                hedge=hedge_policy,
+                deadline=department_deadline or None,
+            ),
+            min_workers=1,
+            max_workers=max_web_tasks,
+            initial_workers=web_tasks,
+        )
+    ]
+
+    # Create and queue up tasks to scrape section availability from UPRM enrollment server
+    if disable_ssh:
+        logging.info("SSH scraping disabled. Only using web data.")
+        pass_through = asyncio.create_task(
+            pass_through_queue_task(
+                source_queue=ssh_queue, destination_queue=db_queue, journal=journal
+            )
+        )
+    elif replay is not None:
+        stages.append(
+            StagePool(
+                name="ssh",
+                input_queue=ssh_queue,
+                output_queue=db_queue,
+                # parsing recorded pages never waits, more workers would only take turns
+                spawn=lambda _, stage: replay_ssh_task(
+                    ssh_queue=ssh_queue,
+                    db_queue=db_queue,
+                    replay=replay,
+                    stage=stage,
+                    journal=journal,
+                ),
+                min_workers=1,
+                max_workers=1,
+                initial_workers=1,
+            )
+        )
+    else:
+        # channels each department already broke, across every worker of the stage
+        ssh_attempts: dict[str, int] = {}
+        # every shell connects at once and is on the first term before any department
+        await ssh_pool.open(rumad_terms[0])
+        stages.append(
+            StagePool(
+                name="ssh",
+                input_queue=ssh_queue,
+                output_queue=db_queue,
+                # each worker borrows a shell of the pool per department
+                spawn=lambda slot, stage: ssh_scraper_task(
+                    ssh_queue=ssh_queue,
+                    db_queue=db_queue,
+                    pool=ssh_pool,
+                    stage=stage,
+                    journal=journal,
+                    recorder=recorder,
+                    slot=slot,
+                    attempts=ssh_attempts,
+                ),
+                min_workers=1,
+                max_workers=ssh_pool.size,
+                initial_workers=ssh_pool.size,
+            )
+        )
+
+    # Every sink gets its own queue and workers so a slow sink can't stall the others
+    fan_out = asyncio.create_task(fan_out_task(db_queue, sink_queues, sinks))
+    for sink, sink_queue, fingerprints in zip(sinks, sink_queues, fingerprint_stores):
+        stages.append(
+            StagePool(
+                name=f"sink {sink.name}",
+                input_queue=sink_queue,
+                output_queue=None,
+                spawn=lambda _, stage, sink=sink, sink_queue=sink_queue, fingerprints=fingerprints: sink_task(
+                    sink, sink_queue, fingerprints, stage, journal
+                ),
+                min_workers=1,
+                max_workers=sink.max_workers,
+                initial_workers=1,
+            )
+        )
+
+    for stage in stages:
+        stage.start()
+    controller = asyncio.create_task(StageController(stages).run())
+
+    await web_queue.join()
+    logging.info("All web scraper tasks have completed.")
+    await ssh_queue.join()
+    logging.info("All ssh scraper tasks have completed.")
+    await db_queue.join()
+    for sink, sink_queue in zip(sinks, sink_queues):
+        await sink_queue.join()
+        logging.info(f"All {sink.name} sink tasks have completed.")
+
+    for sink, fingerprints in zip(sinks, fingerprint_stores):
+        fingerprints.write_report()
+        await sink.close(terms, fingerprints)
+
+    # per-stage latency percentiles replace the old wall-clock time breakdown,
+    # the full histograms end up in metrics.json / metrics.prom
+    logging.info(
+        f"""
+Stage Latencies (seconds per department){"" if not disable_ssh else ", SSH scraping disabled"}:
+{metrics.summary_table()}
+Total Time: {round(time.time() - metrics.started_at, 2)} seconds
+          """
+    )
+    if cache is not None:
+        counters = metrics.counters
+        hits = counters.get("http_cache_hit", 0)
+        misses = counters.get("http_cache_miss", 0)
+        logging.info(
+            f"HTTP Cache: {hits} pages not modified, {misses} downloaded "
+            f"({hits / max(1, hits + misses):.0%} hit rate), "
+            f"{counters.get('http_cache_negative_hit', 0)} empty departments skipped"
+        )
+    logging.info(
+        f"Rate Limit: {web_request_limiter.describe()}, "
+        f"{retry.spent} requests retried, "
+        f"{metrics.counters.get('http_gave_up', 0)} departments given up on"
+    )
+    if hedge_policy is not None:
+        logging.info(
+            f"Hedging: {metrics.counters.get('http_hedged', 0)} slow requests sent "
+            f"twice, the duplicate answered first "
+            f"{metrics.counters.get('http_hedge_won', 0)} times, "
+            f"{metrics.counters.get('web_deadline_exceeded', 0)} departments "
+            f"missed their deadline"
+        )
+    created = metrics.counters.get("http_connections_created", 0)
+    reused = metrics.counters.get("http_connections_reused", 0)
+    logging.info(
+        f"HTTP Connections: {created} opened, {reused} requests reused one "
+        f"({reused / max(1, created + reused):.0%} reuse)"
+    )
+    pages = metrics.stages.get("ssh_page")
+    if pages is not None and pages.count:
+        # from the key press to the page's last byte, so per channel
+        logging.info(
+            f"SSH Pages: {pages.count} read, "
+            f"{pages.count / max(pages.total, 1e-9):.1f} pages per second per channel"
+        )
+    if ssh_pool.size:
+        logging.info(
+            f"SSH Pool: {ssh_pool.size} channels over {len(ssh_pool.connections)} "
+            f"connections, {ssh_pool.handshakes} handshakes, "
+            f"{ssh_pool.replaced} broken channels replaced in the background"
+        )
+    metrics.write()
+    if replay is None:
+        # replayed stage times say nothing about the live registrar
+        costs.update(metrics)
+        costs.save_file()
+        shard_planner.save_file()
+
+    # clean up tasks and resources
+    controller.cancel()
+    for stage in stages:
+        stage.cancel()
+    fan_out.cancel()
+    loop_watcher.cancel()
+    if disable_ssh:
+        pass_through.cancel()
+    if parse_pool is not None:
+        parse_pool.shutdown()
+    ssh_pool.close()
+    await session.close()
+    if cache is not None:
+        cache.close()
+    journal.close()
+    if recorder is not None:
+        recorder.close()
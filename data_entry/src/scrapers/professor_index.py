@@ -0,0 +1,114 @@
+import re
+import unicodedata
+from collections import Counter
+
+non_word_pattern = re.compile(r"[^a-z0-9]+")
+professor_pattern = re.compile(r"(\w+)(?: (\w)\.?)? (\w+)(?: ((\w+\s*)+))?")
+
+
+def fold(text: str) -> str:
+    """Lowercase ascii words joined by "-", like the keys of professor_ids.txt."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    ascii_text = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return non_word_pattern.sub("-", ascii_text).strip("-")
+
+
+def trigrams(key: str) -> set[str]:
+    padded = f"  {key.replace('-', ' ')} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def alternates(key: str) -> list[str]:
+    """Other ways the registrar could write the professor behind a key."""
+    words = key.split("-")
+    # middle initials come and go between the registrar and the review site
+    without_initials = [word for word in words if len(word) > 1]
+    result = ["-".join(without_initials)]
+    # the registrar often leaves out the second last name
+    if len(without_initials) > 2:
+        result.append("-".join(without_initials[:2]))
+    return [alternate for alternate in result if alternate != key]
+
+
+class ProfessorIndex:
+    """
+    professor_ids.txt made ready for the professor cells of every section:
+    exact keys and their alternates, folded, for O(1) lookups, a trigram index
+    for names that are off by a letter or two, and a memo so a name that repeats
+    across hundreds of sections is only resolved once.
+
+    Exact keys win over alternates, and an alternate shared by two professors
+    is left out rather than guessed. Names matching a key exactly resolve the
+    same as they always have.
+    """
+
+    def __init__(
+        self, professor_ids_map: dict[str, dict], min_similarity: float = 0.75
+    ) -> None:
+        self.min_similarity = min_similarity
+        self.keys: dict[str, dict] = {}
+        for key, review in professor_ids_map.items():
+            if review:
+                self.keys.setdefault(fold(key), review)
+
+        alternate_reviews: dict[str, dict | None] = {}
+        for key, review in self.keys.items():
+            for alternate in alternates(key):
+                if alternate in self.keys:
+                    continue
+                known = alternate_reviews.setdefault(alternate, review)
+                if known is not None and known != review:
+                    alternate_reviews[alternate] = None
+        self.alternates = {
+            alternate: review
+            for alternate, review in alternate_reviews.items()
+            if review is not None
+        }
+
+        self.trigram_keys: dict[str, list[str]] = {}
+        self.key_trigrams: dict[str, set[str]] = {}
+        for key in self.keys:
+            self.key_trigrams[key] = trigrams(key)
+            for trigram in self.key_trigrams[key]:
+                self.trigram_keys.setdefault(trigram, []).append(key)
+        self.memo: dict[str, dict | None] = {}
+
+    def review(self, name: str) -> dict | None:
+        """The review of a professor as the registrar writes them, if any."""
+        if name not in self.memo:
+            self.memo[name] = self.resolve(name)
+        return self.memo[name]
+
+    def resolve(self, name: str) -> dict | None:
+        match = professor_pattern.match(name)
+        if match is None or not self.keys:
+            return None
+        first, lastname, second_lastname = match.group(1, 3, 4)
+        candidates = []
+        if second_lastname:
+            candidates.append(fold(f"{first} {lastname} {second_lastname}"))
+        candidates.append(fold(f"{first} {lastname}"))
+
+        # the full name first, so a second last name tells namesakes apart
+        for candidate in candidates:
+            review = self.keys.get(candidate) or self.alternates.get(candidate)
+            if review is not None:
+                return review
+        return self.closest(candidates[0])
+
+    def closest(self, candidate: str) -> dict | None:
+        """The key most similar to candidate by trigrams, if it is close enough."""
+        query = trigrams(candidate)
+        shared = Counter(
+            key for trigram in query for key in self.trigram_keys.get(trigram, ())
+        )
+        best_key, best_similarity, tied = None, 0.0, False
+        for key, count in shared.items():
+            similarity = count / (len(query) + len(self.key_trigrams[key]) - count)
+            if similarity > best_similarity:
+                best_key, best_similarity, tied = key, similarity, False
+            elif similarity == best_similarity:
+                tied = True
+        if best_key is None or tied or best_similarity < self.min_similarity:
+            return None
+        return self.keys[best_key]
@@ -0,0 +1,137 @@
+import logging
+import random
+import time
+from dataclasses import dataclass
+
+from aiolimiter import AsyncLimiter
+
+from src.constants import (
+    HTTP_RETRIES,
+    HTTP_RETRY_BUDGET,
+    MAX_REQUESTS_PER_SECOND,
+    MIN_REQUESTS_PER_SECOND,
+)
+from src.scrapers.metrics import RunMetrics, get_run_metrics, percentile
+
+
+class AdaptiveLimiter(AsyncLimiter):
+    """
+    A request rate that follows how the registrar is coping (AIMD): every healthy
+    response adds increase / rate, so about increase requests per second are added
+    each second, and every 5xx, throttled request, timeout or latency spike cuts
+    the rate by decrease. Cuts are at most one per cooldown, the requests already
+    in flight when the registrar started struggling all fail together.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        min_rate: float = MIN_REQUESTS_PER_SECOND,
+        max_rate: float = MAX_REQUESTS_PER_SECOND,
+        increase: float = 0.5,
+        decrease: float = 0.5,
+        cooldown: float = 2.0,
+        spike_factor: float = 3.0,
+        spike_floor: float = 1.0,
+    ) -> None:
+        super().__init__(rate, 1)
+        self.min_rate = min_rate
+        self.ceiling = max(max_rate, rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.spike_factor = spike_factor
+        self.spike_floor = spike_floor
+        self.latency: float | None = None
+        self.decreased_at = 0.0
+        self.logged_rate = rate
+        self.lowest = self.highest = rate
+
+    @property
+    def rate(self) -> float:
+        return self.max_rate
+
+    def set_rate(self, rate: float) -> None:
+        rate = min(self.ceiling, max(self.min_rate, rate))
+        # AsyncLimiter leaks at _rate_per_sec, it has no public way to change it
+        self.max_rate = rate
+        self._rate_per_sec = rate / self.time_period
+        self.lowest = min(self.lowest, rate)
+        self.highest = max(self.highest, rate)
+        # log every cut, and raises once they add up to a whole request per second
+        if rate < self.logged_rate or rate >= self.logged_rate + 1:
+            logging.info(f"Rate Limit: {rate:.2f} requests per second")
+            self.logged_rate = rate
+
+    def succeeded(self, latency: float) -> None:
+        if self.latency is not None and latency > max(
+            self.spike_floor, self.latency * self.spike_factor
+        ):
+            get_run_metrics().increment("rate_limit_latency_spike")
+            self.failed()
+            return
+        # slow moving average, a spike should stand out from it
+        self.latency = (
+            latency if self.latency is None else 0.9 * self.latency + 0.1 * latency
+        )
+        self.set_rate(self.rate + self.increase / self.rate)
+
+    def failed(self) -> None:
+        now = time.monotonic()
+        if now - self.decreased_at < self.cooldown:
+            return
+        self.decreased_at = now
+        get_run_metrics().increment("rate_limit_decrease")
+        self.set_rate(self.rate * self.decrease)
+
+    def describe(self) -> str:
+        return (
+            f"ended at {self.rate:.2f} requests per second "
+            f"(between {self.lowest:.2f} and {self.highest:.2f})"
+        )
+
+
+@dataclass(slots=True)
+class RetryPolicy:
+    """
+    How often a failed registrar request is tried again. Each department gets at
+    most attempts tries, and the whole run at most budget retries, so a registrar
+    that is down ends the run instead of retrying every department for minutes.
+    """
+
+    attempts: int = HTTP_RETRIES + 1
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+    budget: int = HTTP_RETRY_BUDGET
+    spent: int = 0
+
+    def should_retry(self, attempt: int) -> bool:
+        """attempt is the number of tries made so far."""
+        if attempt >= self.attempts or self.spent >= self.budget:
+            return False
+        self.spent += 1
+        return True
+
+    def delay(self, attempt: int) -> float:
+        # full jitter, departments that failed together don't come back together
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+
+@dataclass(slots=True)
+class HedgePolicy:
+    """
+    When a registrar request has taken long enough to send a duplicate: past the
+    fraction percentile of the run's fetch times so far, once there are enough of
+    them to tell a slow request from a slow registrar.
+    """
+
+    fraction: float = 0.95
+    min_samples: int = 20
+    min_delay: float = 0.5
+
+    def delay(self, metrics: RunMetrics) -> float | None:
+        fetches = metrics.stages.get("http_fetch")
+        if fetches is None or fetches.count < self.min_samples:
+            return None
+        return max(self.min_delay, percentile(sorted(fetches.samples), self.fraction))
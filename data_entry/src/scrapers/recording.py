@@ -0,0 +1,129 @@
+import asyncio
+import json
+import logging
+from pathlib import Path
+
+from src.scrapers.log_utils import get_scraper_run_id
+from src.scrapers.metrics import department_key
+
+
+def get_recording_path() -> Path:
+    return Path(f"output_files/{get_scraper_run_id()}/recording.jsonl")
+
+
+class Recorder:
+    """
+    Archives the raw registrar HTML and RUMAD pages of a run, one JSON object per
+    line, so the run can later be replayed offline with --replay.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path or get_recording_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = self.path.open("a", encoding="utf-8")
+        self.lock = asyncio.Lock()
+
+    async def web(
+        self,
+        department: str,
+        term: str,
+        year: int,
+        url: str,
+        status: int,
+        body: str,
+        elapsed: float,
+    ) -> None:
+        await self._write(
+            {
+                "kind": "web",
+                "department": department,
+                "term": term,
+                "year": year,
+                "url": url,
+                "status": status,
+                "elapsed": round(elapsed, 6),
+                "body": body,
+            }
+        )
+
+    async def ssh(
+        self, department: str, term: str, year: int, pages: list[tuple[float, str]]
+    ) -> None:
+        """pages are (seconds since the department was requested, raw page) pairs"""
+        await self._write(
+            {
+                "kind": "ssh",
+                "department": department,
+                "term": term,
+                "year": year,
+                "pages": [
+                    {"elapsed": round(elapsed, 6), "text": text}
+                    for elapsed, text in pages
+                ],
+            }
+        )
+
+    async def _write(self, entry: dict) -> None:
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        async with self.lock:
+            # keep the event loop free while the line is flushed to disk
+            await asyncio.to_thread(self._write_line, line)
+
+    def _write_line(self, line: str) -> None:
+        self.file.write(line)
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+        logging.info(f"Recorder: Archived raw pages to {self.path.as_posix()}")
+
+
+class Replay:
+    """A recorded run loaded back into memory, keyed like the run metrics."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.web_pages: dict[str, tuple[int, str]] = {}
+        self.ssh_pages: dict[str, list[str]] = {}
+        self.terms: list[tuple[str, int]] = []
+        with path.open(encoding="utf-8") as file:
+            for line in file:
+                entry = json.loads(line)
+                key = department_key(
+                    entry["department"], entry["term"], entry["year"]
+                )
+                if entry["kind"] == "web":
+                    self.web_pages[key] = (entry["status"], entry["body"])
+                    if (entry["term"], entry["year"]) not in self.terms:
+                        self.terms.append((entry["term"], entry["year"]))
+                elif entry["kind"] == "ssh":
+                    self.ssh_pages[key] = [page["text"] for page in entry["pages"]]
+
+    def describe(self) -> str:
+        return (
+            f"{len(self.web_pages)} web pages and {len(self.ssh_pages)} "
+            f"RUMAD departments from {self.path.as_posix()}"
+        )
+
+    def web(self, department: str, term: str, year: int) -> tuple[int, str] | None:
+        return self.web_pages.get(department_key(department, term, year))
+
+    def pager(self, department: str, term: str, year: int) -> "ReplayPager | None":
+        pages = self.ssh_pages.get(department_key(department, term, year))
+        return ReplayPager(pages) if pages is not None else None
+
+
+class ReplayPager:
+    """Hands out recorded RUMAD pages in order, without any of the live delays."""
+
+    def __init__(self, pages: list[str]) -> None:
+        self.pages = iter(pages)
+
+    async def open(self, department: str) -> str:
+        return next(self.pages, "")
+
+    async def request_next(self) -> None:
+        pass
+
+    async def next(self) -> str:
+        return next(self.pages, "")
@@ -0,0 +1,366 @@
+import argparse
+import asyncio
+import datetime
+import sys
+from pathlib import Path
+
+from src.constants import (
+    DEPARTMENT_DEADLINE,
+    HTML_PARSER,
+    NEGATIVE_CACHE_TTL,
+    PARSE_WORKERS,
+    REGISTRAR_URL,
+    RUMAD_HOST,
+    RUMAD_PORT,
+    SHARD_SECTIONS,
+    SSH_BACKEND,
+    SSH_SHELLS_PER_CONNECTION,
+    db_to_rumad_terms,
+    ideal_ssh_tasks,
+)
+from src.parsers.section_table_parser import available_backends
+from src.scrapers.journal import RunJournal
+from src.scrapers.log_utils import ScraperTarget
+from src.scrapers.pipeline import run_pipeline
+from src.scrapers.recording import Replay
+from src.scrapers.sinks.base import Sink
+from src.scrapers.sinks.change_log_sink import ChangeLogSink
+from src.scrapers.sinks.firestore_sink import FirestoreSink
+from src.scrapers.sinks.jsonl_sink import JSONLSink
+from src.scrapers.sinks.sql_sink import SQLSink
+from src.scrapers.ssh_scraper import SSH_BACKENDS
+
+SINKS: dict[ScraperTarget, type[Sink]] = {
+    ScraperTarget.SQLite: SQLSink,
+    ScraperTarget.Firebase: FirestoreSink,
+    ScraperTarget.JSONL: JSONLSink,
+    ScraperTarget.ChangeLog: ChangeLogSink,
+}
+
+
+def create_sinks(targets: list[ScraperTarget]) -> list[Sink]:
+    return [SINKS[target]() for target in dict.fromkeys(targets)]
+
+
+def get_available_terms():
+    """Return a list of available terms from the db_to_rumad_terms dictionary."""
+    return list(db_to_rumad_terms.keys())
+
+
+def interactive_mode(title: str, sink_targets: list[ScraperTarget]):
+    """Run the scraper in interactive mode, prompting for parameters."""
+    print(f"\n🔍 {title} 🔍\n")
+
+    available_terms = get_available_terms()
+    print("Available terms:")
+    for i, term in enumerate(available_terms, 1):
+        print(f"  {i}. {term}")
+
+    while True:
+        try:
+            term_choices = [
+                int(choice)
+                for choice in input(
+                    "\nSelect term(s) (numbers, comma separated): "
+                ).split(",")
+            ]
+            if all(1 <= choice <= len(available_terms) for choice in term_choices):
+                db_terms = [available_terms[choice - 1] for choice in term_choices]
+                break
+            else:
+                print(f"Please enter numbers between 1 and {len(available_terms)}")
+        except ValueError:
+            print("Please enter valid numbers")
+
+    # Get year
+    current_year = datetime.datetime.now().year
+    year = int(input(f"\nEnter year [{current_year}]: ") or current_year)
+    terms = [(db_term, year) for db_term in db_terms]
+
+    # Get SSH tasks
+    while True:
+        try:
+            ssh_tasks = int(input("\nEnter number of SSH tasks [4]: ") or "4")
+            if 1 <= ssh_tasks <= 30:  # Reasonable range check
+                break
+            else:
+                print("Please enter a number between 1 and 30")
+        except ValueError:
+            print("Please enter a valid number")
+
+    disable_ssh = input("\nDisable SSH scraping? (y/N) [N]: ").lower() in ("y", "yes")
+    full = input(
+        "\nRewrite unchanged departments too? (y/N) [N]: "
+    ).lower() in ("y", "yes")
+
+    ssh_status = "disabled" if disable_ssh else f"enabled with {ssh_tasks} tasks"
+    print(
+        f"\nStarting scraper with terms={', '.join(db_terms)}, year={year}, SSH scraping: {ssh_status}"
+    )
+    print("Working...\n")
+
+    # Run the scraper with the provided parameters
+    asyncio.run(
+        run_pipeline(
+            terms=terms,
+            sinks=create_sinks(sink_targets),
+            ssh_tasks=ssh_tasks,
+            disable_ssh=disable_ssh,
+            full=full,
+        )
+    )
+
+
+def main(
+    description: str = "UPRM Course Scraper - Collects course information from UPRM systems and stores it in every selected sink",
+    title: str = "UPRM Course Scraper",
+    default_sinks: list[ScraperTarget] | None = None,
+):
+    parser = argparse.ArgumentParser(
+        description=description,
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+
+    parser.add_argument(
+        "-t",
+        "--term",
+        nargs="+",
+        choices=get_available_terms(),
+        help=f"Academic term(s) to scrape in the same run (e.g., {', '.join(get_available_terms())})",
+    )
+
+    current_year = datetime.datetime.now().year
+    parser.add_argument(
+        "-y",
+        "--year",
+        type=int,
+        nargs="+",
+        default=[current_year],
+        help=f"Academic year to scrape, either one for every term or one per term (e.g., {current_year})",
+    )
+
+    parser.add_argument(
+        "-s",
+        "--ssh-tasks",
+        type=int,
+        default=0,
+        help="Number of SSH connections to use for concurrent scraping",
+    )
+
+    parser.add_argument(
+        "--no-ssh",
+        action="store_true",
+        help="Disable SSH scraping (only get data from web sources)",
+    )
+
+    parser.add_argument(
+        "--sink",
+        type=ScraperTarget,
+        action="append",
+        choices=list(SINKS.keys()),
+        default=argparse.SUPPRESS,
+        help=f"Where to store the scraped departments, can be repeated (default: {', '.join(default_sinks or [ScraperTarget.SQLite])})",
+    )
+
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Rewrite every department, even those unchanged since the last run",
+    )
+
+    parser.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        help="Continue an interrupted run (e.g. scraper_run_20250101_120000), only redoing unfinished departments",
+    )
+
+    parser.add_argument(
+        "--registrar-url",
+        default=REGISTRAR_URL,
+        help="Course offering search page to scrape, e.g. a stand-in registrar (also read from REGISTRAR_URL)",
+    )
+
+    parser.add_argument(
+        "--rumad-host",
+        default=RUMAD_HOST,
+        help="Enrollment server to read seat availability from, e.g. a stand-in RUMAD (also read from RUMAD_HOST)",
+    )
+
+    parser.add_argument(
+        "--rumad-port",
+        type=int,
+        default=RUMAD_PORT,
+        help="SSH port of the enrollment server (also read from RUMAD_PORT)",
+    )
+
+    parser.add_argument(
+        "--ssh-backend",
+        choices=list(SSH_BACKENDS),
+        default=SSH_BACKEND,
+        help="SSH client for the enrollment server, asyncssh never blocks the other stages (also read from SSH_BACKEND)",
+    )
+
+    parser.add_argument(
+        "--ssh-shells-per-connection",
+        type=int,
+        default=SSH_SHELLS_PER_CONNECTION,
+        help="RUMAD shells opened on each SSH connection, fewer handshakes and connections for the server (also read from SSH_SHELLS_PER_CONNECTION)",
+    )
+
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=PARSE_WORKERS,
+        help="Processes parsing registrar pages off the event loop, 0 parses on it (also read from PARSE_WORKERS)",
+    )
+
+    parser.add_argument(
+        "--html-parser",
+        choices=available_backends(),
+        default=HTML_PARSER,
+        help="Parser for registrar pages, all build the same departments (also read from HTML_PARSER)",
+    )
+
+    parser.add_argument(
+        "--shard-sections",
+        type=int,
+        default=SHARD_SECTIONS,
+        help="Fetch departments with more sections than this as concurrent course number shards, 0 never shards (also read from SHARD_SECTIONS)",
+    )
+
+    parser.add_argument(
+        "--no-hedge",
+        action="store_true",
+        help="Never send a duplicate of a registrar request slower than the run's p95",
+    )
+
+    parser.add_argument(
+        "--department-deadline",
+        type=float,
+        default=DEPARTMENT_DEADLINE,
+        help="Seconds a department may spend fetching and parsing its registrar page, 0 for no limit (also read from DEPARTMENT_DEADLINE)",
+    )
+
+    parser.add_argument(
+        "--no-http-cache",
+        action="store_true",
+        help="Download every registrar page in full and ask for every department",
+    )
+
+    parser.add_argument(
+        "--negative-cache-ttl",
+        type=float,
+        default=NEGATIVE_CACHE_TTL,
+        help="Seconds a department without sections is not asked for again, 0 asks every run (also read from NEGATIVE_CACHE_TTL)",
+    )
+
+    parser.add_argument(
+        "--record",
+        action="store_true",
+        help="Archive every raw registrar page and RUMAD screen of the run to output_files/<run id>/recording.jsonl",
+    )
+
+    parser.add_argument(
+        "--replay",
+        metavar="ARCHIVE",
+        help="Scrape from a --record archive instead of the registrar and RUMAD, as fast as possible (terms default to the recorded ones)",
+    )
+
+    parser.add_argument(
+        "--list-terms", action="store_true", help="List all available terms and exit"
+    )
+
+    parser.add_argument(
+        "-i",
+        "--interactive",
+        action="store_true",
+        help="Run in interactive mode (ignores other arguments)",
+    )
+
+    args = parser.parse_args()
+    sink_targets = getattr(args, "sink", None) or default_sinks or [ScraperTarget.SQLite]
+
+    # List terms if requested
+    if args.list_terms:
+        print("Available terms:")
+        for i, term in enumerate(get_available_terms()):
+            print(f"{i+1}. {term}")
+        return
+
+    # Check if interactive mode is requested or no args provided
+    if args.interactive or (not args.term and len(sys.argv) == 1):
+        interactive_mode(title, sink_targets)
+        return
+
+    if args.resume:
+        # the interrupted run decides what gets scraped and where it goes
+        try:
+            journal = RunJournal.open_existing(args.resume)
+        except FileNotFoundError as e:
+            parser.error(str(e))
+        config = journal.load_config()
+        journal.close()
+        terms = [(term, year) for term, year in config["terms"]]
+        sink_targets = [ScraperTarget(target) for target in config["sinks"]]
+        args.no_ssh = config["disable_ssh"]
+        args.full = config["full"]
+        args.record = config.get("record", False)
+        args.replay = config.get("replay")
+    elif args.replay and not args.term:
+        terms = None
+    elif not args.term:
+        parser.error("the following arguments are required: -t/--term")
+    elif len(args.year) == 1:
+        terms = [(term, args.year[0]) for term in args.term]
+    elif len(args.year) == len(args.term):
+        terms = list(zip(args.term, args.year))
+    else:
+        parser.error("-y/--year takes either one year or one year per term")
+
+    replay = None
+    if args.replay:
+        if not Path(args.replay).exists():
+            parser.error(f"no recording found at {args.replay}")
+        replay = Replay(Path(args.replay))
+        terms = terms or replay.terms
+
+    ssh_tasks = args.ssh_tasks
+    if not ssh_tasks:
+        ssh_tasks = max(ideal_ssh_tasks.get(term, 5) for term, _ in terms)
+
+    ssh_status = "disabled" if args.no_ssh else f"enabled with {ssh_tasks} tasks"
+    print(
+        f"Starting scraper with terms={', '.join(f'{term} {year}' for term, year in terms)}, SSH scraping: {ssh_status}"
+    )
+    asyncio.run(
+        run_pipeline(
+            terms=terms,
+            sinks=create_sinks(sink_targets),
+            ssh_tasks=ssh_tasks,
+            disable_ssh=args.no_ssh,
+            full=args.full,
+            resume=args.resume,
+            record=args.record,
+            replay=replay,
+            registrar_url=args.registrar_url,
+            rumad_host=args.rumad_host,
+            rumad_port=args.rumad_port,
+            ssh_backend=args.ssh_backend,
+            ssh_shells_per_connection=args.ssh_shells_per_connection,
+            parse_workers=args.parse_workers,
+            html_parser=args.html_parser,
+            http_cache=not args.no_http_cache,
+            negative_cache_ttl=args.negative_cache_ttl,
+            shard_sections=args.shard_sections,
+            hedge=not args.no_hedge,
+            department_deadline=args.department_deadline,
+        )
+    )
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\nOperation cancelled by user. Exiting...")
+        sys.exit(0)
@@ -0,0 +1,424 @@
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import aiohttp
+from aiolimiter import AsyncLimiter
+
+from src.constants import (
+    REGISTRAR_URL,
+    RUMAD_HOST,
+    RUMAD_PORT,
+    SSH_BACKEND,
+    SSH_SHELLS_PER_CONNECTION,
+    db_to_rumad_terms,
+)
+from src.scrapers.fingerprint import FingerprintStore
+from src.scrapers.http_session import create_session
+from src.scrapers.log_utils import ScraperTarget, configure_logging
+from src.scrapers.metrics import department_key, get_run_metrics
+from src.scrapers.professor_index import ProfessorIndex
+from src.scrapers.sinks.base import Sink
+from src.scrapers.ssh_scraper import (
+    SSH_BACKENDS,
+    SSH_ERRORS,
+    SSHChannelPool,
+    scrape_department_availability,
+)
+from src.scrapers.web_scraper import scrape_department
+
+DEFAULT_WATCHLIST = "input_files/watchlist.json"
+
+# (course code, section code) -> (capacity, usage)
+Seats = dict[tuple[str, str], tuple[int, int]]
+
+
+@dataclass(slots=True)
+class WatchItem:
+    department: str
+    term: str
+    year: int
+    interval: float
+    # a department item follows every section, a course item only its own
+    course: str | None = None
+    sections: list[str] | None = None
+
+    def follows(self, course_code: str, section_code: str) -> bool:
+        if self.course is None:
+            return True
+        if course_code != self.course:
+            return False
+        return self.sections is None or section_code in self.sections
+
+
+@dataclass(slots=True)
+class Watchlist:
+    """
+    What the seat watcher keeps fresh, read from a JSON file like:
+
+        {
+            "term": "Fall",
+            "year": 2025,
+            "interval": 600,
+            "hot_threshold": 0.9,
+            "hot_interval": 60,
+            "watch": [
+                {"department": "CIIC", "interval": 300},
+                {"course": "INEL4206", "sections": ["010", "030"], "interval": 120},
+                {"course": "MATE3031", "term": "Spring", "year": 2025}
+            ]
+        }
+
+    Items default to the top level term, year and interval. Followed sections at
+    or above hot_threshold of their capacity get their department re-read every
+    hot_interval seconds.
+    """
+
+    items: list[WatchItem]
+    hot_threshold: float = 0.9
+    hot_interval: float = 60.0
+    # how often the registrar is asked again for sections added or removed
+    catalog_interval: float = 3600.0
+
+    @classmethod
+    def from_file(cls, path: Path) -> "Watchlist":
+        with path.open() as file:
+            config = json.load(file)
+        items = []
+        for item in config["watch"]:
+            course = item.get("course")
+            department = item.get("department") or (course or "")[:4]
+            term = item.get("term", config.get("term"))
+            if not department or term not in db_to_rumad_terms:
+                raise ValueError(f"Watchlist item {item} needs a department and a term")
+            year = item.get("year", config.get("year"))
+            try:
+                year = int(year)
+            except (TypeError, ValueError):
+                raise ValueError(f"Watchlist item {item} needs a year, not {year!r}")
+            items.append(
+                WatchItem(
+                    department=department.upper(),
+                    term=term,
+                    year=year,
+                    interval=float(item.get("interval", config.get("interval", 600))),
+                    course=course.upper() if course else None,
+                    sections=item.get("sections"),
+                )
+            )
+        return cls(
+            items,
+            hot_threshold=config.get("hot_threshold", 0.9),
+            hot_interval=config.get("hot_interval", 60.0),
+            catalog_interval=config.get("catalog_interval", 3600.0),
+        )
+
+    def departments(self) -> dict[str, tuple[str, str, int]]:
+        return {
+            department_key(item.department, item.term, item.year): (
+                item.department,
+                item.term,
+                item.year,
+            )
+            for item in self.items
+        }
+
+
+def get_seats(department_data: dict) -> Seats:
+    return {
+        (course["courseCode"], section["sectionCode"]): (
+            section["capacity"],
+            section["usage"],
+        )
+        for course in department_data["courses"].values()
+        for section in course["sections"]
+    }
+
+
+class SeatWatcher:
+    """
+    Re-reads the RUMAD availability of watched departments on a warm pool of
+    shells, each department on its own schedule, and hands the sinks only the
+    sections whose capacity or usage moved. The registrar is only asked again for
+    a department once its catalog is older than catalog_interval.
+    """
+
+    def __init__(
+        self,
+        watchlist: Watchlist,
+        sinks: list[Sink],
+        fingerprint_stores: list[FingerprintStore],
+        ssh_pool: SSHChannelPool,
+        session: aiohttp.ClientSession,
+        professor_ids: ProfessorIndex,
+        rate_limit: AsyncLimiter,
+        registrar_url: str = REGISTRAR_URL,
+    ) -> None:
+        self.watchlist = watchlist
+        self.sinks = sinks
+        self.fingerprint_stores = fingerprint_stores
+        self.ssh_pool = ssh_pool
+        self.session = session
+        self.professor_ids = professor_ids
+        self.rate_limit = rate_limit
+        self.registrar_url = registrar_url
+        self.departments: dict[str, dict] = {}
+        self.catalog_fetched_at: dict[str, float] = {}
+        self.polls = 0
+
+    def interval(self, key: str) -> float:
+        items = [
+            item
+            for item in self.watchlist.items
+            if department_key(item.department, item.term, item.year) == key
+        ]
+        interval = min(item.interval for item in items)
+        data = self.departments.get(key)
+        if data is None:
+            return interval
+        for (course_code, section_code), (capacity, usage) in get_seats(data).items():
+            if (
+                capacity > 0
+                and usage >= capacity * self.watchlist.hot_threshold
+                and any(item.follows(course_code, section_code) for item in items)
+            ):
+                return min(interval, self.watchlist.hot_interval)
+        return interval
+
+    async def warm_up(self) -> None:
+        """Walks every shell to the first watched term before any polling starts."""
+        term = db_to_rumad_terms[self.watchlist.items[0].term]
+        await self.ssh_pool.warm(term)
+        logging.info(f"Seat Watcher: {self.ssh_pool.size} shells ready on term {term}")
+
+    async def catalog(
+        self, department: str, term: str, year: int
+    ) -> tuple[dict | None, bool]:
+        """The department's registrar payload and whether it was just fetched."""
+        key = department_key(department, term, year)
+        fetched_at = self.catalog_fetched_at.get(key)
+        if (
+            key in self.departments
+            and fetched_at is not None
+            and time.monotonic() - fetched_at < self.watchlist.catalog_interval
+        ):
+            return self.departments[key], False
+        data = await scrape_department(
+            self.session,
+            department,
+            term,
+            year,
+            self.professor_ids,
+            self.rate_limit,
+            registrar_url=self.registrar_url,
+        )
+        if data is None:
+            return self.departments.get(key), False
+        self.catalog_fetched_at[key] = time.monotonic()
+        return data, True
+
+    async def poll(self, department: str, term: str, year: int) -> None:
+        key = department_key(department, term, year)
+        data, fresh = await self.catalog(department, term, year)
+        if data is None:
+            logging.warning(f"Seat Watcher: No registrar data for {key}")
+            return
+
+        # a fresh catalog carries no seats yet, compare against the last reading
+        before = get_seats(self.departments.get(key, data))
+        rumad_term = db_to_rumad_terms[term]
+        shell = await self.ssh_pool.acquire(rumad_term)
+        broken = False
+        try:
+            channel = await shell.select_term(rumad_term)
+            with get_run_metrics().timer("seat_poll", key):
+                data = await scrape_department_availability(channel, data)
+        except SSH_ERRORS as e:
+            logging.error(f"Seat Watcher: Socket error polling {key}: {str(e)}")
+            broken = True
+            return
+        finally:
+            await self.ssh_pool.release(shell, broken)
+        self.polls += 1
+
+        changed = {
+            section: seats
+            for section, seats in get_seats(data).items()
+            if before.get(section) != seats
+        }
+        self.departments[key] = data
+        get_run_metrics().increment("seat_changes", len(changed), key)
+        if fresh or changed:
+            logging.info(
+                f"Seat Watcher: {key} has {len(changed)} sections with new seat counts"
+            )
+            await self.store(data, None if fresh else changed)
+        else:
+            logging.info(f"Seat Watcher: {key} unchanged")
+
+    async def store(self, department_data: dict, changed: Seats | None) -> None:
+        """Rewrites the department after a catalog refresh, otherwise only seats."""
+        for sink, fingerprints in zip(self.sinks, self.fingerprint_stores):
+            try:
+                if changed is None:
+                    stored = await sink.write(department_data)
+                else:
+                    stored = await sink.update_seats(department_data, changed)
+                if stored:
+                    fingerprints.mark_stored(department_data)
+            except Exception as e:
+                logging.exception(
+                    f"Seat Watcher: Sink {sink.name} failed storing "
+                    f"{department_data['department']}: {str(e)}"
+                )
+
+    async def watch(self, department: str, term: str, year: int, once: bool):
+        key = department_key(department, term, year)
+        while True:
+            started = time.monotonic()
+            try:
+                await self.poll(department, term, year)
+            except Exception as e:
+                logging.exception(f"Seat Watcher: Error polling {key}: {str(e)}")
+            if once:
+                return
+            interval = self.interval(key)
+            await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    async def run(self, once: bool = False) -> None:
+        await asyncio.gather(
+            *(
+                self.watch(department, term, year, once)
+                for department, term, year in self.watchlist.departments().values()
+            )
+        )
+
+
+async def watch_seats(
+    watchlist: Watchlist,
+    sinks: list[Sink],
+    ssh_tasks: int,
+    once: bool = False,
+    registrar_url: str = REGISTRAR_URL,
+    requests_per_second: float = 4,
+    rumad_host: str = RUMAD_HOST,
+    rumad_port: int = RUMAD_PORT,
+    ssh_backend: str = SSH_BACKEND,
+    ssh_shells_per_connection: int = SSH_SHELLS_PER_CONNECTION,
+):
+    configure_logging(*(sink.target for sink in sinks))
+    terms = sorted({(item.term, item.year) for item in watchlist.items})
+    departments = watchlist.departments()
+    logging.info(
+        f"Seat Watcher: Watching {len(departments)} departments "
+        f"for {', '.join(sink.name for sink in sinks)}"
+    )
+
+    fingerprint_stores = []
+    for sink in sinks:
+        await sink.open(terms)
+        fingerprint_stores.append(
+            FingerprintStore(await sink.load_fingerprints(terms), name=sink.name)
+        )
+    with open("input_files/professor_ids.txt") as file:
+        professor_ids = ProfessorIndex(json.load(file))
+
+    ssh_pool = SSHChannelPool(
+        min(ssh_tasks, len(departments)),
+        rumad_host,
+        rumad_port,
+        ssh_backend,
+        shells_per_connection=ssh_shells_per_connection,
+    )
+    session = create_session()
+    try:
+        await ssh_pool.open()
+        watcher = SeatWatcher(
+            watchlist,
+            sinks,
+            fingerprint_stores,
+            ssh_pool,
+            session,
+            professor_ids,
+            AsyncLimiter(requests_per_second, 1),
+            registrar_url,
+        )
+        await watcher.warm_up()
+        await watcher.run(once)
+        logging.info(f"Seat Watcher: Finished after {watcher.polls} polls")
+    finally:
+        for sink, fingerprints in zip(sinks, fingerprint_stores):
+            await sink.close(terms, fingerprints)
+        ssh_pool.close()
+        await session.close()
+        get_run_metrics().write()
+
+
+def main():
+    # the sink registry lives with the scrape CLI
+    from src.scrapers.scrape import SINKS, create_sinks
+
+    parser = argparse.ArgumentParser(
+        description="Keep seat availability of watched departments and courses fresh",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "-w", "--watchlist", default=DEFAULT_WATCHLIST, help="Watchlist JSON file"
+    )
+    parser.add_argument(
+        "--sink",
+        type=ScraperTarget,
+        action="append",
+        choices=list(SINKS.keys()),
+        help="Where to store seat counts, can be repeated (default: sqlite, changelog)",
+    )
+    parser.add_argument(
+        "-s", "--ssh-tasks", type=int, default=4, help="RUMAD shells to keep open"
+    )
+    parser.add_argument(
+        "--once", action="store_true", help="Poll every department once and exit"
+    )
+    parser.add_argument("--registrar-url", default=REGISTRAR_URL)
+    parser.add_argument("--rumad-host", default=RUMAD_HOST)
+    parser.add_argument("--rumad-port", type=int, default=RUMAD_PORT)
+    parser.add_argument(
+        "--ssh-backend", choices=list(SSH_BACKENDS), default=SSH_BACKEND
+    )
+    parser.add_argument(
+        "--ssh-shells-per-connection", type=int, default=SSH_SHELLS_PER_CONNECTION
+    )
+    args = parser.parse_args()
+
+    try:
+        watchlist = Watchlist.from_file(Path(args.watchlist))
+    except (OSError, ValueError, KeyError) as e:
+        parser.error(f"could not read watchlist {args.watchlist}: {e}")
+
+    asyncio.run(
+        watch_seats(
+            watchlist,
+            create_sinks(
+                args.sink or [ScraperTarget.SQLite, ScraperTarget.ChangeLog]
+            ),
+            args.ssh_tasks,
+            once=args.once,
+            registrar_url=args.registrar_url,
+            rumad_host=args.rumad_host,
+            rumad_port=args.rumad_port,
+            ssh_backend=args.ssh_backend,
+            ssh_shells_per_connection=args.ssh_shells_per_connection,
+        )
+    )
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\nSeat watcher stopped.")
+        sys.exit(0)
@@ -0,0 +1,100 @@
+import json
+import logging
+import os
+from pathlib import Path
+
+# the registrar's v2 filter narrows a department to course numbers starting with it
+COURSE_PREFIXES = tuple("0123456789")
+
+
+def get_section_counts_path() -> Path:
+    return Path("output_files/department_sections.json")
+
+
+def course_prefix(course_code: str) -> str:
+    return course_code[4:5]
+
+
+class ShardPlanner:
+    """
+    Splits the departments with the most sections into several registrar queries
+    that run at once, one per group of course number prefixes (v2=3, v2=4, ...),
+    so the engineering and math pages stop setting the web stage's tail.
+
+    Groups are balanced on how many sections each prefix had in earlier runs.
+    Prefixes never seen still get asked for, in the lightest group, so a course
+    numbered outside the usual range is not lost.
+    """
+
+    def __init__(
+        self,
+        counts: dict[str, dict[str, int]] | None = None,
+        sections_per_shard: int = 0,
+    ) -> None:
+        # department -> course number prefix -> sections seen in the last run
+        self.counts: dict[str, dict[str, int]] = counts or {}
+        self.sections_per_shard = sections_per_shard
+
+    @classmethod
+    def from_file(
+        cls, sections_per_shard: int = 0, path: Path | None = None
+    ) -> "ShardPlanner":
+        path = path or get_section_counts_path()
+        if not path.exists():
+            return cls(sections_per_shard=sections_per_shard)
+        with path.open() as file:
+            return cls(json.load(file), sections_per_shard)
+
+    def plan(self, department: str) -> list[list[str]]:
+        """
+        Prefix groups to query concurrently, or [] to ask for the whole
+        department in one request.
+        """
+        counts = self.counts.get(department, {})
+        total = sum(counts.values())
+        if self.sections_per_shard <= 0 or total <= self.sections_per_shard:
+            return []
+        shard_count = min(
+            -(-total // self.sections_per_shard),
+            sum(1 for count in counts.values() if count),
+        )
+        if shard_count < 2:
+            return []
+        shards: list[list[str]] = [[] for _ in range(shard_count)]
+        loads = [0] * shard_count
+        # heaviest prefix into the lightest group, unseen prefixes weigh nothing
+        for prefix in sorted(COURSE_PREFIXES, key=lambda p: -counts.get(p, 0)):
+            lightest = loads.index(min(loads))
+            shards[lightest].append(prefix)
+            loads[lightest] += counts.get(prefix, 0)
+        return [sorted(shard) for shard in shards]
+
+    def record(self, department_data: dict) -> None:
+        counts: dict[str, int] = {}
+        for course_code, course in department_data["courses"].items():
+            prefix = course_prefix(course_code)
+            counts[prefix] = counts.get(prefix, 0) + len(course["sections"])
+        self.counts[department_data["department"]] = counts
+
+    def save_file(self, path: Path | None = None) -> None:
+        path = path or get_section_counts_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".json.tmp")
+        with tmp_path.open("w") as file:
+            json.dump(self.counts, file, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+        logging.info(
+            f"Shards: Saved section counts of {len(self.counts)} departments to {path.as_posix()}"
+        )
+
+
+def merge_shards(department_data: list[dict | None]) -> dict | None:
+    """One department payload out of the payloads of its shards."""
+    found = [data for data in department_data if data is not None]
+    if not found:
+        return None
+    merged = {**found[0], "courses": {}}
+    for data in found:
+        # a registrar that ignored the filter sends the same courses twice
+        merged["courses"].update(data["courses"])
+    return merged
@@ -0,0 +1,49 @@
+import abc
+
+from src.scrapers.fingerprint import FingerprintStore, load_fingerprints_file
+from src.scrapers.log_utils import ScraperTarget
+
+
+class Sink(abc.ABC):
+    """
+    A consumer of finished department payloads. The pipeline gives every sink its
+    own queue and task, so a slow sink only ever delays itself.
+    """
+
+    target: ScraperTarget
+    # sinks that mirror the registrar can skip departments that did not change,
+    # archives want every payload
+    skip_unchanged: bool = True
+    # how many concurrent writers the autoscaler may give this sink
+    max_workers: int = 1
+
+    @property
+    def name(self) -> str:
+        return self.target.value
+
+    async def open(self, terms: list[tuple[str, int]]) -> None:
+        pass
+
+    async def load_fingerprints(self, terms: list[tuple[str, int]]) -> dict[str, str]:
+        return load_fingerprints_file(self.target)
+
+    @abc.abstractmethod
+    async def write(self, department_data: dict) -> bool:
+        """Store a department payload. Returns True once it is durably stored."""
+
+    async def update_seats(
+        self, department_data: dict, changed: dict[tuple[str, str], tuple[int, int]]
+    ) -> bool:
+        """
+        Store new seat counts, changed maps (course, section) to (capacity, usage).
+        Sinks without a cheaper way to do it store the whole department again.
+        """
+        return await self.write(department_data)
+
+    async def skip(self, department_data: dict) -> None:
+        """Called instead of write for departments that have not changed."""
+
+    async def close(
+        self, terms: list[tuple[str, int]], fingerprints: FingerprintStore
+    ) -> None:
+        fingerprints.save_file(self.target)
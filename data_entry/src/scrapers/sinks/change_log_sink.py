@@ -0,0 +1,41 @@
+import asyncio
+import logging
+from pathlib import Path
+
+from src.scrapers.change_log import ChangeLog
+from src.scrapers.fingerprint import FingerprintStore
+from src.scrapers.log_utils import ScraperTarget
+from src.scrapers.sinks.base import Sink
+
+
+class ChangeLogSink(Sink):
+    """Diffs every stored department against its previous snapshot into a ChangeLog."""
+
+    target = ScraperTarget.ChangeLog
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = Path(path) if path else None
+        self.change_log: ChangeLog | None = None
+
+    async def open(self, terms: list[tuple[str, int]]) -> None:
+        self.change_log = ChangeLog(self.path)
+
+    async def write(self, department_data: dict) -> bool:
+        assert self.change_log is not None, "ChangeLogSink used before open()"
+        # diffing and the sqlite commit stay off the event loop
+        changes = await asyncio.to_thread(self.change_log.record, department_data)
+        logging.info(
+            f"Change Log: {changes} section changes in {department_data['department']}"
+        )
+        return True
+
+    async def close(
+        self, terms: list[tuple[str, int]], fingerprints: FingerprintStore
+    ) -> None:
+        await super().close(terms, fingerprints)
+        if self.change_log is not None:
+            logging.info(
+                f"Change Log: {self.change_log.path.as_posix()} is at cursor "
+                f"{self.change_log.latest_cursor()}"
+            )
+            self.change_log.close()
@@ -0,0 +1,154 @@
+import datetime
+import json
+import logging
+import os
+
+import firebase_admin.firestore_async as firestore_async
+from firebase_admin import credentials, initialize_app
+from google.cloud.firestore_v1 import AsyncClient
+
+from src.models.stats import DeptStats
+from src.scrapers.fingerprint import FingerprintStore, fingerprint_key
+from src.scrapers.log_utils import ScraperTarget
+from src.scrapers.sinks.base import Sink
+
+
+def calculate_doc_size(data: dict | str | bool | list | None) -> int:
+    if isinstance(data, dict):
+        size = 0
+        for key, value in data.items():
+            key_size = len(key) + 1
+            value_size = calculate_doc_size(value)
+            key_pair_size = key_size + value_size
+            size += key_pair_size
+        return size
+    elif isinstance(data, str):
+        return len(data) + 1
+    elif any([isinstance(data, bool), data is None]):
+        return 1
+    elif isinstance(data, (datetime.datetime, float, int)):
+        return 8
+    elif isinstance(data, list):
+        return sum([calculate_doc_size(item) for item in data], start=0)
+    else:
+        logging.warning(
+            f"Tried to calculate document size for unknown data type: {type(data)}"
+        )
+        return 0
+
+
+def calculate_doc_name_size(path):
+    size = 0
+    for collection in path.split("/"):
+        size += len(collection) + 1
+    return size + 16
+
+
+class FirestoreSink(Sink):
+    target = ScraperTarget.Firebase
+    max_workers = 4
+
+    def __init__(self) -> None:
+        self.client: AsyncClient | None = None
+        self.dept_stats: list[DeptStats] = []
+        self.scraped_depts: dict[str, list[str]] = {}
+
+    async def open(self, terms: list[tuple[str, int]]) -> None:
+        if os.environ.get("FIRESTORE_EMULATOR_HOST"):
+            # the emulator takes anonymous clients, there are no credentials to load
+            self.client = AsyncClient()
+            return
+        # Setup Firebase access
+        cred = credentials.Certificate(json.loads(os.environ["CREDENTIALS_JSON"]))
+        app = initialize_app(cred)
+        self.client = firestore_async.client(app)
+
+    def entry_info_ref(self):
+        assert self.client is not None, "FirestoreSink used before open()"
+        return self.client.collection("DataEntryInformation").document(
+            "DepartmentCourses"
+        )
+
+    async def load_fingerprints(self, terms: list[tuple[str, int]]) -> dict[str, str]:
+        # Fingerprints live next to the scrape metadata so they survive between CI runs
+        entry_info = (await self.entry_info_ref().get()).to_dict() or {}
+        return {
+            fingerprint_key(department, db_term, year): fingerprint
+            for db_term, year in terms
+            for department, fingerprint in entry_info.get("termYearScrapeInfo", {})
+            .get(f"{db_term}:{year}", {})
+            .get("fingerprints", {})
+            .items()
+        }
+
+    def record(self, data: dict) -> None:
+        department = data["department"]
+        year = data["year"]
+        self.scraped_depts.setdefault(f"{data['term']}:{year}", []).append(department)
+        self.dept_stats.append(
+            DeptStats(
+                department,
+                calculate_doc_name_size(
+                    f"DepartmentCourses/{department}:{data['term']}:{year}"
+                )
+                + calculate_doc_size(data),  # type: ignore
+                len(data["courses"].keys()),
+                sum(len(course["sections"]) for course in data["courses"].values()),
+            )
+        )
+
+    async def write(self, department_data: dict) -> bool:
+        assert self.client is not None, "FirestoreSink used before open()"
+        department = department_data["department"]
+        term = department_data["term"]
+        year = department_data["year"]
+        await self.client.collection("DepartmentCourses").document(
+            f"{department}:{term.replace(' ','')}:{year}"
+        ).set(department_data)
+        self.record(department_data)
+        logging.info(f"Saved {department} to Firebase")
+        return True
+
+    async def skip(self, department_data: dict) -> None:
+        # still counts as scraped for the metadata document
+        self.record(department_data)
+
+    async def close(
+        self, terms: list[tuple[str, int]], fingerprints: FingerprintStore
+    ) -> None:
+        assert self.client is not None, "FirestoreSink used before open()"
+        if not os.path.isdir("output_files"):
+            os.makedirs("output_files")
+
+        # Write stats to file
+        with open("output_files/dept_stats.csv", "w") as file:
+            file.write("Department,Bytes,CourseCount,SectionCount\n")
+            for dept in self.dept_stats:
+                file.write(
+                    f"{dept.dept},{dept.bytes},{dept.course_count},{dept.section_count}\n"
+                )
+
+        # Update Firebase metadata
+        await self.entry_info_ref().set(
+            document_data={
+                f"termYearScrapeInfo": {
+                    f"{db_term}:{year}": {
+                        "departments": self.scraped_depts.get(f"{db_term}:{year}", []),
+                        "lastUpdated": datetime.datetime.now(),
+                        "fingerprints": {
+                            department: fingerprints.fingerprints[
+                                fingerprint_key(department, db_term, year)
+                            ]
+                            for department in self.scraped_depts.get(
+                                f"{db_term}:{year}", []
+                            )
+                            if fingerprint_key(department, db_term, year)
+                            in fingerprints.fingerprints
+                        },
+                    }
+                    for db_term, year in terms
+                }
+            },
+            merge=True,
+        )
+        self.client.close()
@@ -0,0 +1,50 @@
+import asyncio
+import json
+import logging
+from pathlib import Path
+
+from src.scrapers.fingerprint import FingerprintStore
+from src.scrapers.log_utils import ScraperTarget, get_scraper_run_id
+from src.scrapers.sinks.base import Sink
+
+
+class JSONLSink(Sink):
+    """Archives every department payload of a run as one JSON object per line."""
+
+    target = ScraperTarget.JSONL
+    skip_unchanged = False
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = Path(path) if path else None
+        self.file = None
+
+    async def open(self, terms: list[tuple[str, int]]) -> None:
+        # resolved only now, a resumed run has switched to its own run id by then
+        if self.path is None:
+            self.path = Path(f"output_files/{get_scraper_run_id()}/departments.jsonl")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = self.path.open("a", encoding="utf-8")
+
+    async def load_fingerprints(self, terms: list[tuple[str, int]]) -> dict[str, str]:
+        return {}
+
+    async def write(self, department_data: dict) -> bool:
+        assert self.file is not None, "JSONLSink used before open()"
+        line = json.dumps(department_data, ensure_ascii=False) + "\n"
+        # keep the event loop free while the line is flushed to disk
+        await asyncio.to_thread(self._write_line, line)
+        logging.info(
+            f"JSONL Task: Archived {department_data['department']} to {self.path.as_posix()}"
+        )
+        return True
+
+    def _write_line(self, line: str) -> None:
+        assert self.file is not None
+        self.file.write(line)
+        self.file.flush()
+
+    async def close(
+        self, terms: list[tuple[str, int]], fingerprints: FingerprintStore
+    ) -> None:
+        if self.file is not None:
+            self.file.close()
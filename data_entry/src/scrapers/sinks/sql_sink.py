@@ -0,0 +1,171 @@
+import asyncio
+import logging
+
+from sqlalchemy import and_, delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from src.database import Base, Course, Meeting, Section
+from src.parsers.schedule_parser import parse_schedule
+from src.scrapers.log_utils import ScraperTarget
+from src.scrapers.sinks.base import Sink
+
+
+class SQLSink(Sink):
+    target = ScraperTarget.SQLite
+
+    def __init__(self, url: str = "sqlite+aiosqlite:///courses.db") -> None:
+        self.url = url
+        self.engine: AsyncEngine | None = None
+        self.session_factory: async_sessionmaker[AsyncSession] | None = None
+
+    async def open(self, terms: list[tuple[str, int]]) -> None:
+        self.engine = create_async_engine(self.url, echo=False)
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.session_factory = async_sessionmaker(
+            self.engine, class_=AsyncSession, expire_on_commit=False
+        )
+
+    async def write(self, department_data: dict) -> bool:
+        assert self.session_factory is not None, "SQLSink used before open()"
+        department = department_data["department"]
+        term = department_data["term"]
+        year = department_data["year"]
+        logging.info(f"DB Task: Adding {department} to SQL DB")
+        # define these vars so they aren't unbound later on
+        course = None
+        course_code = None
+        async with self.session_factory() as session:
+            with session.no_autoflush:
+                try:
+                    # Go through all the courses, delete existing db records, then batch add all the new records
+                    courses = []
+                    for course_code, course_data in department_data["courses"].items():
+                        course = Course(
+                            course_code=course_code,
+                            course_name=course_data["courseName"],
+                            year=year,
+                            term=term,
+                            credits=course_data["credits"],
+                            department=course_data["department"],
+                            prerequisites=course_data["prerequisites"],
+                            corequisites=course_data["corequisites"],
+                        )
+
+                        # Add new sections and meetings
+                        for section_data in course_data["sections"]:
+                            section = Section(
+                                section_code=section_data["sectionCode"],
+                                meetings_text=",".join(section_data["meetings"]),
+                                modality=section_data["modality"],
+                                capacity=section_data["capacity"],
+                                taken=section_data["usage"],
+                                reserved=section_data["reserved"],
+                                professors=",".join(
+                                    [
+                                        prof["name"]
+                                        for prof in section_data["professors"]
+                                    ]
+                                ),
+                                misc=section_data["misc"],
+                            )
+                            course.sections.append(section)
+                            for meeting_text in section_data["meetings"]:
+                                meetingDict = parse_schedule(meeting_text)
+                                if meetingDict is None:
+                                    continue
+                                meeting = Meeting(
+                                    building=meetingDict["building"],
+                                    room=meetingDict["room"],
+                                    days=meetingDict["days"],
+                                    start_time=meetingDict["start_time"],
+                                    end_time=meetingDict["end_time"],
+                                )
+                                section.meetings.append(meeting)
+
+                        # delete the existing version of the course and add the new one to the db
+                        existing_course = and_(
+                            Course.course_code == course_code,
+                            Course.term == term,
+                            Course.year == year,
+                        )
+                        # bulk deletes skip the ORM cascade, and a reused cid would
+                        # collide with the sections left behind
+                        existing_sections = select(Section.sid).where(
+                            Section.cid.in_(select(Course.cid).where(existing_course))
+                        )
+                        await session.execute(
+                            delete(Meeting).where(Meeting.sid.in_(existing_sections))
+                        )
+                        await session.execute(
+                            delete(Section).where(Section.sid.in_(existing_sections))
+                        )
+                        await session.execute(delete(Course).where(existing_course))
+                        courses.append(course)
+                    try:
+                        logging.info(
+                            f"DB Task: Adding {len(courses)} courses to SQL DB"
+                        )
+                        session.add_all(courses)
+                        await asyncio.wait_for(session.commit(), timeout=30)
+                        logging.info(f"DB Task: Saved {department} to SQL DB")
+                        return True
+                    except asyncio.TimeoutError:
+                        logging.warning(f"DB Task: Commit timeout for {department}.")
+                except IntegrityError as e:
+                    logging.exception(f"DB Task: IntegrityError for {course}: {str(e)}")
+                    await session.rollback()
+                except Exception as e:
+                    logging.exception(
+                        f"DB Task: Error saving course {course_code} to DB: {str(e)}"
+                    )
+                    await session.rollback()
+        return False
+
+    async def update_seats(
+        self, department_data: dict, changed: dict[tuple[str, str], tuple[int, int]]
+    ) -> bool:
+        assert self.session_factory is not None, "SQLSink used before open()"
+        department = department_data["department"]
+        term = department_data["term"]
+        year = department_data["year"]
+        async with self.session_factory() as session:
+            missing = 0
+            for (course_code, section_code), (capacity, usage) in changed.items():
+                result = await session.execute(
+                    update(Section)
+                    .where(
+                        Section.section_code == section_code,
+                        Section.cid.in_(
+                            select(Course.cid).where(
+                                Course.course_code == course_code,
+                                Course.term == term,
+                                Course.year == year,
+                            )
+                        ),
+                    )
+                    .values(capacity=capacity, taken=usage)
+                )
+                missing += result.rowcount == 0
+            if missing:
+                # sections the database never saw need their whole course
+                await session.rollback()
+                logging.info(
+                    f"DB Task: {missing} sections of {department} are not stored yet, "
+                    f"rewriting the department"
+                )
+                return await self.write(department_data)
+            await session.commit()
+        logging.info(f"DB Task: Updated seats of {len(changed)} {department} sections")
+        return True
+
+    async def close(self, terms, fingerprints) -> None:
+        await super().close(terms, fingerprints)
+        if self.engine is not None:
+            await self.engine.dispose()
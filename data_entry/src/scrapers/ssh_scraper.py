@@ -1,22 +1,58 @@
+import abc
 import logging
 from typing import Tuple
-from paramiko import AutoAddPolicy, SSHClient, Channel, SSHConfig
+import asyncssh
+from paramiko import AutoAddPolicy, SSHClient, Channel, SSHConfig, SSHException
 from paramiko.auth_strategy import Password, AuthStrategy
 import re
 from datetime import datetime
 import asyncio
 import os
 import socket
+import threading
+import time
 from src.models.enums import Term
 from src.parsers.ansi_parser import parse_department_page
-from src.constants import TERMS
+from src.constants import (
+    RUMAD_HOST,
+    RUMAD_PORT,
+    SSH_BACKEND,
+    SSH_CONNECT_CONCURRENCY,
+    SSH_DEPARTMENT_ATTEMPTS,
+    SSH_SHELLS_PER_CONNECTION,
+    TERMS,
+    db_to_rumad_terms,
+)
 from pathlib import Path
 
+from src.scrapers.autoscaler import StagePool
+from src.scrapers.cost_model import LongestFirstQueue
+from src.scrapers.journal import SSH, RunJournal
 from src.scrapers.log_utils import get_scraper_run_id
+from src.scrapers.metrics import department_key, get_run_metrics
+from src.scrapers.recording import Recorder, Replay, ReplayPager
 
 MAX_RETRIES = 1
 SSH_ENCODING = "mbcs" if os.name == "nt" else "latin_1"
 
+MORE_PROMPT = "< Oprima Enter o [PF4(9)=Fin] >"
+# RUMAD is waiting for a key once a screen ends in one of these: another page of
+# the department, or the department prompt once there are no more pages
+SCREEN_TERMINATORS = (MORE_PROMPT, "Departamento: ")
+# longest a department's first page and every later page may take. Reads return
+# as soon as the terminator arrives, so only a stuck screen waits this long
+FIRST_PAGE_TIMEOUT = 5.0
+PAGE_TIMEOUT = 5.0
+# a whole screen in one read, SSH packets carry at most 32 KiB
+READ_SIZE = 65536
+
+
+class RumadOutOfStep(Exception):
+    """
+    A page never finished drawing. Whatever is left of it may still arrive, so
+    the channel can no longer tell whose screen it is reading.
+    """
+
 
 def get_term_year(term: str | None = None) -> Tuple[str, int]:
     now = datetime.now()
@@ -29,26 +65,82 @@ def get_term_year(term: str | None = None) -> Tuple[str, int]:
     return (term, year)
 
 
-async def send_input(chan: Channel, inputs: list[Tuple[str, float]]) -> bool:
+async def send_input(
+    chan: "Channel | AsyncRumadChannel",
+    inputs: list[Tuple[str, float]],
+    department: str | None = None,
+) -> bool:
     res = 0
     for x in inputs:
         res = chan.send(x[0].encode(SSH_ENCODING))
         if x[1] >= 0:
             await asyncio.sleep(x[1])
+            get_run_metrics().observe("ssh_sleep", x[1], department)
     return res != 0
 
 
-async def read_channel(chan: Channel) -> str:
-    result = []
-    await asyncio.sleep(0.05)
-    while chan.recv_ready():
-        result.append(chan.recv(1000))
-        await asyncio.sleep(0.03)
+async def read_channel(
+    chan: "Channel | AsyncRumadChannel", department: str | None = None
+) -> str:
+    started = time.perf_counter()
+    if isinstance(chan, AsyncRumadChannel):
+        result = await chan.recv_until_quiet(0.05, 0.03)
+    else:
+        result = []
+        await asyncio.sleep(0.05)
+        while chan.recv_ready():
+            result.append(chan.recv(1000))
+            await asyncio.sleep(0.03)
+    metrics = get_run_metrics()
+    metrics.observe("ssh_read", time.perf_counter() - started, department)
+    metrics.increment("ssh_bytes", sum(map(len, result)), department)
     return "".join(map(lambda b: b.decode(SSH_ENCODING), result))
 
 
-async def setup(chan: Channel, term: str):
-    global term_input
+def find_terminator(buffer: bytearray, terminators: list[bytes], start: int) -> bool:
+    return any(buffer.find(terminator, start) >= 0 for terminator in terminators)
+
+
+async def read_screen(
+    chan: "Channel | AsyncRumadChannel",
+    timeout: float,
+    department: str | None = None,
+    terminators: tuple[str, ...] = SCREEN_TERMINATORS,
+) -> str:
+    """
+    Reads until the screen ends in one of terminators, or for at most timeout
+    seconds, so a page is handed over as soon as RUMAD has drawn it.
+    """
+    started = time.perf_counter()
+    deadline = started + timeout
+    encoded = [terminator.encode(SSH_ENCODING) for terminator in terminators]
+    longest = max(map(len, encoded))
+    buffer = bytearray()
+    while True:
+        if isinstance(chan, AsyncRumadChannel):
+            chunk = await chan.recv_within(deadline - time.perf_counter())
+        elif chan.recv_ready():
+            chunk = chan.recv(READ_SIZE)
+        elif time.perf_counter() < deadline:
+            # paramiko has nothing to await, check back soon
+            await asyncio.sleep(0.005)
+            continue
+        else:
+            chunk = b""
+        if not chunk:
+            break
+        # only the new bytes, and the end of the old ones a terminator may start in
+        searched = max(0, len(buffer) - longest + 1)
+        buffer += chunk
+        if find_terminator(buffer, encoded, searched):
+            break
+    metrics = get_run_metrics()
+    metrics.observe("ssh_read", time.perf_counter() - started, department)
+    metrics.increment("ssh_bytes", len(buffer), department)
+    return buffer.decode(SSH_ENCODING)
+
+
+async def setup(chan: "Channel | AsyncRumadChannel", term: str):
     logging.info(f"SSH Task: Setting up channel {hex(id(chan))} for term {term}")
     await send_input(chan, [("5", 1), ("6", 1)])
     terms_page = await read_channel(chan)
@@ -79,42 +171,569 @@ class PuttyAuth(AuthStrategy):
         yield Password("estudiante", lambda: "")
 
 
-async def initialize_ssh_channels(clients: list[SSHClient]) -> list[Channel]:
-    channels = []
-    for i, ssh in enumerate(clients):
-        logging.info(f"SSH Task: Initializing SSH client {i+1}/{len(clients)}")
-        try:
-            ssh.set_missing_host_key_policy(AutoAddPolicy())
-            ssh.connect(
-                "rumad.uprm.edu",
+class SharedConnection(abc.ABC):
+    """
+    An authenticated RUMAD connection several shells open their channels on,
+    closed once the last of them is. Whichever shell finds it down first
+    connects it again, the others wait for it and reuse the new one.
+    """
+
+    def __init__(self, host: str = RUMAD_HOST, port: int = RUMAD_PORT) -> None:
+        self.host = host
+        self.port = port
+        self.shells = 0
+        self.handshakes = 0
+
+    def attach(self) -> None:
+        self.shells += 1
+
+    def release(self) -> None:
+        self.shells -= 1
+        if self.shells <= 0:
+            self.close()
+
+    @abc.abstractmethod
+    def alive(self) -> bool:
+        """Whether the connection is still up and can open another channel."""
+
+    @abc.abstractmethod
+    async def open(self) -> None:
+        """Connect unless already connected, once however many shells ask at once."""
+
+    @abc.abstractmethod
+    def close(self) -> None:
+        """Close the connection along with every channel still open on it."""
+
+
+class RumadConnection(SharedConnection):
+    def __init__(self, host: str = RUMAD_HOST, port: int = RUMAD_PORT) -> None:
+        super().__init__(host, port)
+        self.client = SSHClient()
+        # shells connect from worker threads
+        self.lock = threading.Lock()
+
+    def alive(self) -> bool:
+        transport = self.client.get_transport()
+        return transport is not None and transport.is_active()
+
+    def connect(self) -> None:
+        with self.lock:
+            if self.alive():
+                return
+            self.client.close()
+            self.client = SSHClient()
+            self.client.set_missing_host_key_policy(AutoAddPolicy())
+            self.client.connect(
+                self.host,
+                port=self.port,
                 username="estudiante",
                 password="",
                 auth_strategy=PuttyAuth(ssh_config=SSHConfig()),
             )
-            channel = ssh.invoke_shell()
-            channel_id = hex(id(channel))
-            logging.info(f"SSH Task: Successfully opened channel {channel_id}")
-            channels.append(channel)
-            await asyncio.sleep(
-                0.0001
-            )  # give some time to process other tasks in the io queue
-        except Exception as e:
-            logging.error(f"SSH Task: Failed to initialize SSH client {i+1}: {str(e)}")
-            raise
-    logging.info(f"SSH Task: Successfully initialized {len(channels)} SSH channels")
-    return channels
+            self.handshakes += 1
+
+    async def open(self) -> None:
+        # paramiko's handshake blocks, in a thread the pool can run several at once
+        await asyncio.to_thread(self.connect)
+
+    def invoke_shell(self) -> Channel:
+        self.connect()
+        return self.client.invoke_shell()
+
+    def close(self) -> None:
+        self.client.close()
+
+
+class RumadShell:
+    """
+    An interactive RUMAD session that remembers which term it has selected, so a
+    single connection can serve departments from any term. Shells given the same
+    connection share its transport, each on a channel of its own.
+    """
+
+    connection_class = RumadConnection
+
+    def __init__(
+        self,
+        host: str = RUMAD_HOST,
+        port: int = RUMAD_PORT,
+        connection: RumadConnection | None = None,
+    ) -> None:
+        self.connection = connection or RumadConnection(host, port)
+        self.connection.attach()
+        self.channel: Channel | None = None
+        self.term: str | None = None
+        self.closed = False
+
+    @property
+    def id(self) -> str:
+        return hex(id(self.channel))
+
+    def connect(self) -> None:
+        self.channel = self.connection.invoke_shell()
+        self.term = None
+        logging.info(f"SSH Task: Successfully opened channel {self.id}")
+
+    async def open(self) -> None:
+        await asyncio.to_thread(self.connect)
+
+    def healthy(self) -> bool:
+        return (
+            self.channel is not None
+            and not self.channel.closed
+            and self.connection.alive()
+        )
+
+    async def select_term(self, term: str) -> Channel:
+        if self.channel is None:
+            raise RuntimeError("SSH Task: Shell used before connecting")
+        if self.term == term:
+            return self.channel
+        if self.term is not None:
+            # A fresh shell on the already authenticated transport starts back at
+            # the main menu without paying for another TCP and SSH handshake
+            logging.info(
+                f"SSH Task: Switching channel {self.id} from term {self.term} to {term}"
+            )
+            old_channel = self.channel
+            self.channel = await asyncio.to_thread(self.connection.invoke_shell)
+            old_channel.close()
+        self.term = None
+        await setup(self.channel, term)
+        self.term = term
+        return self.channel
+
+    async def reconnect(self) -> None:
+        """A new channel, on a new transport only if the shared one went down."""
+        if self.channel is not None:
+            self.channel.close()
+        await self.open()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        if self.channel is not None:
+            self.channel.close()
+        self.connection.release()
+
+
+class AsyncRumadChannel:
+    """
+    An asyncssh session answering the calls the scraper makes on a paramiko
+    Channel. Sending only buffers, and reading waits on the socket for RUMAD's
+    next screen instead of polling recv_ready.
+    """
+
+    def __init__(self, process: asyncssh.SSHClientProcess) -> None:
+        self.process = process
+
+    def send(self, data: bytes) -> int:
+        self.process.stdin.write(data)
+        return len(data)
+
+    async def recv_within(self, timeout: float) -> bytes:
+        """The next bytes RUMAD sends, or b"" if none come within timeout."""
+        if timeout <= 0:
+            return b""
+        try:
+            async with asyncio.timeout(timeout):
+                return await self.process.stdout.read(READ_SIZE)
+        except TimeoutError:
+            return b""
+
+    async def recv_until_quiet(self, first_wait: float, quiet: float) -> list[bytes]:
+        """
+        What RUMAD sends, waiting up to first_wait for it to start and returning
+        once it has been quiet for quiet seconds, like read_channel's polling.
+        """
+        result = []
+        wait = first_wait
+        while True:
+            try:
+                async with asyncio.timeout(wait):
+                    chunk = await self.process.stdout.read(1000)
+            except TimeoutError:
+                break
+            if not chunk:
+                break
+            result.append(chunk)
+            wait = quiet
+        return result
+
+    def close(self) -> None:
+        self.process.close()
+
+
+class AsyncRumadConnection(SharedConnection):
+    def __init__(self, host: str = RUMAD_HOST, port: int = RUMAD_PORT) -> None:
+        super().__init__(host, port)
+        self.connection: asyncssh.SSHClientConnection | None = None
+        self.lock = asyncio.Lock()
+
+    def alive(self) -> bool:
+        return self.connection is not None and not self.connection.is_closed()
+
+    async def open(self) -> None:
+        async with self.lock:
+            if self.alive():
+                return
+            if self.connection is not None:
+                self.connection.close()
+            self.connection = await asyncssh.connect(
+                self.host,
+                self.port,
+                username="estudiante",
+                password="",
+                known_hosts=None,
+                client_keys=None,
+                agent_path=None,
+                preferred_auth="password",
+            )
+            self.handshakes += 1
+
+    async def invoke_shell(self) -> AsyncRumadChannel:
+        await self.open()
+        # the same terminal paramiko's invoke_shell asks for
+        process = await self.connection.create_process(
+            term_type="vt100", term_size=(80, 24), encoding=None
+        )
+        return AsyncRumadChannel(process)
+
+    def close(self) -> None:
+        if self.connection is not None:
+            self.connection.close()
+
+
+class AsyncRumadShell:
+    """
+    RumadShell on asyncssh: the handshake, term switches and every read and write
+    are awaited on the event loop, so a slow RUMAD only holds up its own channel.
+    """
+
+    connection_class = AsyncRumadConnection
+
+    def __init__(
+        self,
+        host: str = RUMAD_HOST,
+        port: int = RUMAD_PORT,
+        connection: AsyncRumadConnection | None = None,
+    ) -> None:
+        self.connection = connection or AsyncRumadConnection(host, port)
+        self.connection.attach()
+        self.channel: AsyncRumadChannel | None = None
+        self.term: str | None = None
+        self.closed = False
+
+    @property
+    def id(self) -> str:
+        return hex(id(self.channel))
+
+    async def open(self) -> None:
+        self.channel = await self.connection.invoke_shell()
+        self.term = None
+        logging.info(f"SSH Task: Successfully opened channel {self.id}")
+
+    def healthy(self) -> bool:
+        return (
+            self.channel is not None
+            and not self.channel.process.is_closing()
+            and self.connection.alive()
+        )
+
+    async def select_term(self, term: str) -> AsyncRumadChannel:
+        if self.channel is None:
+            raise RuntimeError("SSH Task: Shell used before connecting")
+        if self.term == term:
+            return self.channel
+        if self.term is not None:
+            logging.info(
+                f"SSH Task: Switching channel {self.id} from term {self.term} to {term}"
+            )
+            old_channel = self.channel
+            self.channel = await self.connection.invoke_shell()
+            old_channel.close()
+        self.term = None
+        await setup(self.channel, term)
+        self.term = term
+        return self.channel
+
+    async def reconnect(self) -> None:
+        """A new channel, on a new connection only if the shared one went down."""
+        if self.channel is not None:
+            self.channel.close()
+        await self.open()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        if self.channel is not None:
+            self.channel.close()
+        self.connection.release()
+
+
+Shell = RumadShell | AsyncRumadShell
+
+SSH_BACKENDS: dict[str, type[Shell]] = {
+    "paramiko": RumadShell,
+    "asyncssh": AsyncRumadShell,
+}
+
+# what a broken RUMAD connection raises on either backend
+# a channel out of step is replaced like a dropped one
+SSH_ERRORS = (socket.error, SSHException, asyncssh.Error, RumadOutOfStep)
+
+
+class SSHChannelPool:
+    """
+    A set of RUMAD shells shared by every term scraped in a run, handed out one
+    department at a time.
+
+    Every shells_per_connection shells share one authenticated connection, each
+    on a channel of its own, so the handshakes and RUMAD's connection count
+    shrink by that much. Connections are made concurrently, at most
+    connect_concurrency at once, and shells can be walked to a term before the
+    first department needs them. A shell is checked before it is handed out, a
+    broken one is reconnected in the background while the others keep scraping.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        host: str = RUMAD_HOST,
+        port: int = RUMAD_PORT,
+        backend: str = SSH_BACKEND,
+        connect_concurrency: int = SSH_CONNECT_CONCURRENCY,
+        reconnect_attempts: int = 5,
+        shells_per_connection: int = SSH_SHELLS_PER_CONNECTION,
+    ) -> None:
+        self.backend = backend
+        shell_class = SSH_BACKENDS[backend]
+        shells_per_connection = max(1, shells_per_connection)
+        self.connections = [
+            shell_class.connection_class(host, port)
+            for _ in range(-(-size // shells_per_connection))
+        ]
+        self.shells = [
+            shell_class(host, port, self.connections[i // shells_per_connection])
+            for i in range(size)
+        ]
+        self.connect_concurrency = connect_concurrency
+        self.reconnect_attempts = reconnect_attempts
+        self.idle: list[Shell] = []
+        self.available = asyncio.Condition()
+        self.replacing: set[asyncio.Task] = set()
+        self.replaced = 0
+
+    @property
+    def size(self) -> int:
+        return len(self.shells)
+
+    async def open(self, term: str | None = None) -> list[Shell]:
+        """Connects every shell, and walks them to term if one is given."""
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(max(1, self.connect_concurrency))
+
+        async def connect(i: int, connection: SharedConnection) -> None:
+            async with semaphore:
+                logging.info(
+                    f"SSH Task: Initializing SSH client {i+1}/{len(self.connections)}"
+                )
+                await connection.open()
+
+        async def warm(shell: Shell) -> None:
+            await shell.open()
+            if term is not None:
+                await shell.select_term(term)
+
+        # a connection that failed is tried again by its shells, and fails them
+        await asyncio.gather(
+            *(connect(i, connection) for i, connection in enumerate(self.connections)),
+            return_exceptions=True,
+        )
+        results = await asyncio.gather(
+            *(warm(shell) for shell in self.shells), return_exceptions=True
+        )
+        failures = [result for result in results if isinstance(result, Exception)]
+        if len(failures) == self.size and failures:
+            logging.error(f"SSH Task: Failed to initialize any SSH client: {failures[0]}")
+            raise failures[0]
+        for shell, result in zip(self.shells, results):
+            if isinstance(result, Exception):
+                logging.error(
+                    f"SSH Task: Failed to initialize SSH client, "
+                    f"retrying in the background: {str(result)}"
+                )
+                self.replace(shell, term)
+            else:
+                self.idle.append(shell)
+        logging.info(
+            f"SSH Task: Initialized {len(self.idle)}/{self.size} SSH channels over "
+            f"{len(self.connections)} connections with {self.backend} "
+            f"in {time.perf_counter() - started:.2f}s"
+            + (f", ready on term {term}" if term is not None else "")
+        )
+        return self.shells
+
+    async def warm(self, term: str) -> None:
+        """Walks every idle shell to term at once."""
+        await asyncio.gather(*(shell.select_term(term) for shell in self.idle))
+
+    async def acquire(self, term: str | None = None) -> Shell:
+        """
+        A healthy shell, one already on term if any is idle, waiting for one to
+        be released or reconnected if none is.
+        """
+        async with self.available:
+            while True:
+                await self.available.wait_for(
+                    lambda: self.idle or not self.shells
+                )
+                if not self.idle:
+                    raise RuntimeError("SSH Task: Every SSH channel was lost")
+                shell = next(
+                    (shell for shell in self.idle if shell.term == term), self.idle[0]
+                )
+                self.idle.remove(shell)
+                if shell.healthy():
+                    return shell
+                logging.warning(f"SSH Task: Channel {shell.id} is broken, replacing it")
+                self.replace(shell, shell.term)
+
+    async def release(self, shell: Shell, broken: bool = False) -> None:
+        if broken or not shell.healthy():
+            self.replace(shell, shell.term)
+            return
+        async with self.available:
+            self.idle.append(shell)
+            self.available.notify()
+
+    def replace(self, shell: Shell, term: str | None) -> None:
+        """Reconnects shell in the background, back on term, and returns it to idle."""
+        task = asyncio.create_task(self.reconnect(shell, term))
+        self.replacing.add(task)
+        task.add_done_callback(self.replacing.discard)
+
+    async def reconnect(self, shell: Shell, term: str | None) -> None:
+        for attempt in range(1, self.reconnect_attempts + 1):
+            try:
+                await shell.reconnect()
+                if term is not None:
+                    await shell.select_term(term)
+                break
+            except Exception as e:
+                logging.error(
+                    f"SSH Task: Reconnecting a channel failed "
+                    f"(attempt {attempt}/{self.reconnect_attempts}): {str(e)}"
+                )
+                await asyncio.sleep(min(30, 2**attempt))
+        else:
+            logging.critical("SSH Task: Gave up reconnecting a channel, dropping it")
+            shell.close()
+            self.shells.remove(shell)
+            async with self.available:
+                # waiters may be left without any shell to wait for
+                self.available.notify_all()
+            return
+        self.replaced += 1
+        logging.info(f"SSH Task: Channel {shell.id} is back in the pool")
+        async with self.available:
+            self.idle.append(shell)
+            self.available.notify()
+
+    @property
+    def handshakes(self) -> int:
+        return sum(connection.handshakes for connection in self.connections)
+
+    def close(self) -> None:
+        for task in self.replacing:
+            task.cancel()
+        for shell in self.shells:
+            shell.close()
+
+
+class ChannelPager:
+    """
+    Walks the RUMAD pages of one department on a live channel, keeping every raw
+    page with its timing so the department can be recorded for replay.
+
+    The Enter for the next page can be sent before the current one is parsed,
+    RUMAD draws it meanwhile and next() only waits for what is left.
+    """
+
+    def __init__(self, channel: Channel | AsyncRumadChannel, key: str) -> None:
+        self.channel = channel
+        self.key = key
+        self.pages: list[tuple[float, str]] = []
+        self.started = time.perf_counter()
+        self.requested: float | None = None
+
+    async def open(self, department: str) -> str:
+        await send_input(self.channel, [(f"{department}\n", -1)], self.key)
+        self.requested = time.perf_counter()
+        # setup leaves the department prompt unread, it comes ahead of the page
+        return await self._read(FIRST_PAGE_TIMEOUT, (MORE_PROMPT,))
+
+    async def request_next(self) -> None:
+        await send_input(self.channel, [("\n", -1)], self.key)
+        self.requested = time.perf_counter()
+
+    async def next(self) -> str:
+        if self.requested is None:
+            await self.request_next()
+        page = await self._read(PAGE_TIMEOUT)
+        if not any(terminator in page for terminator in SCREEN_TERMINATORS):
+            # the rest of the page would be taken for the next department's
+            get_run_metrics().increment("ssh_page_timeout", department=self.key)
+            raise RumadOutOfStep(
+                f"a page of {self.key} took over {PAGE_TIMEOUT:g}s to draw"
+            )
+        return page
+
+    async def _read(
+        self, timeout: float, terminators: tuple[str, ...] = SCREEN_TERMINATORS
+    ) -> str:
+        page = await read_screen(self.channel, timeout, self.key, terminators)
+        now = time.perf_counter()
+        get_run_metrics().observe("ssh_page", now - self.requested, self.key)
+        self.requested = None
+        self.pages.append((now - self.started, page))
+        return page
 
 
-async def scrape_department_availability(channel, department_data: dict):
+async def scrape_department_availability(
+    channel, department_data: dict, recorder: Recorder | None = None
+):
+    key = department_key(
+        department_data["department"], department_data["term"], department_data["year"]
+    )
+    pager = ChannelPager(channel, key)
+    try:
+        return await scrape_department_pages(pager, department_data, hex(id(channel)))
+    finally:
+        if recorder is not None:
+            await recorder.ssh(
+                department_data["department"],
+                department_data["term"],
+                department_data["year"],
+                pager.pages,
+            )
+
+
+async def scrape_department_pages(
+    pager: ChannelPager | ReplayPager, department_data: dict, channel_id: str
+):
     department = department_data["department"]
-    channel_id = hex(id(channel))
     scraped_year = None
+    metrics = get_run_metrics()
+    key = department_key(department, department_data["term"], department_data["year"])
 
     logging.info(f"SSH Task: Channel {channel_id} started scraping {department}")
-    await send_input(channel, [(f"{department}\n", 5)])
-    raw_department_result = await read_channel(channel)
+    started = time.perf_counter()
+    raw_department_result = await pager.open(department)
 
-    if "< Oprima Enter o [PF4(9)=Fin] >" not in raw_department_result:
+    if MORE_PROMPT not in raw_department_result:
         logging.warning(
             f"SSH Task: No section availability data found for {department} on channel {channel_id}"
         )
@@ -123,12 +742,16 @@ async def scrape_department_availability(channel, department_data: dict):
 
     courses = {}
     page_count = 0
-    while "< Oprima Enter o [PF4(9)=Fin] >" in raw_department_result:
+    while MORE_PROMPT in raw_department_result:
         page_count += 1
+        metrics.increment("ssh_pages", 1, key)
+        # RUMAD draws the next page while this one is parsed
+        await pager.request_next()
         logging.debug(
             f"SSH Task: Processing page {page_count} for department {department} on channel {channel_id}"
         )
-        parsed_page = parse_department_page(raw_department_result)
+        with metrics.timer("ansi_parse", key):
+            parsed_page = parse_department_page(raw_department_result)
         course = parsed_page.get("courseCode", None)
         if scraped_year is None and "year" in parsed_page:
             scraped_year = parsed_page["year"]
@@ -140,8 +763,7 @@ async def scrape_department_availability(channel, department_data: dict):
             logging.debug(
                 f"SSH Task: No valid course or sections found on page {page_count} for {department}"
             )
-            await send_input(channel, [("\n", 0.5)])
-            raw_department_result = await read_channel(channel)
+            raw_department_result = await pager.next()
             continue
 
         if course not in courses:
@@ -156,8 +778,7 @@ async def scrape_department_availability(channel, department_data: dict):
             f"SSH Task: Added {sections_count} sections for course {course} (department {department})"
         )
 
-        await send_input(channel, [("\n", 1)])
-        raw_department_result = await read_channel(channel)
+        raw_department_result = await pager.next()
 
     if scraped_year is None or scraped_year != department_data["year"]:
         logging.warning(
@@ -175,48 +796,113 @@ async def scrape_department_availability(channel, department_data: dict):
                     existingSection["usage"] = scrapedSection["usage"]
                     updated_sections_count += 1
 
+    seconds = time.perf_counter() - started
     logging.info(
-        f"SSH Task: Finished scraping {department} on channel {channel_id}: processed {page_count} pages, "
+        f"SSH Task: Finished scraping {department} on channel {channel_id}: processed {page_count} pages "
+        f"in {seconds:.2f}s ({page_count / max(seconds, 1e-9):.1f} pages/s), "
         f"found {len(courses)} courses, updated {updated_sections_count} sections"
     )
     return department_data
 
 
 async def ssh_scraper_task(
-    rumad_term: str,
-    ssh_queue: asyncio.Queue,
+    ssh_queue: LongestFirstQueue,
     db_queue: asyncio.Queue,
-    channel: Channel,
+    pool: SSHChannelPool,
+    stage: StagePool | None = None,
+    journal: RunJournal | None = None,
+    recorder: Recorder | None = None,
+    slot: int = 0,
+    attempts: dict[str, int] | None = None,
+    max_attempts: int = SSH_DEPARTMENT_ATTEMPTS,
 ):
-    task_id = hex(id(channel))[-6:]  # Use last 6 chars of channel id as task identifier
-    logging.info(f"SSH Task: Starting scraper task {task_id} for term {rumad_term}")
-
-    try:
-        await setup(channel, rumad_term)
-        departments_processed = 0
-
-        while True:
-            try:
-                department_data = await ssh_queue.get()
-                department = department_data["department"]
-                departments_processed += 1
+    """
+    Adds RUMAD availability to departments from ssh_queue. A department whose
+    channel breaks goes back on ssh_queue for another channel, up to max_attempts
+    times counted in attempts, which every task of the stage shares.
+    """
+    if attempts is None:
+        attempts = {}
+    task_id = str(slot)
+    logging.info(f"SSH Task: Starting scraper task {task_id}")
+    departments_processed = 0
+
+    while stage is None or stage.keep_running():
+        department_data = await ssh_queue.get()
+        started = time.monotonic()
+        try:
+            department = department_data["department"]
+            key = department_key(
+                department, department_data["term"], department_data["year"]
+            )
+            get_run_metrics().dequeued("ssh", key)
+            rumad_term = db_to_rumad_terms.get(department_data["term"])
+            departments_processed += 1
 
+            reached, journaled_data = (
+                journal.progress(
+                    department, department_data["term"], department_data["year"]
+                )
+                if journal
+                else (None, None)
+            )
+            if reached == SSH and journaled_data is not None:
                 logging.info(
-                    f"SSH Task: Task {task_id} processing department {department} (#{departments_processed})"
+                    f"SSH Task: {department} already has availability data in the journal"
+                )
+                get_run_metrics().enqueued("db", key)
+                await db_queue.put(journaled_data)
+                continue
+
+            if rumad_term is None:
+                logging.warning(
+                    f"SSH Task: Term {department_data['term']} has no RUMAD equivalent, "
+                    f"passing {department} through without availability data"
                 )
+                if journal is not None:
+                    journal.reached(
+                        department,
+                        department_data["term"],
+                        department_data["year"],
+                        SSH,
+                        department_data,
+                    )
+                get_run_metrics().enqueued("db", key)
+                await db_queue.put(department_data)
+                continue
+
+            logging.info(
+                f"SSH Task: Task {task_id} processing department {department} "
+                f"for {rumad_term} (#{departments_processed})"
+            )
 
+            # a healthy shell, on this term already if one is free
+            shell = await pool.acquire(rumad_term)
+            broken = False
+            try:
                 retry_count = 0
                 while retry_count < MAX_RETRIES:
                     try:
-                        updated_data = await scrape_department_availability(
-                            channel, department_data
-                        )
+                        channel = await shell.select_term(rumad_term)
+                        with get_run_metrics().timer("ssh_scrape", key):
+                            updated_data = await scrape_department_availability(
+                                channel, department_data, recorder
+                            )
+                        if journal is not None:
+                            journal.reached(
+                                department,
+                                department_data["term"],
+                                department_data["year"],
+                                SSH,
+                                updated_data,
+                            )
+                        get_run_metrics().enqueued("db", key)
                         await db_queue.put(updated_data)
                         logging.debug(
                             f"SSH Task: Successfully queued data for {department} to database"
                         )
                         break
-                    except socket.error as e:
+                    except SSH_ERRORS as e:
                         retry_count += 1
                         logging.error(
                             f"SSH Task: Socket error while scraping {department} on task {task_id} "
@@ -224,27 +910,84 @@ async def ssh_scraper_task(
                         )
                         if retry_count >= MAX_RETRIES:
                             logging.critical(
-                                f"SSH Task: Max retries exceeded for {department}, reconnecting channel"
+                                f"SSH Task: Max retries exceeded for {department}, replacing channel"
                             )
-                            channel = (await initialize_ssh_channels([SSHClient()]))[0]
-                            await setup(channel, rumad_term)
-                            # Put back in queue for another attempt after reconnection
-                            await ssh_queue.put(department_data)
-                            ssh_queue.task_done()
-                            continue
+                            broken = True
+                            attempts[key] = attempts.get(key, 0) + 1
+                            if attempts[key] < max_attempts:
+                                # another channel tries it, requeue never waits
+                                # for room so a stage of failing tasks cannot stall
+                                get_run_metrics().enqueued("ssh", key)
+                                ssh_queue.requeue(department_data)
+                                break
+                            logging.error(
+                                f"SSH Task: {department} failed on {attempts[key]} channels, "
+                                f"storing it without availability data"
+                            )
+                            get_run_metrics().increment("ssh_gave_up", department=key)
+                            if journal is not None:
+                                journal.reached(
+                                    department,
+                                    department_data["term"],
+                                    department_data["year"],
+                                    SSH,
+                                    department_data,
+                                )
+                            get_run_metrics().enqueued("db", key)
+                            await db_queue.put(department_data)
+                            break
                         await asyncio.sleep(retry_count * 2)  # Exponential backoff
+            finally:
+                # a broken shell is reconnected in the background
+                await pool.release(shell, broken)
 
-                ssh_queue.task_done()
-                logging.info(
-                    f"SSH Task: Task {task_id} completed processing department {department}"
-                )
+            logging.info(
+                f"SSH Task: Task {task_id} completed processing department {department}"
+            )
+        except Exception as e:
+            logging.exception(f"SSH Task: Unexpected error in task {task_id}: {str(e)}")
+        finally:
+            ssh_queue.task_done()
+            if stage is not None:
+                stage.record(time.monotonic() - started)
+    logging.info(f"SSH Task: Scraper task {task_id} stopped")
 
-            except Exception as e:
-                logging.exception(
-                    f"SSH Task: Unexpected error in task {task_id}: {str(e)}"
+
+async def replay_ssh_task(
+    ssh_queue: asyncio.Queue,
+    db_queue: asyncio.Queue,
+    replay: Replay,
+    stage: StagePool | None = None,
+    journal: RunJournal | None = None,
+):
+    """Stands in for ssh_scraper_task, feeding recorded RUMAD pages through the parser."""
+    while stage is None or stage.keep_running():
+        department_data = await ssh_queue.get()
+        started = time.monotonic()
+        try:
+            department = department_data["department"]
+            term, year = department_data["term"], department_data["year"]
+            key = department_key(department, term, year)
+            get_run_metrics().dequeued("ssh", key)
+            pager = replay.pager(department, term, year)
+            if pager is None:
+                logging.warning(
+                    f"SSH Task: {department} {term} {year} is not in the recording, "
+                    f"passing it through without availability data"
                 )
-                # Make sure to mark task as done even if it fails
-                ssh_queue.task_done()
-    except Exception as e:
-        logging.exception(f"SSH Task: Fatal error in scraper task {task_id}: {str(e)}")
-        raise
+                updated_data = department_data
+            else:
+                with get_run_metrics().timer("ssh_scrape", key):
+                    updated_data = await scrape_department_pages(
+                        pager, department_data, "replay"
+                    )
+            if journal is not None:
+                journal.reached(department, term, year, SSH, updated_data)
+            get_run_metrics().enqueued("db", key)
+            await db_queue.put(updated_data)
+        except Exception as e:
+            logging.exception(f"SSH Task: Unexpected error replaying: {str(e)}")
+        finally:
+            ssh_queue.task_done()
+            if stage is not None:
+                stage.record(time.monotonic() - started)
@@ -0,0 +1,289 @@
+import argparse
+import asyncio
+import hashlib
+import html
+import logging
+import random
+from pathlib import Path
+
+from aiohttp import web
+
+from src.constants import number_to_db_term
+from src.scrapers.recording import Replay
+
+DAYS = ("LW", "MJ", "LMV", "V", "S")
+BUILDINGS = ("S", "F", "CH", "EE", "AE", "M")
+NAMES = ("JUAN", "MARIA", "JOSE", "ANA", "LUIS", "CARMEN", "PEDRO", "ROSA")
+LASTNAMES = ("RIVERA", "TORRES", "CRUZ", "ORTIZ", "DEL VALLE", "PEREZ", "SANTIAGO")
+
+
+def synthetic_department(department: str, seed: int = 0) -> list[dict]:
+    """
+    Deterministic fake offering for a department, with the skew of the real one:
+    most departments are small and a few have hundreds of sections.
+    """
+    rng = random.Random(f"{seed}:{department}")
+    course_count = int(rng.paretovariate(1.2) * 4) if rng.random() > 0.05 else 0
+    courses = []
+    course_count = min(course_count, 120)
+    for i in range(course_count):
+        # spread over the 3000 to 6000 levels like real course numbers, in order
+        code = f"{department}{3 + i * 4 // course_count}{i * 7 + 1:03d}"
+        sections = []
+        for j in range(rng.randint(1, 8)):
+            hour = rng.randint(7, 18)
+            sections.append(
+                {
+                    "sectionCode": f"{j * 10 + 10:03d}"
+                    + ("L" if rng.random() < 0.1 else ""),
+                    "meetings": [
+                        f"{hour}:30 am - {hour + 1}:20 am {rng.choice(DAYS)} "
+                        f"{rng.choice(BUILDINGS)} {rng.randint(100, 400)}"
+                    ],
+                    "professors": [
+                        f"{rng.choice(NAMES)} {rng.choice(LASTNAMES)}"
+                        for _ in range(rng.choice((1, 1, 1, 2)))
+                    ],
+                }
+            )
+        courses.append(
+            {
+                "courseCode": code,
+                "courseName": f"COURSE {i + 1} OF {department}",
+                "credits": rng.choice((0, 1, 3, 3, 3, 4)),
+                "division": rng.choice(("Pre", "Pre", "Post")),
+                "prerequisites": (
+                    f"{department}{3000 + i:04d}" if i and rng.random() < 0.5 else ""
+                ),
+                "corequisites": "",
+                "sections": sections,
+            }
+        )
+    return courses
+
+
+def render_sections_page(courses: list[dict]) -> str:
+    """Renders courses as the registrar's section_results table."""
+    rows = [
+        "<tr><th></th><th>Course / Section</th><th>Credits</th><th>Division</th>"
+        "<th>Meetings</th><th>Professor</th></tr>"
+    ]
+    for course in courses:
+        requisites = f"Enrollment Requisites: {course['prerequisites']}"
+        if course["corequisites"]:
+            requisites += f", Co-Requisites: {course['corequisites']}"
+        for section in course["sections"]:
+            rows.append(
+                "<tr>"
+                '<td><input type="checkbox"></td>'
+                f"<td>{html.escape(course['courseName'])}<br>"
+                f"{course['courseCode']}-{section['sectionCode']}</td>"
+                f"<td>{course['credits']}</td>"
+                f"<td>{course['division']}</td>"
+                f"<td>{'<br>'.join(html.escape(m) for m in section['meetings'])}</td>"
+                f"<td>{'<br>'.join(html.escape(p) for p in section['professors'])}</td>"
+                "</tr>"
+                f"<tr><td></td><td colspan=\"5\">{html.escape(requisites)}</td></tr>"
+            )
+    return (
+        "<html><head><title>Registrar - Course Sections</title></head><body>"
+        "<h1>Course Offering</h1>"
+        f'<table class="section_results">{"".join(rows)}</table>'
+        "</body></html>"
+    )
+
+
+def render_webservice_error() -> str:
+    return (
+        "<html><body><h2>WebService Error</h2>"
+        "<pre>ORA-12541: TNS:no listener</pre></body></html>"
+    )
+
+
+class StandInRegistrar:
+    """
+    A local aiohttp server answering the course offering search like the real
+    registrar does, from a --record archive or from synthetic departments.
+
+    Latency, failures, WebService Error pages and occasional slow responses can be
+    dialed in to load test the web stage without touching the university. Pages
+    carry an ETag and conditional requests for an unchanged page get a 304.
+    """
+
+    def __init__(
+        self,
+        replay: Replay | None = None,
+        seed: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        webservice_error_rate: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_latency: float = 5.0,
+    ) -> None:
+        self.replay = replay
+        self.seed = seed
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.webservice_error_rate = webservice_error_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.not_modified = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.runner: web.AppRunner | None = None
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/{tail:.*}", self.handle)
+        return app
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            delay = self.latency + self.rng.uniform(0, self.jitter)
+            if self.rng.random() < self.slow_rate:
+                delay += self.slow_latency
+            await asyncio.sleep(delay)
+
+            if self.rng.random() < self.error_rate:
+                return web.Response(status=500, text="Internal Server Error")
+            if self.rng.random() < self.webservice_error_rate:
+                return web.Response(
+                    text=render_webservice_error(), content_type="text/html"
+                )
+
+            department = request.query.get("v1", "").upper()
+            number, _, year = request.query.get("term", "").partition("-")
+            db_term = number_to_db_term.get(number)
+            if not department or db_term is None or not year.isdigit():
+                return web.Response(status=400, text="Bad Request")
+            response = self.page(
+                department, db_term, int(year), request.query.get("v2", "")
+            )
+            if response.status != 200:
+                return response
+            response.etag = hashlib.sha1(response.body).hexdigest()
+            etag = response.headers["ETag"]
+            if request.headers.get("If-None-Match") == etag:
+                self.not_modified += 1
+                return web.Response(status=304, headers={"ETag": etag})
+            return response
+        finally:
+            self.in_flight -= 1
+
+    def page(
+        self, department: str, db_term: str, year: int, course_prefix: str = ""
+    ) -> web.Response:
+        if self.replay is not None:
+            recorded = self.replay.web(department, db_term, year)
+            if recorded is None:
+                return web.Response(
+                    text=render_sections_page([]), content_type="text/html"
+                )
+            status, body = recorded
+            return web.Response(status=status, text=body, content_type="text/html")
+        # v2 narrows the search to course numbers starting with it
+        courses = [
+            course
+            for course in synthetic_department(department, self.seed)
+            if course["courseCode"][4:].startswith(course_prefix)
+        ]
+        return web.Response(
+            text=render_sections_page(courses), content_type="text/html"
+        )
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Starts serving and returns the base URL to give the scraper."""
+        self.runner = web.AppRunner(self.app())
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        bound_port = self.runner.addresses[0][1]
+        url = f"http://{host}:{bound_port}/registrar/sections/index.php"
+        logging.info(f"Stand-in Registrar: Serving on {url}")
+        return url
+
+    async def stop(self) -> None:
+        if self.runner is not None:
+            await self.runner.cleanup()
+        logging.info(
+            f"Stand-in Registrar: Served {self.requests} requests "
+            f"({self.not_modified} not modified), at most {self.max_in_flight} at once"
+        )
+
+
+async def serve(registrar: StandInRegistrar, host: str, port: int) -> None:
+    url = await registrar.start(host, port)
+    print(f"Point the scraper at it with REGISTRAR_URL={url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await registrar.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Local stand-in for the registrar course offering search",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--replay",
+        metavar="ARCHIVE",
+        help="Serve the pages of a --record archive instead of synthetic departments",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed for synthetic data")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds per response"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="Extra random seconds per response"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Fraction of HTTP 500 responses"
+    )
+    parser.add_argument(
+        "--webservice-error-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of WebService Error pages",
+    )
+    parser.add_argument(
+        "--slow-rate", type=float, default=0.0, help="Fraction of slow responses"
+    )
+    parser.add_argument(
+        "--slow-latency",
+        type=float,
+        default=5.0,
+        help="Extra seconds of a slow response",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
+    registrar = StandInRegistrar(
+        replay=Replay(Path(args.replay)) if args.replay else None,
+        seed=args.seed,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        webservice_error_rate=args.webservice_error_rate,
+        slow_rate=args.slow_rate,
+        slow_latency=args.slow_latency,
+    )
+    try:
+        asyncio.run(serve(registrar, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+import argparse
+import asyncio
+import datetime
+import logging
+import random
+import threading
+from pathlib import Path
+
+import asyncssh
+
+from src.constants import rumad_to_db_terms
+from src.models.enums import Term
+from src.scrapers.recording import Replay
+from src.scrapers.standins.registrar import synthetic_department
+
+ESC = "\x1b"
+MORE_PROMPT = "< Oprima Enter o [PF4(9)=Fin] >"
+FIRST_SECTION_ROW = 9
+SECTIONS_PER_PAGE = 12
+
+
+def at(row: int, column: int, text: str = "") -> str:
+    return f"{ESC}[{row};{column}H{text}"
+
+
+def render_main_menu() -> str:
+    return (
+        f"{ESC}[2J"
+        + at(2, 25, "UNIVERSIDAD DE PUERTO RICO - RUM")
+        + at(8, 20, "5 - Consultas")
+        + at(22, 20, "Seleccione opcion: ")
+    )
+
+
+def render_term_menu() -> str:
+    return (
+        f"{ESC}[2J"
+        + at(2, 25, "Seleccione el termino")
+        + "".join(
+            at(6 + i, 20, f"{i + 1}={term.value}") for i, term in enumerate(Term)
+        )
+        + at(22, 20, "Termino: ")
+    )
+
+
+def render_department_prompt() -> str:
+    return f"{ESC}[2J" + at(22, 1, "Departamento: ")
+
+
+def render_rumad_pages(
+    department: str, rumad_term: str, year: int, seed: int = 0
+) -> list[str]:
+    """
+    The availability screens RUMAD shows for a department, built from the same
+    synthetic offering the stand-in registrar serves so the two agree.
+    """
+    rng = random.Random(f"{seed}:{department}:seats")
+    # the header writes the term as e.g. "1er Sem"
+    term_label = f"{rumad_term[:3]} {rumad_term[3:]}"
+    pages = []
+    for course in synthetic_department(department, seed):
+        code = course["courseCode"]
+        sections = course["sections"]
+        for start in range(0, len(sections), SECTIONS_PER_PAGE):
+            page = [
+                f"{ESC}[2J",
+                at(3, 41, f"{term_label}  {year}-{year + 1}") + at(3, 59),
+                at(5, 13, f"{code[:4]} {code[4:]}") + at(5, 23),
+            ]
+            for row, section in enumerate(
+                sections[start : start + SECTIONS_PER_PAGE], FIRST_SECTION_ROW
+            ):
+                capacity = rng.choice((15, 20, 25, 30, 45, 60))
+                usage = rng.randint(0, capacity + 3)
+                remaining = capacity - usage
+                # overbooked sections show the remaining seats with a trailing minus
+                remaining_text = f"{abs(remaining):>4}{'-' if remaining < 0 else ' '}"
+                page.append(
+                    at(row, 1, f" {section['sectionCode']}")
+                    + at(row, 5)
+                    + at(row, 63, f"{capacity:>4}")
+                    + at(row, 67)
+                    + at(row, 69, f"{usage:>4} ")
+                    + at(row, 74)
+                    + at(row, 75, remaining_text)
+                    + at(row, 80)
+                )
+            page.append(at(22, 1, " ") + at(22, 48, MORE_PROMPT) + at(22, 79))
+            pages.append("".join(page))
+    return pages
+
+
+class StandInRumad:
+    """
+    A local asyncssh server walking through RUMAD's terminal flow: main menu, "5",
+    "6", term selection, then a department name followed by one Enter per page.
+
+    Pages come from a --record archive or are synthesized. Every screen is sent
+    after a configurable latency, like keystrokes round-tripping to the real host.
+    """
+
+    def __init__(
+        self,
+        replay: Replay | None = None,
+        seed: int = 0,
+        year: int | None = None,
+        latency: float = 0.0,
+    ) -> None:
+        self.replay = replay
+        self.seed = seed
+        self.year = year or datetime.datetime.now().year
+        self.latency = latency
+        self.server: asyncssh.SSHAcceptor | None = None
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.sessions = 0
+        self.active_sessions = 0
+        self.max_active_sessions = 0
+        self.pages_served = 0
+        # stop() ends the sessions still open, the server only stops accepting
+        self.session_tasks: set[asyncio.Task] = set()
+
+    def pages(self, department: str, rumad_term: str) -> list[str]:
+        if self.replay is None:
+            return render_rumad_pages(department, rumad_term, self.year, self.seed)
+        db_term = rumad_to_db_terms.get(rumad_term)
+        for key, pages in self.replay.ssh_pages.items():
+            recorded_department, recorded_term, _ = key.rsplit(":", 2)
+            if (recorded_department, recorded_term) == (department, db_term):
+                # the archive keeps the closing screen too, the server adds its own
+                return [page for page in pages if MORE_PROMPT in page]
+        return []
+
+    async def send(self, process: asyncssh.SSHServerProcess, screen: str) -> None:
+        await asyncio.sleep(self.latency)
+        process.stdout.write(screen)
+
+    async def handle(self, process: asyncssh.SSHServerProcess) -> None:
+        task = asyncio.current_task()
+        self.session_tasks.add(task)
+        self.sessions += 1
+        self.active_sessions += 1
+        self.max_active_sessions = max(self.max_active_sessions, self.active_sessions)
+        try:
+            await self.send(process, render_main_menu())
+            rumad_term = None
+            typed = ""
+            pages: list[str] = []
+            while True:
+                key = await process.stdin.read(1)
+                if not key:
+                    break
+                if rumad_term is None:
+                    if key == "5":
+                        await self.send(process, at(8, 20, "6 - Secciones"))
+                    elif key == "6":
+                        await self.send(process, render_term_menu())
+                    elif key.isdigit() and 1 <= int(key) <= len(Term):
+                        rumad_term = list(Term)[int(key) - 1].value
+                        await self.send(process, render_department_prompt())
+                elif key in "\r\n":
+                    if typed:
+                        pages = self.pages(typed.strip().upper(), rumad_term)
+                        typed = ""
+                    if pages:
+                        self.pages_served += 1
+                        await self.send(process, pages.pop(0))
+                    else:
+                        await self.send(process, render_department_prompt())
+                else:
+                    typed += key
+        except (asyncssh.BreakReceived, asyncssh.TerminalSizeChanged):
+            pass
+        finally:
+            self.active_sessions -= 1
+            self.session_tasks.discard(task)
+            process.exit(0)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Starts listening and returns the port to give the scraper."""
+        self.server = await asyncssh.create_server(
+            StandInRumadServer,
+            host,
+            port,
+            server_host_keys=[asyncssh.generate_private_key("ssh-ed25519")],
+            process_factory=self.handle,
+            encoding="latin_1",
+            line_editor=False,
+        )
+        bound_port = self.server.sockets[0].getsockname()[1]
+        logging.info(f"Stand-in RUMAD: Listening on {host}:{bound_port}")
+        return bound_port
+
+    def start_in_thread(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """
+        Serves from its own event loop thread. paramiko blocks while it waits for
+        the server, so a client in the same loop would never get an answer.
+        """
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(
+            self.start(host, port), self.loop
+        ).result()
+
+    def stop_thread(self) -> None:
+        if self.loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.stop(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    async def stop(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        sessions = list(self.session_tasks)
+        for task in sessions:
+            task.cancel()
+        await asyncio.gather(*sessions, return_exceptions=True)
+        logging.info(
+            f"Stand-in RUMAD: Served {self.pages_served} pages over {self.sessions} "
+            f"sessions, at most {self.max_active_sessions} at once"
+        )
+
+
+class StandInRumadServer(asyncssh.SSHServer):
+    """Lets the estudiante account in with its empty password, like RUMAD does."""
+
+    def begin_auth(self, username: str) -> bool:
+        return True
+
+    def password_auth_supported(self) -> bool:
+        return True
+
+    def validate_password(self, username: str, password: str) -> bool:
+        return username == "estudiante"
+
+
+async def serve(rumad: StandInRumad, host: str, port: int) -> None:
+    bound_port = await rumad.start(host, port)
+    print(f"Point the scraper at it with RUMAD_HOST={host} RUMAD_PORT={bound_port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await rumad.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Local stand-in for the RUMAD enrollment server",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8022)
+    parser.add_argument(
+        "--replay",
+        metavar="ARCHIVE",
+        help="Serve the RUMAD pages of a --record archive instead of synthetic ones",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed for synthetic data")
+    parser.add_argument(
+        "--year",
+        type=int,
+        default=datetime.datetime.now().year,
+        help="Academic year shown on synthetic pages",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds before every screen"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
+    rumad = StandInRumad(
+        replay=Replay(Path(args.replay)) if args.replay else None,
+        seed=args.seed,
+        year=args.year,
+        latency=args.latency,
+    )
+    try:
+        asyncio.run(serve(rumad, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,28 @@
 import asyncio
 import logging
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Awaitable, Callable
 import aiohttp
 from aiolimiter import AsyncLimiter
-from bs4 import BeautifulSoup, Tag
 import re
-from src.scrapers.scraper_utils import apply_regex
-from src.constants import db_term_to_number
+import time
+from src.scrapers.autoscaler import StagePool
+from src.scrapers.http_cache import HttpCache
+from src.scrapers.journal import EMPTY, FAILED, SSH, WEB, RunJournal
+from src.scrapers.metrics import department_key, get_run_metrics
+from src.scrapers.professor_index import ProfessorIndex
+from src.scrapers.rate_limit import AdaptiveLimiter, HedgePolicy, RetryPolicy
+from src.scrapers.recording import Recorder, Replay
+from src.scrapers.shards import COURSE_PREFIXES, ShardPlanner, merge_shards
+from src.parsers.section_table_parser import extract_section_table
+from src.constants import HTML_PARSER, REGISTRAR_URL, db_term_to_number
+
+# professor names lose every "del" and have their whitespace collapsed
+del_pattern = re.compile(r"[Dd][Ee][Ll]")
+whitespace_pattern = re.compile(r"\s+")
+section_cell_pattern = re.compile(r"<td[\s>]", re.IGNORECASE)
 
 
 def get_modality(section_code):
@@ -14,50 +31,85 @@ def get_modality(section_code):
     return ""
 
 
-def split_professor(
-    professor: str,
-) -> tuple[str | None, str | None, str | None]:
-    match = re.match(r"(\w+)(?: (\w)\.?)? (\w+)(?: ((\w+\s*)+))?", professor)
-    if match:
-        return (
-            match.group(1),
-            match.group(3),
-            match.group(4) or None,
-        )
-    return None, None, None
+class RegistrarStruggling(Exception):
+    """A failure worth trying again: 5xx, throttling, timeouts, lost connections."""
 
 
-def get_professor_ids(name: str, lastname: str, second_lastname: str) -> list[str]:
-    result = []
-    if not name or not lastname:
-        return result
-    name, lastname = name.lower(), lastname.lower()
-    # if initial and second_lastname:
-    #     result.append(
-    #         f"{name}-{initial.lower()}-{lastname}-{second_lastname.replace(' ', '-').lower()}"
-    #     )
-    if second_lastname:
-        result.append(f"{name}-{lastname}-{second_lastname.replace(' ', '-').lower()}")
-    # if initial:
-    #     result.append(f"{name}-{initial.lower()}-{lastname}")
-    result.append(f"{name}-{lastname}")
-    return result
+class DepartmentUnavailable(Exception):
+    """The registrar could not be asked about a department, unlike having nothing for it."""
 
 
-def get_professor_review(professor_ids: list[str], professors_ids_map: dict[str, dict]):
-    for professor_id in professor_ids:
-        if professors_ids_map.get(professor_id, False):
-            return professors_ids_map[professor_id]
-    return None
+async def scrape_department(
+    session: aiohttp.ClientSession,
+    department: str,
+    db_term: str,
+    year: int,
+    professor_ids_map: ProfessorIndex | dict[str, dict],
+    rate_limit: AsyncLimiter,
+    recorder: Recorder | None = None,
+    registrar_url: str = REGISTRAR_URL,
+    parse_pool: ProcessPoolExecutor | None = None,
+    html_parser: str = HTML_PARSER,
+    http_cache: HttpCache | None = None,
+    retry: RetryPolicy | None = None,
+    shard_planner: ShardPlanner | None = None,
+    hedge: HedgePolicy | None = None,
+    deadline: float | None = None,
+    raise_unavailable: bool = False,
+) -> dict | None:
+    """
+    The department's payload, or None when the registrar had nothing for it or
+    it could not be fetched and parsed within deadline seconds. With
+    raise_unavailable, the latter raises DepartmentUnavailable instead.
+    """
+    try:
+        async with asyncio.timeout(deadline):
+            return await fetch_and_parse_department(
+                session,
+                department,
+                db_term,
+                year,
+                professor_ids_map,
+                rate_limit,
+                recorder,
+                registrar_url,
+                parse_pool,
+                html_parser,
+                http_cache,
+                retry,
+                shard_planner,
+                hedge,
+            )
+    except TimeoutError:
+        key = department_key(department, db_term, year)
+        get_run_metrics().increment("web_deadline_exceeded", department=key)
+        logging.error(
+            f"Web Scraper: {department} missed its {deadline:.0f}s deadline, giving up"
+        )
+        if raise_unavailable:
+            raise DepartmentUnavailable(f"missed the {deadline:.0f}s deadline")
+        return None
+    except DepartmentUnavailable:
+        if raise_unavailable:
+            raise
+        return None
 
 
-async def scrape_department(
+async def fetch_and_parse_department(
     session: aiohttp.ClientSession,
     department: str,
     db_term: str,
     year: int,
-    professor_ids_map: dict[str, dict],
+    professor_ids_map: ProfessorIndex | dict[str, dict],
     rate_limit: AsyncLimiter,
+    recorder: Recorder | None = None,
+    registrar_url: str = REGISTRAR_URL,
+    parse_pool: ProcessPoolExecutor | None = None,
+    html_parser: str = HTML_PARSER,
+    http_cache: HttpCache | None = None,
+    retry: RetryPolicy | None = None,
+    shard_planner: ShardPlanner | None = None,
+    hedge: HedgePolicy | None = None,
 ) -> dict | None:
     numerical_term = db_term_to_number.get(db_term)
     if not numerical_term:
@@ -66,19 +118,312 @@ async def scrape_department(
         )
         return None
 
-    url = f"https://www.uprm.edu/registrar/sections/index.php?v1={department.lower()}&v2=&term={numerical_term}-{str(year)}&a=s&cmd1=Search"
-    logging.info(f"Web Scraper: Fetching URL: {url}")
+    key = department_key(department, db_term, year)
+    metrics = get_run_metrics()
+    url = department_url(registrar_url, department, numerical_term, year)
+    if http_cache is not None and http_cache.is_known_empty(key):
+        metrics.increment("http_cache_negative_hit", department=key)
+        logging.info(
+            f"Web Scraper: Skipping {department}, the registrar recently had no sections for it"
+        )
+        return None
 
-    try:
-        async with rate_limit:
-            response = await session.get(url)
-            if response.status != 200:
+    # recordings hold one page per department, so recorded runs never shard
+    shards = (
+        shard_planner.plan(department)
+        if shard_planner is not None and recorder is None
+        else []
+    )
+    if shards:
+        logging.info(
+            f"Web Scraper: Splitting {department} into {len(shards)} shards: "
+            + " | ".join(",".join(prefixes) for prefixes in shards)
+        )
+        metrics.increment("web_shards", len(shards), department=key)
+        pages: dict[str, str | None] = {}
+
+        async def fetch_shard(prefixes: list[str]):
+            for prefix in prefixes:
+                pages[prefix] = await fetch_with_retries(
+                    session,
+                    department_url(registrar_url, department, numerical_term, year, prefix),
+                    department,
+                    db_term,
+                    year,
+                    rate_limit,
+                    recorder,
+                    http_cache,
+                    retry,
+                    hedge,
+                )
+
+        await asyncio.gather(*(fetch_shard(prefixes) for prefixes in shards))
+        if any(
+            page is None or "WebService Error" in page for page in pages.values()
+        ):
+            logging.error(
+                f"Web Scraper: A shard of {department} failed, dropping the department"
+            )
+            raise DepartmentUnavailable("a shard failed")
+        # parsed side by side on the pool, merged in course number order
+        data = merge_shards(
+            await asyncio.gather(
+                *(
+                    parse_department(
+                        pages[prefix],
+                        department,
+                        db_term,
+                        year,
+                        professor_ids_map,
+                        parse_pool,
+                        html_parser,
+                    )
+                    for prefix in COURSE_PREFIXES
+                    if has_section_rows(pages[prefix])
+                )
+            )
+        )
+        reason = "no sections"
+    else:
+        logging.info(f"Web Scraper: Fetching URL: {url}")
+        content = await fetch_with_retries(
+            session,
+            url,
+            department,
+            db_term,
+            year,
+            rate_limit,
+            recorder,
+            http_cache,
+            retry,
+            hedge,
+        )
+        if content is None:
+            raise DepartmentUnavailable("the page failed")
+        data = await parse_department(
+            content, department, db_term, year, professor_ids_map, parse_pool, html_parser
+        )
+        reason = "WebService Error" if "WebService Error" in content else "no sections"
+
+    if http_cache is not None:
+        if data is None:
+            http_cache.mark_empty(key, reason)
+        else:
+            http_cache.mark_found(key)
+    if data is not None and shard_planner is not None:
+        shard_planner.record(data)
+    return data
+
+
+def department_url(
+    registrar_url: str,
+    department: str,
+    numerical_term: str,
+    year: int,
+    course_prefix: str = "",
+) -> str:
+    return f"{registrar_url}?v1={department.lower()}&v2={course_prefix}&term={numerical_term}-{str(year)}&a=s&cmd1=Search"
+
+
+def has_section_rows(content: str) -> bool:
+    """Whether a filtered page lists any section, most shard prefixes list none."""
+    table = content.find("section_results")
+    return table != -1 and section_cell_pattern.search(content, table) is not None
+
+
+async def fetch_with_retries(
+    session: aiohttp.ClientSession,
+    url: str,
+    department: str,
+    db_term: str,
+    year: int,
+    rate_limit: AsyncLimiter,
+    recorder: Recorder | None = None,
+    http_cache: HttpCache | None = None,
+    retry: RetryPolicy | None = None,
+    hedge: HedgePolicy | None = None,
+) -> str | None:
+    key = department_key(department, db_term, year)
+    metrics = get_run_metrics()
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            sent = asyncio.Event()
+            return await fetch_hedged(
+                lambda: fetch_department_page(
+                    session,
+                    url,
+                    department,
+                    db_term,
+                    year,
+                    rate_limit,
+                    recorder,
+                    http_cache,
+                    sent,
+                ),
+                hedge.delay(metrics) if hedge is not None else None,
+                key,
+                sent,
+            )
+        except RegistrarStruggling as e:
+            if isinstance(rate_limit, AdaptiveLimiter):
+                rate_limit.failed()
+            if retry is None or not retry.should_retry(attempt):
+                metrics.increment("http_gave_up", department=key)
                 logging.error(
-                    f"Web Scraper: HTTP error for {department}: Status Code: {response.status}, URL: {url}"
+                    f"Web Scraper: {str(e)} for {department}, giving up after "
+                    f"{attempt} attempts"
                 )
                 return None
-
-            content = await response.text()
+            delay = retry.delay(attempt)
+            metrics.increment("http_retry", department=key)
+            logging.warning(
+                f"Web Scraper: {str(e)} for {department}, retrying in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+
+
+async def fetch_hedged(
+    fetch: Callable[[], Awaitable[str | None]],
+    hedge_after: float | None,
+    key: str,
+    sent: asyncio.Event | None = None,
+) -> str | None:
+    """
+    Runs fetch, and once it has taken hedge_after seconds runs it a second time
+    and takes whichever answers first, cancelling the other. With sent, the
+    clock starts once fetch sets it, so time queued on the rate limiter does not
+    count. Raises only if both attempts fail.
+    """
+    metrics = get_run_metrics()
+    primary = asyncio.ensure_future(fetch())
+    if hedge_after is None:
+        return await primary
+    hedged = None
+    try:
+        if sent is not None:
+            sending = asyncio.ensure_future(sent.wait())
+            try:
+                await asyncio.wait(
+                    {primary, sending}, return_when=asyncio.FIRST_COMPLETED
+                )
+            finally:
+                sending.cancel()
+        done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+        if done:
+            return primary.result()
+
+        metrics.increment("http_hedged", department=key)
+        hedged = asyncio.ensure_future(fetch())
+        pending = {primary, hedged}
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            answered = [task for task in done if task.exception() is None]
+            if answered:
+                break
+        if not answered:
+            # both failed, the hedge's failure is the later one
+            return hedged.result()
+        if answered[0] is hedged:
+            metrics.increment("http_hedge_won", department=key)
+        return answered[0].result()
+    finally:
+        # the loser would only hold a connection and a rate limit token
+        for task in (primary, hedged):
+            if task is not None and not task.done():
+                task.cancel()
+
+
+async def fetch_department_page(
+    session: aiohttp.ClientSession,
+    url: str,
+    department: str,
+    db_term: str,
+    year: int,
+    rate_limit: AsyncLimiter,
+    recorder: Recorder | None = None,
+    http_cache: HttpCache | None = None,
+    sent: asyncio.Event | None = None,
+) -> str | None:
+    """
+    The page for url, or None when the registrar refused it for good. Raises
+    RegistrarStruggling when asking again later could work. sent is set once the
+    rate limiter lets the request out.
+    """
+    key = department_key(department, db_term, year)
+    metrics = get_run_metrics()
+    try:
+        waiting_since = time.perf_counter()
+        async with rate_limit:
+            metrics.observe(
+                "rate_limit_wait", time.perf_counter() - waiting_since, key
+            )
+            if sent is not None:
+                sent.set()
+            fetch_started = time.perf_counter()
+            with metrics.timer("http_fetch", key):
+                headers = http_cache.conditional_headers(url) if http_cache else {}
+                response = await session.get(url, headers=headers)
+                cached = (
+                    http_cache.body(url)
+                    if http_cache is not None and response.status == 304
+                    else None
+                )
+                if response.status == 304 and cached is None:
+                    # nothing kept to reuse, or a 304 nobody asked for: ask in full
+                    response.release()
+                    metrics.increment("http_cache_stale", department=key)
+                    logging.warning(
+                        f"Web Scraper: {department} not modified but no cached page to reuse, fetching it again"
+                    )
+                    if http_cache is not None:
+                        http_cache.forget(url)
+                    response = await session.get(url)
+                if cached is not None:
+                    response.release()
+                    metrics.increment("http_cache_hit", department=key)
+                    logging.info(
+                        f"Web Scraper: {department} not modified, reusing the cached page"
+                    )
+                    content = cached
+                elif response.status != 200:
+                    logging.error(
+                        f"Web Scraper: HTTP error for {department}: Status Code: {response.status}, URL: {url}"
+                    )
+                    if recorder is not None:
+                        await recorder.web(
+                            department,
+                            db_term,
+                            year,
+                            url,
+                            response.status,
+                            "",
+                            time.perf_counter() - fetch_started,
+                        )
+                    if response.status >= 500 or response.status == 429:
+                        raise RegistrarStruggling(f"HTTP {response.status}")
+                    return None
+                else:
+                    content = await response.text()
+                    if http_cache is not None:
+                        metrics.increment("http_cache_miss", department=key)
+                        http_cache.store(
+                            url,
+                            content,
+                            response.headers.get("ETag"),
+                            response.headers.get("Last-Modified"),
+                        )
+            fetch_time = time.perf_counter() - fetch_started
+            if isinstance(rate_limit, AdaptiveLimiter):
+                rate_limit.succeeded(fetch_time)
+            if recorder is not None:
+                # a revalidated page is recorded as the 200 it stands for
+                await recorder.web(
+                    department, db_term, year, url, 200, content, fetch_time
+                )
             content_length = len(content)
             logging.debug(
                 f"Web Scraper: Received {content_length} bytes for {department}"
@@ -89,44 +434,109 @@ async def scrape_department(
                     f"Web Scraper: Suspiciously small response ({content_length} bytes) for {department}"
                 )
                 logging.debug(f"Web Scraper: Response content: {content[:200]}...")
+            return content
     except aiohttp.ClientError as e:
-        logging.error(f"Web Scraper: Network error for {department}: {str(e)}")
-        return None
-    except asyncio.TimeoutError:
-        logging.error(f"Web Scraper: Request timed out for {department}")
-        return None
+        raise RegistrarStruggling(f"Network error ({str(e)})") from e
+    except asyncio.TimeoutError as e:
+        raise RegistrarStruggling("Request timed out") from e
+    except RegistrarStruggling:
+        raise
     except Exception as e:
         logging.error(f"Web Scraper: Unexpected error fetching {department}: {str(e)}")
         return None
 
-    soup = BeautifulSoup(content, "html.parser")
+
+async def replay_department(
+    replay: Replay,
+    department: str,
+    db_term: str,
+    year: int,
+    professor_ids_map: ProfessorIndex | dict[str, dict],
+    parse_pool: ProcessPoolExecutor | None = None,
+    html_parser: str = HTML_PARSER,
+) -> dict | None:
+    recorded = replay.web(department, db_term, year)
+    if recorded is None:
+        logging.warning(
+            f"Web Scraper: {department} {db_term} {year} is not in the recording"
+        )
+        return None
+    status, content = recorded
+    if status != 200:
+        logging.error(
+            f"Web Scraper: Recorded HTTP error for {department}: Status Code: {status}"
+        )
+        return None
+    return await parse_department(
+        content, department, db_term, year, professor_ids_map, parse_pool, html_parser
+    )
+
+
+async def parse_department(
+    content: str,
+    department: str,
+    db_term: str,
+    year: int,
+    professor_ids_map: ProfessorIndex | dict[str, dict],
+    parse_pool: ProcessPoolExecutor | None = None,
+    html_parser: str = HTML_PARSER,
+) -> dict | None:
+    """
+    Parses on the event loop without a pool. With one, the page goes to a worker
+    process that already holds the professor map, so fetching and parsing overlap.
+    """
+    key = department_key(department, db_term, year)
+    metrics = get_run_metrics()
+    if parse_pool is None:
+        with metrics.timer("html_parse", key):
+            return parse_department_html(
+                content, department, db_term, year, professor_ids_map, html_parser
+            )
+
+    submitted = time.perf_counter()
+    data, parse_time = await asyncio.get_running_loop().run_in_executor(
+        parse_pool, parse_in_worker, content, department, db_term, year, html_parser
+    )
+    metrics.observe("html_parse", parse_time, key)
+    metrics.observe(
+        "parse_pool_wait", time.perf_counter() - submitted - parse_time, key
+    )
+    return data
+
+
+def parse_department_html(
+    content: str,
+    department: str,
+    db_term: str,
+    year: int,
+    professor_ids_map: ProfessorIndex | dict[str, dict],
+    html_parser: str = HTML_PARSER,
+) -> dict | None:
+    professor_index = (
+        professor_ids_map
+        if isinstance(professor_ids_map, ProfessorIndex)
+        else ProfessorIndex(professor_ids_map)
+    )
+    page = extract_section_table(content, html_parser)
 
     # Check for WebService Error
-    error_h2 = soup.find("h2", string="WebService Error")
-    if error_h2 is not None:
-        error_message = error_h2.find_next("pre")
-        error_text = error_message.text if error_message else "Unknown WebService Error"
-        logging.warning(f"Web Scraper: WebService Error for {department}: {error_text}")
+    if page.webservice_error is not None:
+        logging.warning(
+            f"Web Scraper: WebService Error for {department}: {page.webservice_error}"
+        )
         return None
 
     # Check for table
-    table = soup.find("table", class_="section_results")
-    if table is None:
+    if not page.found_table:
         logging.warning(f"Web Scraper: No section_results table found for {department}")
         # Log some context from the page to help diagnose
-        page_title = soup.title.text if soup.title else "No title"
-        first_heading = soup.find("h1")
-        heading_text = first_heading.text if first_heading else "No heading"
         logging.debug(
-            f"Web Scraper: Page context - Title: '{page_title}', First heading: '{heading_text}'"
+            f"Web Scraper: Page context - Title: '{page.title}', First heading: '{page.heading}'"
         )
         return None
 
-    if not isinstance(table, Tag):
-        logging.warning(f"Web Scraper: Table is not a Tag for {department}")
-        return None
-
-    rows = table.find_all("tr")
+    # every cell is the list of its text nodes, joined like get_text() would
+    rows = page.rows
     if len(rows) <= 1:
         logging.warning(
             f"Web Scraper: Table has no data rows (only {len(rows)} rows) for {department}"
@@ -152,8 +562,8 @@ async def scrape_department(
                 break
 
             try:
-                top_cols = rows[i].find_all("td")
-                bottom_cols = rows[i + 1].find_all("td")
+                top_cols = rows[i]
+                bottom_cols = rows[i + 1]
 
                 if len(top_cols) < 6:
                     logging.warning(
@@ -167,7 +577,7 @@ async def scrape_department(
                     )
                     continue
 
-                section_code_text = top_cols[1].get_text(separator="\n")
+                section_code_text = "\n".join(top_cols[1])
                 if "\n" not in section_code_text:
                     logging.warning(
                         f"Web Scraper: Unexpected format in section_code cell for {department} at row {i}: '{section_code_text}'"
@@ -183,27 +593,20 @@ async def scrape_department(
                     continue
 
                 course_code, section = tuple(section_code.split("-"))
-                credits = top_cols[2].get_text()
-                division = top_cols[3].get_text()
+                credits = "".join(top_cols[2])
+                division = "".join(top_cols[3])
                 meetings = [
                     text.replace("\u00a0", "")
-                    for text in top_cols[4].get_text(separator="\n").split("\n")
+                    for text in "\n".join(top_cols[4]).split("\n")
                     if text != ""
                 ]
                 professor_names = [
-                    apply_regex(
-                        apply_regex(professor, r"[Dd][Ee][Ll]", lambda _: ""),
-                        r"\s+",
-                        lambda _: " ",
-                    )
-                    for professor in top_cols[5].get_text(separator="\n").split("\n")
+                    whitespace_pattern.sub(" ", del_pattern.sub("", professor))
+                    for professor in "\n".join(top_cols[5]).split("\n")
                 ]
                 professors = []
                 for name in professor_names:
-                    review = get_professor_review(
-                        get_professor_ids(*split_professor(name)),  # type: ignore
-                        professor_ids_map,
-                    )
+                    review = professor_index.review(name)
                     professors.append(
                         {
                             "name": name if name != "" else "Profesor Desconocido",
@@ -211,7 +614,7 @@ async def scrape_department(
                         }
                     )
 
-                requisites_text = bottom_cols[1].get_text()
+                requisites_text = "".join(bottom_cols[1])
                 if "Enrollment Requisites:" not in requisites_text:
                     logging.warning(
                         f"Web Scraper: Unexpected requisites format for {department} at row {i+1}: '{requisites_text}'"
@@ -293,47 +696,159 @@ async def scrape_department(
     return department_obj
 
 
+# professor map of a parse worker process, sent once when the worker starts
+worker_professor_ids: ProfessorIndex = ProfessorIndex({})
+
+
+def init_parse_worker(professor_ids_map: ProfessorIndex, log_files: list[str]):
+    global worker_professor_ids
+    worker_professor_ids = professor_ids_map
+    # spawned workers start without the run's logging setup
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[logging.FileHandler(path) for path in log_files]
+        + [logging.StreamHandler(sys.stdout)],
+    )
+
+
+def parse_in_worker(
+    content: str, department: str, db_term: str, year: int, html_parser: str
+) -> tuple[dict | None, float]:
+    started = time.perf_counter()
+    data = parse_department_html(
+        content, department, db_term, year, worker_professor_ids, html_parser
+    )
+    return data, time.perf_counter() - started
+
+
+async def start_parse_pool(
+    workers: int, professor_ids_map: ProfessorIndex
+) -> ProcessPoolExecutor | None:
+    if workers <= 0:
+        return None
+    log_files = [
+        handler.baseFilename
+        for handler in logging.getLogger().handlers
+        if isinstance(handler, logging.FileHandler)
+    ]
+    parse_pool = ProcessPoolExecutor(
+        max_workers=workers,
+        # forking would copy the event loop, SSH threads and database connections
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_parse_worker,
+        initargs=(professor_ids_map, log_files),
+    )
+
+    def warm_up():
+        # starting a worker blocks until it has read the professor map, so every
+        # worker is started here instead of on the loop by the first pages
+        for future in [parse_pool.submit(int) for _ in range(workers)]:
+            future.result()
+
+    await asyncio.to_thread(warm_up)
+    return parse_pool
+
+
 async def web_scraper_task(
     web_queue: asyncio.Queue,
     ssh_queue: asyncio.Queue,
-    db_term: str,
-    year: int,
-    professor_ids: dict,
+    session: aiohttp.ClientSession,
+    professor_ids: ProfessorIndex,
     rate_limit: AsyncLimiter,
+    stage: StagePool | None = None,
+    journal: RunJournal | None = None,
+    recorder: Recorder | None = None,
+    replay: Replay | None = None,
+    registrar_url: str = REGISTRAR_URL,
+    parse_pool: ProcessPoolExecutor | None = None,
+    html_parser: str = HTML_PARSER,
+    http_cache: HttpCache | None = None,
+    retry: RetryPolicy | None = None,
+    shard_planner: ShardPlanner | None = None,
+    hedge: HedgePolicy | None = None,
+    deadline: float | None = None,
 ):
-    async with aiohttp.ClientSession() as session:
-        while True:
-            department = await web_queue.get()
-            try:
+    while stage is None or stage.keep_running():
+        department, db_term, year = await web_queue.get()
+        started = time.monotonic()
+        key = department_key(department, db_term, year)
+        get_run_metrics().dequeued("web", key)
+        try:
+            reached, data = (
+                journal.progress(department, db_term, year) if journal else (None, None)
+            )
+            if reached in (WEB, SSH) and data is not None:
                 logging.info(
-                    f"Web Scraper: Starting to scrape {department} for {db_term} {year}"
+                    f"Web Scraper: Resuming {department} for {db_term} {year} from the journal"
                 )
-
-                data = await scrape_department(
-                    session, department, db_term, year, professor_ids, rate_limit
+            else:
+                logging.info(
+                    f"Web Scraper: Starting to scrape {department} for {db_term} {year}"
                 )
 
-                if data:
-                    course_count = len(data["courses"])
-                    section_count = sum(
-                        len(c["sections"]) for c in data["courses"].values()
-                    )
-                    await ssh_queue.put(data)
-                    logging.info(
-                        f"Web Scraper: Successfully scraped {department}: {course_count} courses with {section_count} sections total"
+                if replay is not None:
+                    data = await replay_department(
+                        replay,
+                        department,
+                        db_term,
+                        year,
+                        professor_ids,
+                        parse_pool,
+                        html_parser,
                     )
                 else:
-                    logging.warning(
-                        f"Web Scraper: No course data found for {department}"
+                    data = await scrape_department(
+                        session,
+                        department,
+                        db_term,
+                        year,
+                        professor_ids,
+                        rate_limit,
+                        recorder,
+                        registrar_url,
+                        parse_pool,
+                        html_parser,
+                        http_cache,
+                        retry,
+                        shard_planner,
+                        hedge,
+                        deadline,
+                        raise_unavailable=True,
                     )
-            except Exception as e:
-                logging.error(
-                    f"Web Scraper: Unhandled exception while scraping {department}: {str(e)}"
-                )
-                import traceback
+                if journal is not None:
+                    journal.reached(department, db_term, year, WEB if data else EMPTY, data)
 
-                logging.error(
-                    f"Web Scraper: Traceback for {department}: {traceback.format_exc()}"
+            if data:
+                course_count = len(data["courses"])
+                section_count = sum(
+                    len(c["sections"]) for c in data["courses"].values()
                 )
-            finally:
-                web_queue.task_done()
+                get_run_metrics().enqueued("ssh", key)
+                await ssh_queue.put(data)
+                logging.info(
+                    f"Web Scraper: Successfully scraped {department}: {course_count} courses with {section_count} sections total"
+                )
+            else:
+                logging.warning(f"Web Scraper: No course data found for {department}")
+        except DepartmentUnavailable as e:
+            # left for --resume to try again, unlike a department with no sections
+            logging.warning(
+                f"Web Scraper: Could not scrape {department} ({str(e)}), "
+                "a resumed run will try it again"
+            )
+            if journal is not None:
+                journal.reached(department, db_term, year, FAILED, None)
+        except Exception as e:
+            logging.error(
+                f"Web Scraper: Unhandled exception while scraping {department}: {str(e)}"
+            )
+            import traceback
+
+            logging.error(
+                f"Web Scraper: Traceback for {department}: {traceback.format_exc()}"
+            )
+        finally:
+            web_queue.task_done()
+            if stage is not None:
+                stage.record(time.monotonic() - started)
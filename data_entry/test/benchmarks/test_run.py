@@ -0,0 +1,38 @@
+from benchmarks.run import find_regressions
+from benchmarks.stages import department_names
+
+
+def result(throughput: float, p95: float) -> dict:
+    return {"throughput": throughput, "p95": p95}
+
+
+def test_compares_against_first_run_until_another_is_accepted():
+    history = [
+        {"results": {"ansi_parse": {"100": result(1000, 0.001)}}},
+        {"results": {"ansi_parse": {"100": result(800, 0.0012)}}},
+        {"results": {"ansi_parse": {"100": {"skipped": "no emulator"}}}},
+    ]
+    # each run was within the threshold of the last, together they drifted past it
+    drifted = {"ansi_parse": {"100": result(700, 0.0013)}}
+    assert len(find_regressions(drifted, history, 0.25)) == 2
+    history.append(
+        {"baseline": True, "results": {"ansi_parse": {"100": result(500, 0.002)}}}
+    )
+    accepted = {"ansi_parse": {"100": result(450, 0.002)}}
+    assert find_regressions(accepted, history, 0.25) == []
+    regressions = find_regressions(
+        {"ansi_parse": {"100": result(300, 0.003)}}, history, 0.25
+    )
+    assert len(regressions) == 2
+
+
+def test_new_stages_and_skipped_stages_never_regress():
+    history = [{"results": {"web_parse": {"1": result(10, 0.1)}}}]
+    assert find_regressions({"web_parse": {"100": result(1, 1.0)}}, history, 0.1) == []
+    assert find_regressions({"web_parse": {"1": {"skipped": "x"}}}, history, 0.1) == []
+
+
+def test_department_names_pad_real_departments_with_synthetic_ones():
+    names = department_names(1000)
+    assert len(names) == len(set(names)) == 1000
+    assert names[0] == department_names(1)[0]
@@ -0,0 +1,63 @@
+from pathlib import Path
+
+import pytest
+
+from src.parsers.section_table_parser import (
+    available_backends,
+    extract_section_table,
+)
+from src.scrapers.standins.registrar import render_sections_page, synthetic_department
+from src.scrapers.web_scraper import parse_department_html
+
+# pages in the registrar's own markup, page chrome and all
+REGISTRAR_PAGES = sorted((Path(__file__).parent / "fixtures").glob("*.html"))
+
+EDGE_PAGES = [
+    # CRLF line endings, NUL bytes and entities inside cells
+    "<table class='section_results'>\r\n<tr><td>a\r\nb</td><td>x\x00y&nbsp;</td>"
+    "</tr></table>",
+    # cells and rows left open, libxml2 would close them where html.parser nests
+    "<table class='section_results'><tr><td>a<td>b</tr><tr><td>c</table>",
+    "<html><h2>WebService Error</h2><pre>Too many requests</pre></html>",
+    "<html><title>Down</title><h1>Maintenance</h1></html>",
+    "<table class='other section_results'><![CDATA[x]]><tr><td>a</td></tr></table>",
+]
+
+
+@pytest.mark.parametrize("backend", available_backends())
+@pytest.mark.parametrize("page", EDGE_PAGES)
+def test_backends_read_edge_pages_the_same(backend, page):
+    assert extract_section_table(page, backend) == extract_section_table(page)
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_backends_build_the_same_departments(backend):
+    for department in ("CIIC", "INEL", "MATE", "QUIM", "ZZZZ"):
+        content = render_sections_page(synthetic_department(department))
+        assert parse_department_html(
+            content, department, "Fall", 2024, {}, backend
+        ) == parse_department_html(content, department, "Fall", 2024, {}, "html.parser")
+
+
+@pytest.mark.parametrize("backend", available_backends())
+@pytest.mark.parametrize("path", REGISTRAR_PAGES, ids=lambda path: path.stem)
+def test_backends_read_registrar_pages_the_same(backend, path):
+    content = path.read_text(encoding="utf-8")
+    assert extract_section_table(content, backend) == extract_section_table(content)
+    assert parse_department_html(
+        content, "CIIC", "Fall", 2024, {}, backend
+    ) == parse_department_html(content, "CIIC", "Fall", 2024, {}, "html.parser")
+
+
+def test_registrar_page_fixture_parses():
+    content = (Path(__file__).parent / "fixtures" / "registrar_ciic.html").read_text(
+        encoding="utf-8"
+    )
+    data = parse_department_html(content, "CIIC", "Fall", 2024, {})
+    assert list(data["courses"]) == ["CIIC3015", "CIIC4020", "CIIC8995"]
+    structures = data["courses"]["CIIC4020"]
+    assert structures["corequisites"] == "CIIC 4010"
+    assert [p["name"] for p in structures["sections"][0]["professors"]] == [
+        "MANUEL RODRÍGUEZ MARTÍNEZ",
+        "JUAN O. PÉREZ VALLE",
+    ]
@@ -0,0 +1,72 @@
+import asyncio
+
+from src.scrapers.autoscaler import StagePool
+
+
+async def worker(queue: asyncio.Queue, done: list, stage: StagePool):
+    while stage.keep_running():
+        item = await queue.get()
+        await asyncio.sleep(0.01)
+        done.append(item)
+        queue.task_done()
+        stage.record(0.01)
+
+
+def make_stage(queue, output_queue, done, initial_workers=2, max_workers=4):
+    return StagePool(
+        name="test",
+        input_queue=queue,
+        output_queue=output_queue,
+        spawn=lambda _, stage: worker(queue, done, stage),
+        min_workers=1,
+        max_workers=max_workers,
+        initial_workers=initial_workers,
+    )
+
+
+def test_stage_grows_on_backlog_and_processes_everything():
+    async def run():
+        queue: asyncio.Queue = asyncio.Queue()
+        done: list = []
+        for i in range(20):
+            queue.put_nowait(i)
+        stage = make_stage(queue, None, done)
+        stage.start()
+        stage.adjust(1.0)
+        assert stage.target == 3
+        await queue.join()
+        stage.cancel()
+        return done
+
+    assert sorted(asyncio.run(run())) == list(range(20))
+
+
+def test_stage_shrinks_when_downstream_is_full():
+    async def run():
+        queue: asyncio.Queue = asyncio.Queue()
+        output_queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        output_queue.put_nowait("blocked")
+        stage = make_stage(queue, output_queue, [], initial_workers=3)
+        stage.start()
+        stage.adjust(1.0)
+        assert stage.target == 2
+        # an idle worker notices the smaller target once it takes its next item
+        for i in range(3):
+            queue.put_nowait(i)
+        await queue.join()
+        await asyncio.sleep(0)
+        assert stage.active == 2
+        stage.cancel()
+
+    asyncio.run(run())
+
+
+def test_stage_respects_limits():
+    async def run():
+        queue: asyncio.Queue = asyncio.Queue()
+        stage = make_stage(queue, None, [], initial_workers=10, max_workers=4)
+        assert stage.target == 4
+        stage.resize(0, "test")
+        assert stage.target == 1
+
+    asyncio.run(run())
@@ -0,0 +1,54 @@
+from src.scrapers.change_log import ADDED, CHANGED, REMOVED, ChangeLog
+
+
+def section(code: str, capacity: int = 30, usage: int = 0, professor: str = "A B"):
+    return {
+        "sectionCode": code,
+        "capacity": capacity,
+        "usage": usage,
+        "meetings": ["10:30 am - 11:20 am LWV S 113"],
+        "professors": [{"name": professor, "url": ""}],
+    }
+
+
+def department(*sections: dict) -> dict:
+    return {
+        "department": "CIIC",
+        "term": "Fall",
+        "year": 2024,
+        "courses": {"CIIC3011": {"courseCode": "CIIC3011", "sections": list(sections)}},
+    }
+
+
+def test_only_what_moved_between_snapshots_is_logged(tmp_path):
+    change_log = ChangeLog(tmp_path / "change_log.sqlite")
+    assert change_log.record(department(section("010"), section("020"))) == 2
+    assert change_log.record(department(section("010"), section("020"))) == 0
+    assert (
+        change_log.record(
+            department(section("010", usage=5, professor="C D"), section("030"))
+        )
+        == 3
+    )
+
+    changes = change_log.read(cursor=2)
+    assert [(change["section"], change["kind"]) for change in changes] == [
+        ("010", CHANGED),
+        ("030", ADDED),
+        ("020", REMOVED),
+    ]
+    assert changes[0]["fields"] == {
+        "usage": [0, 5],
+        "professors": [["A B"], ["C D"]],
+    }
+
+
+def test_readers_resume_from_their_cursor(tmp_path):
+    change_log = ChangeLog(tmp_path / "change_log.sqlite")
+    change_log.record(department(*(section(f"0{i}0") for i in range(1, 6))))
+    first = change_log.read(cursor=0, limit=3)
+    rest = change_log.read(cursor=first[-1]["seq"])
+    assert [change["seq"] for change in first + rest] == [1, 2, 3, 4, 5]
+    assert change_log.latest_cursor() == 5
+    assert change_log.read(cursor=5) == []
+    assert change_log.read(department="INEL") == []
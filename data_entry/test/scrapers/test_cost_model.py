@@ -0,0 +1,56 @@
+import asyncio
+
+from src.scrapers.cost_model import DepartmentCosts, LongestFirstQueue
+from src.scrapers.metrics import RunMetrics
+
+
+def test_costs_learn_from_run_metrics(tmp_path):
+    metrics = RunMetrics()
+    metrics.observe("http_fetch", 1.0, "INEL:Fall:2024")
+    metrics.observe("html_parse", 0.5, "INEL:Fall:2024")
+    metrics.observe("ssh_scrape", 40.0, "INEL:Fall:2024")
+    metrics.observe("ssh_scrape", 20.0, "INEL:Spring:2024")
+    metrics.observe("http_fetch", 0.2, "ALEM:Fall:2024")
+
+    costs = DepartmentCosts()
+    costs.update(metrics)
+    assert costs.estimate("INEL", "web") == 1.5
+    assert costs.estimate("INEL", "ssh") == 30.0
+    # unknown stages and departments fall back to the average of the known ones
+    assert costs.estimate("ALEM", "ssh") == 30.0
+    assert costs.estimate("QUIM") == costs.estimate("QUIM", "web") + 30.0
+
+    costs.save_file(tmp_path / "costs.json")
+    reloaded = DepartmentCosts.from_file(tmp_path / "costs.json")
+    metrics = RunMetrics()
+    metrics.observe("ssh_scrape", 10.0, "INEL:Fall:2024")
+    reloaded.update(metrics)
+    assert reloaded.estimate("INEL", "ssh") == 20.0
+
+
+def test_longest_first_queue_hands_out_biggest_first():
+    async def run():
+        queue = LongestFirstQueue(cost=lambda item: item[1])
+        for item in [("a", 1), ("b", 5), ("c", 3), ("d", 5)]:
+            await queue.put(item)
+        return [(await queue.get())[0] for _ in range(4)]
+
+    assert asyncio.run(run()) == ["b", "d", "c", "a"]
+
+
+def test_requeue_never_waits_for_room():
+    async def run():
+        queue = LongestFirstQueue(cost=lambda item: item[1], maxsize=1)
+        await queue.put(("a", 1))
+        taken = await queue.get()
+        await queue.put(("b", 2))
+        # full again, but the taken item goes back without blocking
+        queue.requeue(taken)
+        items = [(await queue.get())[0] for _ in range(2)]
+        queue.task_done()
+        queue.task_done()
+        queue.task_done()
+        await asyncio.wait_for(queue.join(), 1)
+        return items
+
+    assert asyncio.run(run()) == ["b", "a"]
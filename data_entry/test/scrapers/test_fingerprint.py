@@ -0,0 +1,50 @@
+from src.scrapers.fingerprint import (
+    FingerprintStore,
+    compute_fingerprint,
+    fingerprint_key,
+)
+
+
+def make_department(capacity: int = 30) -> dict:
+    return {
+        "department": "CIIC",
+        "term": "Fall",
+        "year": 2024,
+        "courses": {
+            "CIIC3011": {
+                "courseCode": "CIIC3011",
+                "sections": [{"sectionCode": "010", "capacity": capacity}],
+            }
+        },
+    }
+
+
+def test_fingerprint_ignores_key_order():
+    department = make_department()
+    reordered = dict(reversed(list(department.items())))
+    assert compute_fingerprint(department) == compute_fingerprint(reordered)
+
+
+def test_fingerprint_changes_with_content():
+    assert compute_fingerprint(make_department(30)) != compute_fingerprint(
+        make_department(31)
+    )
+
+
+def test_store_skips_unchanged_department():
+    department = make_department()
+    store = FingerprintStore()
+    assert not store.is_unchanged(department)
+    store.mark_stored(department)
+    assert store.is_unchanged(make_department())
+    assert not store.is_unchanged(make_department(31))
+    assert store.skipped == [fingerprint_key("CIIC", "Fall", 2024)]
+
+
+def test_full_store_never_skips():
+    department = make_department()
+    store = FingerprintStore(
+        {fingerprint_key("CIIC", "Fall", 2024): compute_fingerprint(department)},
+        full=True,
+    )
+    assert not store.is_unchanged(department)
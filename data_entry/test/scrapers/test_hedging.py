@@ -0,0 +1,87 @@
+import asyncio
+
+import aiohttp
+from aiolimiter import AsyncLimiter
+
+from src.scrapers.metrics import RunMetrics, get_run_metrics
+from src.scrapers.rate_limit import HedgePolicy
+from src.scrapers.standins.registrar import StandInRegistrar
+from src.scrapers.web_scraper import fetch_hedged, scrape_department
+
+
+def test_hedge_waits_for_enough_fetch_times():
+    metrics = RunMetrics()
+    policy = HedgePolicy(min_samples=20, min_delay=0.1)
+    assert policy.delay(metrics) is None
+    for i in range(20):
+        metrics.observe("http_fetch", 0.2 if i < 19 else 5.0)
+    assert policy.delay(metrics) == 0.2
+
+
+def test_slow_request_is_answered_by_its_duplicate():
+    metrics = get_run_metrics()
+    hedged = metrics.counters.get("http_hedged", 0)
+    won = metrics.counters.get("http_hedge_won", 0)
+    delays = iter([0.5, 0.0])
+    finished = []
+
+    async def fetch():
+        delay = next(delays)
+        await asyncio.sleep(delay)
+        finished.append(delay)
+        return f"answered after {delay}"
+
+    async def run():
+        answer = await fetch_hedged(fetch, 0.05, "INEL:Fall:2024")
+        await asyncio.sleep(0.6)
+        return answer
+
+    assert asyncio.run(run()) == "answered after 0.0"
+    assert metrics.counters["http_hedged"] == hedged + 1
+    assert metrics.counters["http_hedge_won"] == won + 1
+    # the slow one was cancelled instead of left to finish
+    assert finished == [0.0]
+
+
+def test_rate_limiter_wait_does_not_count_toward_the_hedge():
+    metrics = get_run_metrics()
+    hedged = metrics.counters.get("http_hedged", 0)
+
+    async def run():
+        sent = asyncio.Event()
+
+        async def fetch():
+            # queued behind the limiter well past the hedge delay
+            await asyncio.sleep(0.3)
+            sent.set()
+            await asyncio.sleep(0.01)
+            return "answered"
+
+        return await fetch_hedged(fetch, 0.1, "INEL:Fall:2024", sent)
+
+    assert asyncio.run(run()) == "answered"
+    assert metrics.counters.get("http_hedged", 0) == hedged
+
+
+def test_department_deadline_gives_up():
+    registrar = StandInRegistrar(slow_rate=1.0, slow_latency=1.0)
+
+    async def run():
+        url = await registrar.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                return await scrape_department(
+                    session,
+                    "INEL",
+                    "Fall",
+                    2024,
+                    {},
+                    AsyncLimiter(100, 1),
+                    registrar_url=url,
+                    deadline=0.2,
+                )
+        finally:
+            await registrar.stop()
+
+    assert asyncio.run(run()) is None
+    assert get_run_metrics().counters["web_deadline_exceeded"] >= 1
@@ -0,0 +1,66 @@
+import asyncio
+
+import aiohttp
+from aiolimiter import AsyncLimiter
+
+from src.scrapers.http_cache import HttpCache
+from src.scrapers.metrics import get_run_metrics
+from src.scrapers.standins.registrar import StandInRegistrar
+from src.scrapers.web_scraper import scrape_department
+
+
+def scrape_twice(registrar: StandInRegistrar, cache: HttpCache):
+    async def run():
+        url = await registrar.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                return [
+                    await scrape_department(
+                        session,
+                        "INEL",
+                        "Fall",
+                        2024,
+                        {},
+                        AsyncLimiter(100, 1),
+                        registrar_url=url,
+                        http_cache=cache,
+                    )
+                    for _ in range(2)
+                ]
+        finally:
+            await registrar.stop()
+
+    return asyncio.run(run())
+
+
+def test_unchanged_pages_are_revalidated(tmp_path):
+    registrar = StandInRegistrar(seed=1)
+    hits = get_run_metrics().counters.get("http_cache_hit", 0)
+    first, second = scrape_twice(registrar, HttpCache(tmp_path / "cache.sqlite"))
+    assert first is not None and first == second
+    assert registrar.not_modified == 1
+    assert get_run_metrics().counters["http_cache_hit"] == hits + 1
+
+
+def test_not_modified_without_a_cached_page_is_fetched_again(tmp_path):
+    registrar = StandInRegistrar(seed=1)
+    cache = HttpCache(tmp_path / "cache.sqlite")
+    # the validators are sent, but the body they stand for is gone by the 304
+    cache.body = lambda url: None
+    first, second = scrape_twice(registrar, cache)
+    assert first is not None and first == second
+    assert registrar.not_modified == 1
+    assert registrar.requests == 3
+
+
+def test_empty_departments_are_not_asked_for_again(tmp_path):
+    registrar = StandInRegistrar(webservice_error_rate=1.0)
+    cache = HttpCache(tmp_path / "cache.sqlite")
+    assert scrape_twice(registrar, cache) == [None, None]
+    assert registrar.requests == 1
+
+    # without a ttl every run asks again
+    cache.negative_ttl = 0
+    registrar = StandInRegistrar(webservice_error_rate=1.0)
+    scrape_twice(registrar, cache)
+    assert registrar.requests == 2
@@ -0,0 +1,54 @@
+import asyncio
+
+from aiolimiter import AsyncLimiter
+
+from src.scrapers.http_session import create_session
+from src.scrapers.metrics import get_run_metrics
+from src.scrapers.standins.registrar import StandInRegistrar
+from src.scrapers.web_scraper import scrape_department
+
+
+def test_departments_share_one_kept_alive_connection():
+    registrar = StandInRegistrar()
+    counters = get_run_metrics().counters
+    created = counters.get("http_connections_created", 0)
+    reused = counters.get("http_connections_reused", 0)
+
+    async def run():
+        url = await registrar.start()
+        session = create_session()
+        try:
+            for department in ("INEL", "CIIC", "MATE"):
+                await scrape_department(
+                    session,
+                    department,
+                    "Fall",
+                    2024,
+                    {},
+                    AsyncLimiter(100, 1),
+                    registrar_url=url,
+                )
+        finally:
+            await session.close()
+            await registrar.stop()
+
+    asyncio.run(run())
+    assert counters["http_connections_created"] == created + 1
+    assert counters["http_connections_reused"] == reused + 2
+
+
+def test_hung_requests_time_out():
+    registrar = StandInRegistrar(slow_rate=1.0, slow_latency=1.0)
+
+    async def run():
+        url = await registrar.start()
+        session = create_session(read_timeout=0.2)
+        try:
+            return await scrape_department(
+                session, "INEL", "Fall", 2024, {}, AsyncLimiter(100, 1), registrar_url=url
+            )
+        finally:
+            await session.close()
+            await registrar.stop()
+
+    assert asyncio.run(run()) is None
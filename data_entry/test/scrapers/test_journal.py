@@ -0,0 +1,55 @@
+from src.scrapers.journal import EMPTY, FAILED, QUEUED, SSH, WEB, RunJournal
+
+
+def make_department(capacity: int = 0) -> dict:
+    return {
+        "department": "CIIC",
+        "term": "Fall",
+        "year": 2024,
+        "courses": {"CIIC3011": {"sections": [{"capacity": capacity}]}},
+    }
+
+
+def test_journal_survives_reopen_at_last_stage(tmp_path):
+    journal = RunJournal(tmp_path / "journal.sqlite")
+    journal.save_config({"terms": [["Fall", 2024]], "sinks": ["sqlite"]})
+    journal.queued("CIIC", "Fall", 2024)
+    assert journal.progress("CIIC", "Fall", 2024) == (QUEUED, None)
+    journal.reached("CIIC", "Fall", 2024, WEB, make_department())
+    journal.close()
+
+    reopened = RunJournal(tmp_path / "journal.sqlite")
+    assert reopened.load_config()["sinks"] == ["sqlite"]
+    assert reopened.progress("CIIC", "Fall", 2024) == (WEB, make_department())
+    assert not reopened.is_finished("CIIC", "Fall", 2024, ["sqlite"])
+
+
+def test_department_is_finished_once_every_sink_acked_final_payload(tmp_path):
+    journal = RunJournal(tmp_path / "journal.sqlite")
+    final = make_department(30)
+    journal.reached("CIIC", "Fall", 2024, SSH, final)
+    journal.acked(final, "sqlite")
+    assert not journal.is_finished("CIIC", "Fall", 2024, ["sqlite", "jsonl"])
+    journal.acked(final, "jsonl")
+    assert journal.is_finished("CIIC", "Fall", 2024, ["sqlite", "jsonl"])
+    assert journal.is_acked(final, "sqlite")
+    # an ack for a different payload does not count
+    assert not journal.is_acked(make_department(31), "sqlite")
+
+
+def test_empty_departments_are_finished(tmp_path):
+    journal = RunJournal(tmp_path / "journal.sqlite")
+    journal.reached("CIIC", "Fall", 2024, EMPTY, None)
+    assert journal.is_finished("CIIC", "Fall", 2024, ["sqlite"])
+
+
+def test_failed_departments_are_queued_again_on_resume(tmp_path):
+    journal = RunJournal(tmp_path / "journal.sqlite")
+    journal.queued("CIIC", "Fall", 2024)
+    journal.reached("CIIC", "Fall", 2024, FAILED, None)
+    journal.close()
+
+    reopened = RunJournal(tmp_path / "journal.sqlite")
+    assert not reopened.is_finished("CIIC", "Fall", 2024, ["sqlite"])
+    reopened.queued("CIIC", "Fall", 2024)
+    assert reopened.progress("CIIC", "Fall", 2024) == (FAILED, None)
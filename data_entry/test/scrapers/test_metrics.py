@@ -0,0 +1,34 @@
+import json
+
+from src.scrapers.metrics import Histogram, RunMetrics, percentile
+
+
+def test_percentile_nearest_rank():
+    samples = [float(i) for i in range(1, 101)]
+    assert percentile(samples, 0.50) == 50.0
+    assert percentile(samples, 0.95) == 95.0
+    assert percentile(samples, 0.99) == 99.0
+    assert percentile([], 0.5) == 0.0
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value)
+    assert histogram.cumulative_counts() == [1, 3, 4]
+    assert histogram.summary()["max"] == 5.0
+
+
+def test_run_metrics_writes_json_and_prometheus(tmp_path):
+    metrics = RunMetrics()
+    metrics.observe("http_fetch", 0.2, "CIIC:Fall:2024")
+    metrics.observe("http_fetch", 1.5, "INSO:Fall:2024")
+    metrics.increment("ssh_pages", 3, "CIIC:Fall:2024")
+    metrics.write(str(tmp_path))
+
+    written = json.loads((tmp_path / "metrics.json").read_text())
+    assert written["stages"]["http_fetch"]["count"] == 2
+    assert written["departments"]["CIIC:Fall:2024"]["ssh_pages"] == 3
+    prometheus = (tmp_path / "metrics.prom").read_text()
+    assert 'scraper_stage_seconds_count{stage="http_fetch"} 2' in prometheus
+    assert "INSO:Fall:2024 (1.50s)" in metrics.summary_table()
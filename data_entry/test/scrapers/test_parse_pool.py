@@ -0,0 +1,41 @@
+import asyncio
+
+from src.scrapers.standins.registrar import (
+    NAMES,
+    render_sections_page,
+    synthetic_department,
+)
+from src.scrapers.web_scraper import (
+    parse_department,
+    parse_department_html,
+    start_parse_pool,
+)
+
+PROFESSOR_IDS = {
+    f"{name.lower()}-{lastname}": {"url": f"https://example.com/{name}-{lastname}"}
+    for name in NAMES
+    for lastname in ("rivera", "torres", "cruz", "ortiz", "perez", "santiago")
+}
+
+
+def test_worker_processes_parse_like_the_event_loop():
+    content = render_sections_page(synthetic_department("INEL"))
+
+    async def run():
+        parse_pool = await start_parse_pool(1, PROFESSOR_IDS)
+        try:
+            return await parse_department(
+                content, "INEL", "Fall", 2024, {}, parse_pool
+            )
+        finally:
+            parse_pool.shutdown()
+
+    parsed = asyncio.run(run())
+    assert parsed == parse_department_html(content, "INEL", "Fall", 2024, PROFESSOR_IDS)
+    # the worker got its professor map when it started, not with the page
+    assert any(
+        professor["url"]
+        for course in parsed["courses"].values()
+        for section in course["sections"]
+        for professor in section["professors"]
+    )
@@ -0,0 +1,40 @@
+from src.scrapers.professor_index import ProfessorIndex, fold
+
+REVIEWS = {
+    key: {"url": f"https://notaso.com/professors/{key}/"}
+    for key in (
+        "jose-rodriguez-nunez",
+        "aimee-m-montero",
+        "ana-velez",
+        "luis-cruz-ortiz",
+        "luis-cruz-perez",
+        "alfredo-ortiz-mercado",
+    )
+}
+
+
+def review(key: str) -> dict:
+    return REVIEWS[key]
+
+
+def test_fold_matches_professor_id_keys():
+    assert fold("José  Rodríguez Núñez") == "jose-rodriguez-nunez"
+
+
+def test_registrar_names_resolve_through_accents_initials_and_alternates():
+    index = ProfessorIndex(REVIEWS)
+    assert index.review("JOSÉ RODRÍGUEZ NÚÑEZ") == review("jose-rodriguez-nunez")
+    assert index.review("AIMEE MONTERO") == review("aimee-m-montero")
+    assert index.review("ANA M. VELEZ") == review("ana-velez")
+    assert index.review("ALFREDO ORTIZ") == review("alfredo-ortiz-mercado")
+    # two professors share the short form, only the full name tells them apart
+    assert index.review("LUIS CRUZ") is None
+    assert index.review("LUIS CRUZ PEREZ") == review("luis-cruz-perez")
+
+
+def test_near_misses_fall_back_to_trigrams():
+    index = ProfessorIndex(REVIEWS)
+    assert index.review("ALFREDO ORTIZ MERCADOS") == review("alfredo-ortiz-mercado")
+    assert index.review("MARIA TORRES") is None
+    assert index.review("") is None
+    assert set(index.memo) == {"ALFREDO ORTIZ MERCADOS", "MARIA TORRES", ""}
@@ -0,0 +1,63 @@
+import asyncio
+
+import aiohttp
+
+from src.scrapers.rate_limit import AdaptiveLimiter, RetryPolicy
+from src.scrapers.standins.registrar import StandInRegistrar
+from src.scrapers.web_scraper import scrape_department
+
+
+def test_rate_grows_while_healthy_and_halves_on_failure():
+    limiter = AdaptiveLimiter(4, min_rate=1, max_rate=8)
+    for _ in range(40):
+        limiter.succeeded(0.1)
+    assert 6 < limiter.rate <= 8
+    raised = limiter.rate
+    limiter.failed()
+    assert limiter.rate == raised / 2
+    # requests that were in flight together only count once
+    limiter.failed()
+    assert limiter.rate == raised / 2
+    limiter.decreased_at = 0
+    limiter.succeeded(10.0)
+    assert limiter.rate == raised / 4
+
+
+def test_retry_policy_is_bounded():
+    retry = RetryPolicy(attempts=3, budget=3)
+    assert [retry.should_retry(attempt) for attempt in (1, 2, 3)] == [
+        True,
+        True,
+        False,
+    ]
+    assert retry.should_retry(1) and not retry.should_retry(1)
+    assert all(0 <= retry.delay(attempt) <= 4 for attempt in (1, 2, 3))
+
+
+def test_failed_departments_are_retried():
+    registrar = StandInRegistrar(seed=3, error_rate=0.5)
+    limiter = AdaptiveLimiter(100)
+    retry = RetryPolicy(attempts=10, base_delay=0.01)
+
+    async def run():
+        url = await registrar.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                return [
+                    await scrape_department(
+                        session,
+                        department,
+                        "Fall",
+                        2024,
+                        {},
+                        limiter,
+                        registrar_url=url,
+                        retry=retry,
+                    )
+                    for department in ("INEL", "CIIC", "MATE", "QUIM")
+                ]
+        finally:
+            await registrar.stop()
+
+    assert all(data is not None for data in asyncio.run(run()))
+    assert retry.spent > 0 and limiter.lowest < 100
@@ -0,0 +1,60 @@
+import asyncio
+import json
+
+from src.scrapers.pipeline import run_pipeline
+from src.scrapers.recording import Recorder, Replay
+from src.scrapers.sinks.jsonl_sink import JSONLSink
+
+SECTIONS_PAGE = """
+<html><body><table class="section_results">
+<tr><th>Header</th></tr>
+<tr><td></td><td>INTRO TO PROGRAMMING<br>CIIC3011-010</td><td>3</td><td>Pre</td>
+<td>10:30 am - 11:20 am LWV S 113</td><td>JUAN DEL PUEBLO</td></tr>
+<tr><td></td><td>Enrollment Requisites: MATE3171, Co-Requisites: MATE3172</td></tr>
+</table></body></html>
+"""
+
+
+def record_archive(path):
+    async def run():
+        recorder = Recorder(path)
+        await recorder.web(
+            "CIIC", "Fall", 2024, "https://example", 200, SECTIONS_PAGE, 0.4
+        )
+        await recorder.web("INSO", "Fall", 2024, "https://example", 500, "", 0.1)
+        await recorder.ssh("CIIC", "Fall", 2024, [(5.0, "no availability here")])
+        recorder.close()
+
+    asyncio.run(run())
+
+
+def test_replay_loads_recorded_pages(tmp_path):
+    record_archive(tmp_path / "recording.jsonl")
+    replay = Replay(tmp_path / "recording.jsonl")
+    assert replay.terms == [("Fall", 2024)]
+    assert replay.web("CIIC", "Fall", 2024) == (200, SECTIONS_PAGE)
+    assert replay.web("MATE", "Fall", 2024) is None
+    assert replay.pager("CIIC", "Fall", 2024) is not None
+
+
+def test_replay_feeds_recording_through_pipeline(tmp_path, monkeypatch):
+    record_archive(tmp_path / "recording.jsonl")
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "input_files").mkdir()
+    (tmp_path / "input_files" / "professor_ids.txt").write_text("{}")
+    (tmp_path / "input_files" / "departments.txt").write_text("CIIC\nINSO\n")
+
+    asyncio.run(
+        run_pipeline(
+            terms=[("Fall", 2024)],
+            sinks=[JSONLSink(str(tmp_path / "out.jsonl"))],
+            ssh_tasks=0,
+            replay=Replay(tmp_path / "recording.jsonl"),
+        )
+    )
+
+    stored = [json.loads(line) for line in (tmp_path / "out.jsonl").open()]
+    assert [data["department"] for data in stored] == ["CIIC"]
+    course = stored[0]["courses"]["CIIC3011"]
+    assert course["corequisites"] == "MATE3172"
+    assert course["sections"][0]["sectionCode"] == "010"
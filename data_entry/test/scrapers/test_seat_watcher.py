@@ -0,0 +1,142 @@
+import asyncio
+import json
+
+import aiohttp
+import pytest
+from aiolimiter import AsyncLimiter
+
+import src.scrapers.ssh_scraper as ssh_scraper
+from src.scrapers.fingerprint import FingerprintStore
+from src.scrapers.log_utils import ScraperTarget
+from src.scrapers.metrics import department_key
+from src.scrapers.seat_watcher import SeatWatcher, WatchItem, Watchlist
+from src.scrapers.sinks.base import Sink
+from src.scrapers.ssh_scraper import SSHChannelPool
+from src.scrapers.standins.registrar import StandInRegistrar
+from src.scrapers.standins.rumad import StandInRumad
+
+
+class RecordingSink(Sink):
+    target = ScraperTarget.JSONL
+
+    def __init__(self) -> None:
+        self.writes: list[str] = []
+        self.seat_updates: list[dict] = []
+
+    async def write(self, department_data: dict) -> bool:
+        self.writes.append(department_data["department"])
+        return True
+
+    async def update_seats(self, department_data: dict, changed) -> bool:
+        self.seat_updates.append(changed)
+        return True
+
+
+def department(seats: list[tuple[int, int]]) -> dict:
+    return {
+        "courses": {
+            "INEL4206": {
+                "courseCode": "INEL4206",
+                "sections": [
+                    {"sectionCode": f"0{i}0", "capacity": capacity, "usage": usage}
+                    for i, (capacity, usage) in enumerate(seats, 1)
+                ],
+            }
+        }
+    }
+
+
+def test_watchlist_items_default_to_the_top_level(tmp_path):
+    path = tmp_path / "watchlist.json"
+    path.write_text(
+        json.dumps(
+            {
+                "term": "Fall",
+                "year": 2024,
+                "interval": 300,
+                "watch": [
+                    {"department": "ciic"},
+                    {"course": "INEL4206", "sections": ["010"], "interval": 60},
+                ],
+            }
+        )
+    )
+    watchlist = Watchlist.from_file(path)
+    assert watchlist.items == [
+        WatchItem("CIIC", "Fall", 2024, 300.0),
+        WatchItem("INEL", "Fall", 2024, 60.0, "INEL4206", ["010"]),
+    ]
+
+
+def test_watchlist_items_without_a_year_are_named(tmp_path):
+    path = tmp_path / "watchlist.json"
+    path.write_text(json.dumps({"term": "Fall", "watch": [{"department": "CIIC"}]}))
+    with pytest.raises(ValueError, match="CIIC"):
+        Watchlist.from_file(path)
+
+
+def test_followed_sections_near_capacity_are_polled_sooner():
+    watchlist = Watchlist(
+        [WatchItem("INEL", "Fall", 2024, 600, "INEL4206", ["010"])],
+        hot_threshold=0.9,
+        hot_interval=60,
+    )
+    watcher = SeatWatcher(watchlist, [], [], [], None, {}, None)
+    key = department_key("INEL", "Fall", 2024)
+    # only the unfollowed section is full
+    watcher.departments[key] = department([(30, 10), (30, 30)])
+    assert watcher.interval(key) == 600
+    watcher.departments[key] = department([(30, 28), (30, 30)])
+    assert watcher.interval(key) == 60
+
+
+def test_only_changed_seats_reach_the_sinks(monkeypatch):
+    async def send_input(chan, inputs, department=None):
+        for text, _ in inputs:
+            chan.send(text.encode(ssh_scraper.SSH_ENCODING))
+        await asyncio.sleep(0.1)
+        return True
+
+    monkeypatch.setattr(ssh_scraper, "send_input", send_input)
+    rumad = StandInRumad(year=2024)
+    port = rumad.start_in_thread()
+    sink = RecordingSink()
+    key = department_key("ADMI", "Fall", 2024)
+
+    async def run():
+        registrar = StandInRegistrar()
+        url = await registrar.start()
+        ssh_pool = SSHChannelPool(1, "127.0.0.1", port, "paramiko")
+        await ssh_pool.open()
+        try:
+            async with aiohttp.ClientSession() as session:
+                watcher = SeatWatcher(
+                    Watchlist([WatchItem("ADMI", "Fall", 2024, 60)]),
+                    [sink],
+                    [FingerprintStore()],
+                    ssh_pool,
+                    session,
+                    {},
+                    AsyncLimiter(100, 1),
+                    url,
+                )
+                await watcher.warm_up()
+                await watcher.run(once=True)
+                # nothing moved since the first reading
+                await watcher.run(once=True)
+                courses = watcher.departments[key]["courses"]
+                next(iter(courses.values()))["sections"][0]["usage"] += 1
+                await watcher.run(once=True)
+        finally:
+            ssh_pool.close()
+            await registrar.stop()
+
+    try:
+        asyncio.run(run())
+    finally:
+        rumad.stop_thread()
+
+    assert sink.writes == ["ADMI"]
+    assert len(sink.seat_updates) == 1
+    assert len(sink.seat_updates[0]) == 1
+
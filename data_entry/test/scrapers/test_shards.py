@@ -0,0 +1,62 @@
+import asyncio
+
+import aiohttp
+from aiolimiter import AsyncLimiter
+
+from src.scrapers.shards import COURSE_PREFIXES, ShardPlanner, merge_shards
+from src.scrapers.standins.registrar import StandInRegistrar
+from src.scrapers.web_scraper import scrape_department
+
+# the department with the most sections among the stand-in's synthetic ones
+BIG_DEPARTMENT = "AABZ"
+
+
+def test_plan_balances_prefixes_and_covers_all_of_them():
+    planner = ShardPlanner({"INEL": {"3": 120, "4": 100, "5": 40, "6": 20}}, 100)
+    shards = planner.plan("INEL")
+    assert len(shards) == 3
+    assert sorted(prefix for shard in shards for prefix in shard) == list(
+        COURSE_PREFIXES
+    )
+    assert ["3"] in shards and ["4"] in shards
+    assert ShardPlanner(planner.counts, 0).plan("INEL") == []
+    assert ShardPlanner(planner.counts, 500).plan("INEL") == []
+    assert planner.plan("CIIC") == []
+
+
+def test_merge_keeps_one_copy_of_every_course():
+    shard = {"department": "INEL", "courses": {"INEL3001": {"sections": []}}}
+    again = {"department": "INEL", "courses": {"INEL3001": {"sections": []}}}
+    assert merge_shards([None, None]) is None
+    assert list(merge_shards([shard, None, again])["courses"]) == ["INEL3001"]
+
+
+def test_sharded_department_matches_the_whole_page():
+    registrar = StandInRegistrar()
+    planner = ShardPlanner(sections_per_shard=150)
+
+    async def run():
+        url = await registrar.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                return [
+                    await scrape_department(
+                        session,
+                        BIG_DEPARTMENT,
+                        "Fall",
+                        2024,
+                        {},
+                        AsyncLimiter(1000, 1),
+                        registrar_url=url,
+                        shard_planner=planner,
+                    )
+                    for _ in range(2)
+                ]
+        finally:
+            await registrar.stop()
+
+    # the first run has no history and asks for the whole department
+    whole, sharded = asyncio.run(run())
+    assert registrar.requests == 1 + len(COURSE_PREFIXES)
+    assert whole is not None and sharded == whole
+    assert len(planner.plan(BIG_DEPARTMENT)) > 1
@@ -0,0 +1,173 @@
+import asyncio
+
+import pytest
+
+import src.scrapers.ssh_scraper as ssh_scraper
+from src.scrapers.cost_model import LongestFirstQueue
+from src.scrapers.ssh_scraper import SSHChannelPool
+from src.scrapers.standins.rumad import StandInRumad
+
+
+class CountingConnection:
+    """Stands in for a connection, keeping track of how many handshakes overlap."""
+
+    opening = 0
+    most_opening = 0
+
+    def __init__(self, host: str, port: int) -> None:
+        pass
+
+    async def open(self) -> None:
+        CountingConnection.opening += 1
+        CountingConnection.most_opening = max(
+            CountingConnection.most_opening, CountingConnection.opening
+        )
+        await asyncio.sleep(0.05)
+        CountingConnection.opening -= 1
+
+
+class CountingShell:
+    connection_class = CountingConnection
+
+    def __init__(self, host: str, port: int, connection: CountingConnection) -> None:
+        self.connection = connection
+        self.term = None
+        self.id = hex(id(self))
+
+    async def open(self) -> None:
+        pass
+
+    async def select_term(self, term: str) -> None:
+        self.term = term
+
+    def healthy(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def quick_setup(monkeypatch):
+    async def send_input(chan, inputs, department=None):
+        for text, delay in inputs:
+            chan.send(text.encode(ssh_scraper.SSH_ENCODING))
+            if delay >= 0:
+                await asyncio.sleep(0.1)
+        return True
+
+    monkeypatch.setattr(ssh_scraper, "send_input", send_input)
+
+
+def test_pool_connects_at_most_connect_concurrency_at_once(monkeypatch):
+    monkeypatch.setitem(ssh_scraper.SSH_BACKENDS, "counting", CountingShell)
+    pool = SSHChannelPool(10, backend="counting", connect_concurrency=3)
+
+    asyncio.run(pool.open("1erSem"))
+
+    assert CountingConnection.most_opening == 3
+    assert all(shell.term == "1erSem" for shell in pool.idle)
+
+
+def test_broken_shells_are_swapped_out_in_the_background(quick_setup):
+    rumad = StandInRumad(year=2024)
+    port = rumad.start_in_thread()
+
+    async def run():
+        pool = SSHChannelPool(2, "127.0.0.1", port, "asyncssh")
+        await pool.open("1erSem")
+        try:
+            assert rumad.max_active_sessions == 2
+            shell = await pool.acquire("1erSem")
+            other = await pool.acquire("1erSem")
+            assert other is not shell
+            await pool.release(other)
+            # the server hung up on this one while it was scraping
+            await pool.release(shell, broken=True)
+            assert await pool.acquire("1erSem") is other
+            await pool.release(other)
+            await asyncio.gather(*pool.replacing)
+            assert pool.replaced == 1
+            assert shell.healthy() and shell.term == "1erSem"
+            # found broken between departments, never handed out
+            other.channel.close()
+            await asyncio.sleep(0.1)
+            assert await pool.acquire("1erSem") is shell
+        finally:
+            pool.close()
+
+    try:
+        asyncio.run(run())
+    finally:
+        rumad.stop_thread()
+
+
+@pytest.mark.parametrize("backend", ["paramiko", "asyncssh"])
+def test_shells_share_connections_and_reconnect_them_once(quick_setup, backend):
+    rumad = StandInRumad(year=2024)
+    port = rumad.start_in_thread()
+
+    async def run():
+        pool = SSHChannelPool(
+            4, "127.0.0.1", port, backend, shells_per_connection=2
+        )
+        await pool.open("1erSem")
+        try:
+            assert len(pool.connections) == 2
+            assert pool.handshakes == 2
+            assert rumad.max_active_sessions == 4
+            # RUMAD dropped the first connection and both shells on it
+            pool.connections[0].close()
+            await asyncio.sleep(0.1)
+            shells = [await pool.acquire("1erSem") for _ in range(2)]
+            assert all(shell.connection is pool.connections[1] for shell in shells)
+            while pool.replacing:
+                await asyncio.gather(*pool.replacing)
+            # the first shell back connected again, the second reused it
+            assert pool.replaced == 2
+            assert pool.handshakes == 3
+            assert all(shell.healthy() for shell in pool.idle)
+        finally:
+            pool.close()
+
+    try:
+        asyncio.run(run())
+    finally:
+        rumad.stop_thread()
+
+
+class RefusingPool:
+    """Hands out shells that always drop the connection."""
+
+    class Shell:
+        async def select_term(self, term: str) -> None:
+            raise ConnectionResetError("RUMAD closed the connection")
+
+    def __init__(self) -> None:
+        self.broken = 0
+
+    async def acquire(self, term: str):
+        return RefusingPool.Shell()
+
+    async def release(self, shell, broken: bool = False) -> None:
+        self.broken += broken
+
+
+def test_department_rumad_keeps_refusing_is_stored_without_availability():
+    department_data = {"department": "INEL", "term": "Fall", "year": 2024, "courses": {}}
+
+    async def run():
+        # already full, a failing worker must still get its department back in
+        ssh_queue = LongestFirstQueue(cost=lambda item: 0, maxsize=1)
+        db_queue = asyncio.Queue()
+        await ssh_queue.put(department_data)
+        pool = RefusingPool()
+        worker = asyncio.create_task(
+            ssh_scraper.ssh_scraper_task(ssh_queue, db_queue, pool, max_attempts=3)
+        )
+        stored = await asyncio.wait_for(db_queue.get(), 5)
+        await asyncio.wait_for(ssh_queue.join(), 5)
+        worker.cancel()
+        return stored, pool.broken
+
+    assert asyncio.run(run()) == (department_data, 3)
@@ -0,0 +1,79 @@
+import asyncio
+
+import aiohttp
+from aiolimiter import AsyncLimiter
+
+from src.scrapers.journal import EMPTY, FAILED, RunJournal
+from src.scrapers.standins.registrar import StandInRegistrar, synthetic_department
+from src.scrapers.web_scraper import scrape_department, web_scraper_task
+
+
+def scrape_from(registrar: StandInRegistrar, department: str = "INEL"):
+    async def run():
+        url = await registrar.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                return await scrape_department(
+                    session,
+                    department,
+                    "Fall",
+                    2024,
+                    {},
+                    AsyncLimiter(100, 1),
+                    registrar_url=url,
+                )
+        finally:
+            await registrar.stop()
+
+    return asyncio.run(run())
+
+
+def test_scraper_reads_synthetic_departments():
+    data = scrape_from(StandInRegistrar(seed=1))
+    expected = synthetic_department("INEL", seed=1)
+    assert data is not None
+    assert data["department"] == "INEL"
+    assert list(data["courses"]) == [course["courseCode"] for course in expected]
+    assert sum(len(course["sections"]) for course in data["courses"].values()) == sum(
+        len(course["sections"]) for course in expected
+    )
+
+
+def test_stand_in_failures_look_like_registrar_failures():
+    assert scrape_from(StandInRegistrar(error_rate=1.0)) is None
+    assert scrape_from(StandInRegistrar(webservice_error_rate=1.0)) is None
+
+
+def journal_scrape(registrar: StandInRegistrar, journal: RunJournal):
+    async def run():
+        url = await registrar.start()
+        web_queue: asyncio.Queue = asyncio.Queue()
+        web_queue.put_nowait(("INEL", "Fall", 2024))
+        try:
+            async with aiohttp.ClientSession() as session:
+                task = asyncio.create_task(
+                    web_scraper_task(
+                        web_queue,
+                        asyncio.Queue(),
+                        session,
+                        {},
+                        AsyncLimiter(100, 1),
+                        journal=journal,
+                        registrar_url=url,
+                    )
+                )
+                await web_queue.join()
+                task.cancel()
+        finally:
+            await registrar.stop()
+
+    asyncio.run(run())
+    return journal.progress("INEL", "Fall", 2024)[0]
+
+
+def test_unreachable_departments_are_left_for_resume(tmp_path):
+    journal = RunJournal(tmp_path / "journal.sqlite")
+    assert journal_scrape(StandInRegistrar(error_rate=1.0), journal) == FAILED
+    assert not journal.is_finished("INEL", "Fall", 2024, ["sqlite"])
+    assert journal_scrape(StandInRegistrar(webservice_error_rate=1.0), journal) == EMPTY
+    assert journal.is_finished("INEL", "Fall", 2024, ["sqlite"])
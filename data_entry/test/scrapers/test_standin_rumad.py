@@ -0,0 +1,185 @@
+import asyncio
+
+import pytest
+
+import src.scrapers.ssh_scraper as ssh_scraper
+from src.parsers.ansi_parser import parse_department_page
+from src.scrapers.ssh_scraper import (
+    AsyncRumadShell,
+    ChannelPager,
+    RumadOutOfStep,
+    RumadShell,
+    scrape_department_availability,
+)
+from src.scrapers.standins.registrar import render_sections_page, synthetic_department
+from src.scrapers.standins.rumad import (
+    StandInRumad,
+    render_department_prompt,
+    render_rumad_pages,
+)
+from src.scrapers.web_scraper import parse_department_html
+
+
+def test_synthetic_pages_parse_like_rumad_pages():
+    pages = render_rumad_pages("INEL", "1erSem", 2024)
+    parsed = parse_department_page(pages[0])
+    assert parsed["term"] == "1erSem"
+    assert parsed["year"] == 2024
+    assert parsed["courseCode"] == synthetic_department("INEL")[0]["courseCode"]
+    assert parsed["sections"]
+
+
+def test_scraper_walks_stand_in_menus_and_pages(monkeypatch):
+    async def send_input(chan, inputs, department=None):
+        # the stand-in answers at once, no need for the production delays
+        for text, _ in inputs:
+            chan.send(text.encode(ssh_scraper.SSH_ENCODING))
+        await asyncio.sleep(0.1)
+        return True
+
+    monkeypatch.setattr(ssh_scraper, "send_input", send_input)
+    rumad = StandInRumad(year=2024)
+    port = rumad.start_in_thread()
+
+    async def run():
+        shell = RumadShell("127.0.0.1", port)
+        shell.connect()
+        try:
+            channel = await shell.select_term("1erSem")
+            department_data = parse_department_html(
+                render_sections_page(synthetic_department("ADMI")),
+                "ADMI",
+                "Fall",
+                2024,
+                {},
+            )
+            return await scrape_department_availability(channel, department_data)
+        finally:
+            shell.close()
+
+    try:
+        updated = asyncio.run(run())
+    finally:
+        rumad.stop_thread()
+
+    sections = [
+        section
+        for course in updated["courses"].values()
+        for section in course["sections"]
+    ]
+    assert any(section["capacity"] > 0 for section in sections)
+    assert rumad.pages_served == len(render_rumad_pages("ADMI", "1erSem", 2024))
+
+
+def test_asyncssh_shell_reads_the_same_availability(monkeypatch):
+    async def send_input(chan, inputs, department=None):
+        for text, _ in inputs:
+            chan.send(text.encode(ssh_scraper.SSH_ENCODING))
+        await asyncio.sleep(0.1)
+        return True
+
+    monkeypatch.setattr(ssh_scraper, "send_input", send_input)
+    rumad = StandInRumad(year=2024)
+    port = rumad.start_in_thread()
+
+    async def run():
+        shell = AsyncRumadShell("127.0.0.1", port)
+        await shell.open()
+        try:
+            channel = await shell.select_term("1erSem")
+            department_data = parse_department_html(
+                render_sections_page(synthetic_department("ADMI")),
+                "ADMI",
+                "Fall",
+                2024,
+                {},
+            )
+            updated = await scrape_department_availability(channel, department_data)
+            # a term switch opens a new session on the same connection
+            await shell.select_term("2doSem")
+            return updated
+        finally:
+            shell.close()
+
+    try:
+        updated = asyncio.run(run())
+    finally:
+        rumad.stop_thread()
+
+    assert any(
+        section["capacity"] > 0
+        for course in updated["courses"].values()
+        for section in course["sections"]
+    )
+    assert rumad.pages_served == len(render_rumad_pages("ADMI", "1erSem", 2024))
+    assert rumad.sessions == 2
+
+
+def test_pager_hands_over_each_screen_once_it_is_drawn(monkeypatch):
+    async def send_input(chan, inputs, department=None):
+        for text, delay in inputs:
+            chan.send(text.encode(ssh_scraper.SSH_ENCODING))
+            # only setup still pauses, pages are read until their prompt
+            if delay >= 0:
+                await asyncio.sleep(0.1)
+        return True
+
+    monkeypatch.setattr(ssh_scraper, "send_input", send_input)
+    rumad = StandInRumad(year=2024, latency=0.05)
+    port = rumad.start_in_thread()
+
+    async def run():
+        shell = AsyncRumadShell("127.0.0.1", port)
+        await shell.open()
+        try:
+            pager = ChannelPager(await shell.select_term("1erSem"), "ADMI")
+            screens = [await pager.open("ADMI")]
+            while ssh_scraper.MORE_PROMPT in screens[-1]:
+                await pager.request_next()
+                screens.append(await pager.next())
+            return screens
+        finally:
+            shell.close()
+
+    try:
+        screens = asyncio.run(run())
+    finally:
+        rumad.stop_thread()
+
+    expected = render_rumad_pages("ADMI", "1erSem", 2024)
+    # the prompt left over from choosing the term comes ahead of the first page
+    assert screens[0] == render_department_prompt() + expected[0]
+    assert screens[1:] == expected[1:] + [render_department_prompt()]
+
+
+def test_pager_gives_up_on_a_channel_whose_page_never_finished(monkeypatch):
+    async def send_input(chan, inputs, department=None):
+        for text, delay in inputs:
+            chan.send(text.encode(ssh_scraper.SSH_ENCODING))
+            # long enough for the slow menus to be drawn during setup
+            if delay >= 0:
+                await asyncio.sleep(0.3)
+        return True
+
+    monkeypatch.setattr(ssh_scraper, "send_input", send_input)
+    # every later page arrives after the pager stopped waiting for it
+    monkeypatch.setattr(ssh_scraper, "PAGE_TIMEOUT", 0.05)
+    rumad = StandInRumad(year=2024, latency=0.2)
+    port = rumad.start_in_thread()
+
+    async def run():
+        shell = AsyncRumadShell("127.0.0.1", port)
+        await shell.open()
+        try:
+            pager = ChannelPager(await shell.select_term("1erSem"), "ADMI")
+            assert ssh_scraper.MORE_PROMPT in await pager.open("ADMI")
+            await pager.request_next()
+            await pager.next()
+        finally:
+            shell.close()
+
+    try:
+        with pytest.raises(RumadOutOfStep):
+            asyncio.run(run())
+    finally:
+        rumad.stop_thread()